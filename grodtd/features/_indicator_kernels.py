@@ -0,0 +1,288 @@
+"""
+Numba kernels for recursive technical indicators.
+
+EMA, RSI and ATR are bar-serial accumulators, so they are computed here in
+a single compiled pass over contiguous float64 arrays. The kernels
+reproduce the pandas_ta reference implementations (SMA-seeded EMA, Wilder
+smoothing via ``ewm(adjust=False)``) including their NaN handling.
+
+``compute_all`` fuses every indicator of ``calculate_all_features`` into one
+loop so each bar is read once and all accumulators advance together.
+"""
+
+import numpy as np
+from numba import njit
+
+# Added to a high-low range containing zeros, as pandas_ta's non_zero_range does
+_EPSILON = np.finfo(np.float64).eps
+
+
+# Row order of the array returned by compute_all
+ALL_FEATURE_COLUMNS = (
+    'vwap', 'ema_fast', 'ema_slow', 'atr', 'rsi',
+    'bb_upper', 'bb_middle', 'bb_lower',
+    'macd', 'macd_signal', 'macd_histogram',
+)
+
+
+@njit(cache=True)
+def _ewm_step(weighted: float, old_wt: float, cur: float, alpha: float):
+    """Advance an ``adjust=False`` exponentially weighted mean by one value."""
+    if weighted == weighted:
+        # Missing values still decay the weight of the running mean
+        old_wt *= 1.0 - alpha
+        if cur == cur:
+            if weighted != cur:
+                weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+            old_wt = 1.0
+    elif cur == cur:
+        weighted = cur
+    return weighted, old_wt
+
+
+@njit(cache=True)
+def ewm_mean_kernel(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Exponentially weighted mean matching ``Series.ewm(alpha=alpha, adjust=False).mean()``."""
+    n = values.shape[0]
+    out = np.empty(n)
+    weighted = np.nan
+    old_wt = 1.0
+    for i in range(n):
+        weighted, old_wt = _ewm_step(weighted, old_wt, values[i], alpha)
+        out[i] = weighted
+    return out
+
+
+@njit(cache=True)
+def _sma_seed(values: np.ndarray, period: int) -> np.ndarray:
+    """Replace the first ``period`` values with NaNs and their mean at ``period - 1``."""
+    seeded = values.copy()
+    total = 0.0
+    count = 0
+    for i in range(period):
+        if values[i] == values[i]:
+            total += values[i]
+            count += 1
+    for i in range(period - 1):
+        seeded[i] = np.nan
+    seeded[period - 1] = total / count if count > 0 else np.nan
+    return seeded
+
+
+@njit(cache=True)
+def ema_kernel(values: np.ndarray, period: int) -> np.ndarray:
+    """SMA-seeded exponential moving average; requires ``len(values) >= period``."""
+    return ewm_mean_kernel(_sma_seed(values, period), 2.0 / (period + 1))
+
+
+@njit(cache=True)
+def rsi_kernel(values: np.ndarray, period: int) -> np.ndarray:
+    """Relative strength index with Wilder smoothing; requires ``len(values) > period``."""
+    n = values.shape[0]
+    gains = np.empty(n)
+    losses = np.empty(n)
+    gains[0] = np.nan
+    losses[0] = np.nan
+    for i in range(1, n):
+        change = values[i] - values[i - 1]
+        if change != change:
+            gains[i] = np.nan
+            losses[i] = np.nan
+        else:
+            gains[i] = max(change, 0.0)
+            losses[i] = -min(change, 0.0)
+
+    alpha = 1.0 / period
+    avg_gain = ewm_mean_kernel(gains, alpha)
+    avg_loss = ewm_mean_kernel(losses, alpha)
+
+    out = np.empty(n)
+    for i in range(n):
+        total = avg_gain[i] + avg_loss[i]
+        out[i] = 100.0 * avg_gain[i] / total if total != 0.0 else np.nan
+    return out
+
+
+@njit(cache=True)
+def atr_kernel(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """SMA-seeded average true range with Wilder smoothing; requires ``len(close) > period``."""
+    n = close.shape[0]
+    hl_range = high - low
+    for i in range(n):
+        if hl_range[i] == 0.0:
+            hl_range += _EPSILON
+            break
+
+    true_range = np.empty(n)
+    for i in range(n):
+        best = abs(hl_range[i])
+        if i > 0:
+            prev_close = close[i - 1]
+            for candidate in (abs(high[i] - prev_close), abs(prev_close - low[i])):
+                if best != best or candidate > best:
+                    best = candidate
+        true_range[i] = best
+
+    return ewm_mean_kernel(_sma_seed(true_range, period), 1.0 / period)
+
+
+@njit(cache=True)
+def _seeded_ema_step(state: np.ndarray, k: int, cur: float, period: int, alpha: float) -> float:
+    """Feed the ``k``-th input to an SMA-seeded EMA; ``state`` is (sum, count, mean, weight)."""
+    if k < period:
+        if cur == cur:
+            state[0] += cur
+            state[1] += 1.0
+        if k < period - 1:
+            return np.nan
+        cur = state[0] / state[1] if state[1] > 0 else np.nan
+    state[2], state[3] = _ewm_step(state[2], state[3], cur, alpha)
+    return state[2]
+
+
+@njit(cache=True)
+def _new_ema_state() -> np.ndarray:
+    state = np.zeros(4)
+    state[2] = np.nan
+    state[3] = 1.0
+    return state
+
+
+@njit(cache=True)
+def compute_all(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    vwap_period: int,
+    ema_fast: int,
+    ema_slow: int,
+    atr_period: int,
+    rsi_period: int,
+    bb_period: int,
+    bb_std: float,
+    macd_fast: int,
+    macd_slow: int,
+    macd_signal: int,
+) -> np.ndarray:
+    """All ``calculate_all_features`` indicators in a single pass.
+
+    Returns a ``(len(ALL_FEATURE_COLUMNS), n)`` array whose rows follow
+    ``ALL_FEATURE_COLUMNS``. Each row matches the corresponding standalone
+    kernel or pandas rolling computation.
+    """
+    n = close.shape[0]
+    out = np.full((len(ALL_FEATURE_COLUMNS), n), np.nan)
+
+    # ATR's high-low range gets an epsilon everywhere if any bar is flat
+    hl_offset = 0.0
+    for i in range(n):
+        if high[i] - low[i] == 0.0:
+            hl_offset = _EPSILON
+            break
+
+    ema_fast_state = _new_ema_state()
+    ema_slow_state = _new_ema_state()
+    atr_state = _new_ema_state()
+    macd_fast_state = _new_ema_state()
+    macd_slow_state = _new_ema_state()
+    signal_state = _new_ema_state()
+    ema_fast_alpha = 2.0 / (ema_fast + 1)
+    ema_slow_alpha = 2.0 / (ema_slow + 1)
+    macd_fast_alpha = 2.0 / (macd_fast + 1)
+    macd_slow_alpha = 2.0 / (macd_slow + 1)
+    signal_alpha = 2.0 / (macd_signal + 1)
+    wilder_atr = 1.0 / atr_period
+    wilder_rsi = 1.0 / rsi_period
+
+    avg_gain = np.nan
+    gain_wt = 1.0
+    avg_loss = np.nan
+    loss_wt = 1.0
+
+    # Rolling window accumulators over valid (non-NaN) observations
+    pv_sum = 0.0
+    vol_sum = 0.0
+    vwap_obs = 0
+    bb_mean = 0.0
+    bb_ssqdm = 0.0
+    bb_obs = 0
+    signal_start = -1
+
+    for i in range(n):
+        price = close[i]
+
+        # VWAP: rolling sums of typical price * volume and of volume
+        pv = (high[i] + low[i] + price) / 3 * volume[i]
+        if pv == pv and volume[i] == volume[i]:
+            pv_sum += pv
+            vol_sum += volume[i]
+            vwap_obs += 1
+        if i >= vwap_period:
+            j = i - vwap_period
+            old_pv = (high[j] + low[j] + close[j]) / 3 * volume[j]
+            if old_pv == old_pv and volume[j] == volume[j]:
+                pv_sum -= old_pv
+                vol_sum -= volume[j]
+                vwap_obs -= 1
+        if vwap_obs >= vwap_period:
+            out[0, i] = pv_sum / vol_sum
+
+        out[1, i] = _seeded_ema_step(ema_fast_state, i, price, ema_fast, ema_fast_alpha)
+        out[2, i] = _seeded_ema_step(ema_slow_state, i, price, ema_slow, ema_slow_alpha)
+
+        # ATR over the true range
+        true_range = abs(high[i] - low[i] + hl_offset)
+        if i > 0:
+            prev_close = close[i - 1]
+            for candidate in (abs(high[i] - prev_close), abs(prev_close - low[i])):
+                if true_range != true_range or candidate > true_range:
+                    true_range = candidate
+        out[3, i] = _seeded_ema_step(atr_state, i, true_range, atr_period, wilder_atr)
+
+        # RSI from Wilder-smoothed gains and losses
+        change = price - close[i - 1] if i > 0 else np.nan
+        gain = max(change, 0.0) if change == change else np.nan
+        loss = -min(change, 0.0) if change == change else np.nan
+        avg_gain, gain_wt = _ewm_step(avg_gain, gain_wt, gain, wilder_rsi)
+        avg_loss, loss_wt = _ewm_step(avg_loss, loss_wt, loss, wilder_rsi)
+        total = avg_gain + avg_loss
+        out[4, i] = 100.0 * avg_gain / total if total != 0.0 else np.nan
+
+        # Bollinger Bands: Welford rolling mean and squared deviations
+        if price == price:
+            bb_obs += 1
+            delta = price - bb_mean
+            bb_mean += delta / bb_obs
+            bb_ssqdm += delta * (price - bb_mean)
+        if i >= bb_period:
+            old = close[i - bb_period]
+            if old == old:
+                bb_obs -= 1
+                if bb_obs > 0:
+                    delta = old - bb_mean
+                    bb_mean -= delta / bb_obs
+                    bb_ssqdm -= delta * (old - bb_mean)
+                else:
+                    bb_mean = 0.0
+                    bb_ssqdm = 0.0
+        if bb_obs >= bb_period:
+            deviation = bb_std * np.sqrt(max(bb_ssqdm, 0.0) / (bb_obs - 1))
+            out[5, i] = bb_mean + deviation
+            out[6, i] = bb_mean
+            out[7, i] = bb_mean - deviation
+
+        # MACD; the signal EMA starts at the first valid MACD value
+        macd = (
+            _seeded_ema_step(macd_fast_state, i, price, macd_fast, macd_fast_alpha)
+            - _seeded_ema_step(macd_slow_state, i, price, macd_slow, macd_slow_alpha)
+        )
+        out[8, i] = macd
+        if signal_start < 0 and macd == macd:
+            signal_start = i
+        if signal_start >= 0:
+            signal = _seeded_ema_step(signal_state, i - signal_start, macd, macd_signal, signal_alpha)
+            out[9, i] = signal
+            out[10, i] = macd - signal
+
+    return out
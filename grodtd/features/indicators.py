@@ -11,6 +11,13 @@ import pandas as pd
 import numpy as np
 import pandas_ta as ta
 from grodtd.storage.interfaces import OHLCVBar
+from grodtd.features._indicator_kernels import (
+    ALL_FEATURE_COLUMNS,
+    atr_kernel,
+    compute_all,
+    ema_kernel,
+    rsi_kernel,
+)
 
 
 class VWAPCalculator:
@@ -216,9 +223,14 @@ class TechnicalIndicators:
             period: EMA period
         
         Returns:
-            Series with EMA values
+            Series with EMA values, or None if there are fewer than
+            ``period`` values
         """
-        return ta.ema(data, length=period)
+        if len(data) < period:
+            return None
+        
+        values = ema_kernel(data.to_numpy(dtype=np.float64), period)
+        return pd.Series(values, index=data.index, name=f"EMA_{period}")
     
     def calculate_atr(
         self, 
@@ -238,7 +250,18 @@ class TechnicalIndicators:
         if not all(col in data.columns for col in ['high', 'low', 'close']):
             raise ValueError("Data must contain 'high', 'low', and 'close' columns")
         
-        return ta.atr(data['high'], data['low'], data['close'], length=period)
+        if len(data) <= period:
+            return None
+        
+        values = atr_kernel(
+            data['high'].to_numpy(dtype=np.float64),
+            data['low'].to_numpy(dtype=np.float64),
+            data['close'].to_numpy(dtype=np.float64),
+            period
+        )
+        if np.isnan(values).all():
+            return None
+        return pd.Series(values, index=data.index, name=f"ATRr_{period}")
     
     def calculate_rsi(
         self, 
@@ -253,9 +276,14 @@ class TechnicalIndicators:
             period: RSI period
         
         Returns:
-            Series with RSI values
+            Series with RSI values, or None if there are not more than
+            ``period`` values
         """
-        return ta.rsi(data, length=period)
+        if len(data) <= period:
+            return None
+        
+        values = rsi_kernel(data.to_numpy(dtype=np.float64), period)
+        return pd.Series(values, index=data.index, name=f"RSI_{period}")
     
     def calculate_bollinger_bands(
         self, 
@@ -329,30 +357,24 @@ class TechnicalIndicators:
         result = data.copy()
         
         try:
-            # Calculate VWAP
-            result['vwap'] = self.calculate_vwap(data, vwap_period)
-            
-            # Calculate EMAs
-            result['ema_fast'] = self.calculate_ema(data['close'], ema_fast)
-            result['ema_slow'] = self.calculate_ema(data['close'], ema_slow)
-            
-            # Calculate ATR
-            result['atr'] = self.calculate_atr(data, atr_period)
-            
-            # Calculate RSI
-            result['rsi'] = self.calculate_rsi(data['close'], rsi_period)
+            if not all(col in data.columns for col in ['high', 'low', 'close', 'volume']):
+                raise ValueError("Data must contain 'high', 'low', 'close' and 'volume' columns")
             
-            # Calculate Bollinger Bands
-            bb_upper, bb_middle, bb_lower = self.calculate_bollinger_bands(data['close'])
-            result['bb_upper'] = bb_upper
-            result['bb_middle'] = bb_middle
-            result['bb_lower'] = bb_lower
+            # Bollinger Bands (20, 2.0) and MACD (12, 26, 9) need a full window
+            min_bars = max(20, 26 + 9 - 1)
+            if len(data) < min_bars:
+                raise ValueError(f"At least {min_bars} bars are required, got {len(data)}")
             
-            # Calculate MACD
-            macd_line, signal_line, histogram = self.calculate_macd(data['close'])
-            result['macd'] = macd_line
-            result['macd_signal'] = signal_line
-            result['macd_histogram'] = histogram
+            features = compute_all(
+                data['high'].to_numpy(dtype=np.float64),
+                data['low'].to_numpy(dtype=np.float64),
+                data['close'].to_numpy(dtype=np.float64),
+                data['volume'].to_numpy(dtype=np.float64),
+                vwap_period, ema_fast, ema_slow, atr_period, rsi_period,
+                20, 2.0, 12, 26, 9
+            )
+            for name, values in zip(ALL_FEATURE_COLUMNS, features):
+                result[name] = values
             
             self.logger.info("Successfully calculated all technical indicators")
             
@@ -5,17 +5,68 @@ This module provides regime-specific feature calculations including volatility r
 momentum indicators, and other regime-dependent features for market regime classification.
 """
 
+import functools
 import logging
+import time
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Any, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 
-from grodtd.storage.interfaces import OHLCVBar
+from grodtd.storage.cache_keys import frame_cache_key
+from grodtd.storage.interfaces import OHLCVBar, OHLCVBatch
 from grodtd.features.indicators import TechnicalIndicators
 
 
+# Regime classification rules: (feature, upper threshold, lower threshold,
+# score contribution, confidence contribution). A value above the upper
+# threshold adds the score, below the lower threshold subtracts it.
+REGIME_RULES = (
+    ('volatility_ratio', 1.5, 0.5, 1.0, 0.3),
+    ('price_momentum', 0.05, -0.05, 1.0, 0.3),
+    ('trend_strength', 0.5, -0.5, 0.5, 0.2),
+    ('rsi', 70.0, 30.0, 0.5, 0.2),
+)
+
+
+def _copy_feature_result(result: Any) -> Any:
+    """Copy a feature Series (or dict of Series) so callers cannot mutate the cache."""
+    if isinstance(result, dict):
+        return {name: series.copy() for name, series in result.items()}
+    return result.copy()
+
+
+def _memoized_feature(method: Callable) -> Callable:
+    """Cache a calculator method's result per DataFrame content and arguments.
+    
+    Only results that took at least FEATURE_CACHE_MIN_COMPUTE_NS to compute
+    are kept, since cheaper ones cost about as much to hash as to recompute.
+    Callers that already hold the frame's ``frame_cache_key`` can pass it as
+    ``frame_key`` to skip rehashing the data.
+    """
+    @functools.wraps(method)
+    def wrapper(self, data: pd.DataFrame, *args, frame_key: Optional[Tuple] = None, **kwargs):
+        if frame_key is None:
+            frame_key = frame_cache_key(data)
+        cache_key = (method.__name__, args, tuple(sorted(kwargs.items())), frame_key)
+        cached_result = self._feature_cache.get(cache_key)
+        if cached_result is not None:
+            return _copy_feature_result(cached_result)
+        
+        start_ns = time.perf_counter_ns()
+        result = method(self, data, *args, **kwargs)
+        if time.perf_counter_ns() - start_ns >= self.FEATURE_CACHE_MIN_COMPUTE_NS:
+            self._feature_cache[cache_key] = _copy_feature_result(result)
+            if len(self._feature_cache) > self.FEATURE_CACHE_SIZE:
+                # Evict the oldest entry (dicts keep insertion order)
+                del self._feature_cache[next(iter(self._feature_cache))]
+        
+        return result
+    
+    return wrapper
+
+
 @dataclass
 class RegimeFeatureConfig:
     """Configuration for regime feature computation."""
@@ -47,11 +98,18 @@ class RegimeFeatureCalculator:
     - Volume-based regime features
     """
     
+    # Feature results are memoized per DataFrame content when computing
+    # them took at least this long
+    FEATURE_CACHE_MIN_COMPUTE_NS = 512_000
+    FEATURE_CACHE_SIZE = 32
+    
     def __init__(self, config: RegimeFeatureConfig = None):
         self.config = config or RegimeFeatureConfig()
         self.logger = logging.getLogger(__name__)
         self.indicators = TechnicalIndicators()
+        self._feature_cache: Dict[Tuple, Any] = {}
     
+    @_memoized_feature
     def calculate_volatility_ratio(
         self,
         data: pd.DataFrame,
@@ -88,6 +146,7 @@ class RegimeFeatureCalculator:
             self.logger.error(f"Failed to calculate volatility ratio: {e}")
             return pd.Series(index=data.index, dtype=float).fillna(0)
     
+    @_memoized_feature
     def calculate_momentum_indicators(
         self,
         data: pd.DataFrame,
@@ -130,6 +189,7 @@ class RegimeFeatureCalculator:
             self.logger.error(f"Failed to calculate momentum indicators: {e}")
             return {}
     
+    @_memoized_feature
     def calculate_trend_strength(
         self,
         data: pd.DataFrame,
@@ -163,6 +223,7 @@ class RegimeFeatureCalculator:
             self.logger.error(f"Failed to calculate trend strength: {e}")
             return pd.Series(index=data.index, dtype=float).fillna(0)
     
+    @_memoized_feature
     def calculate_volume_regime_features(
         self,
         data: pd.DataFrame,
@@ -206,7 +267,8 @@ class RegimeFeatureCalculator:
     def calculate_regime_classification_features(
         self,
         data: pd.DataFrame,
-        symbol: str
+        symbol: str,
+        frame_key: Optional[Tuple] = None
     ) -> Dict[str, pd.Series]:
         """
         Calculate comprehensive regime classification features.
@@ -214,6 +276,7 @@ class RegimeFeatureCalculator:
         Args:
             data: DataFrame with OHLCV data
             symbol: Trading symbol
+            frame_key: Precomputed frame_cache_key of data, if available
             
         Returns:
             Dictionary with regime classification features
@@ -221,20 +284,24 @@ class RegimeFeatureCalculator:
         try:
             results = {}
             
+            # The memoized calculators share one content hash of the frame
+            if frame_key is None:
+                frame_key = frame_cache_key(data)
+            
             # Volatility features
-            vol_ratio = self.calculate_volatility_ratio(data)
+            vol_ratio = self.calculate_volatility_ratio(data, frame_key=frame_key)
             results['volatility_ratio'] = vol_ratio
             
             # Momentum features
-            momentum_features = self.calculate_momentum_indicators(data)
+            momentum_features = self.calculate_momentum_indicators(data, frame_key=frame_key)
             results.update(momentum_features)
             
             # Trend strength
-            trend_strength = self.calculate_trend_strength(data)
+            trend_strength = self.calculate_trend_strength(data, frame_key=frame_key)
             results['trend_strength'] = trend_strength
             
             # Volume regime features
-            volume_features = self.calculate_volume_regime_features(data)
+            volume_features = self.calculate_volume_regime_features(data, frame_key=frame_key)
             results.update(volume_features)
             
             # Technical indicators for regime classification
@@ -262,14 +329,15 @@ class RegimeFeatureCalculator:
     
     def classify_regime(
         self,
-        features: Dict[str, pd.Series],
+        features: Mapping[str, Union[float, pd.Series, np.ndarray]],
         timestamp: datetime
     ) -> Tuple[str, float]:
         """
         Classify market regime based on computed features.
         
         Args:
-            features: Dictionary of computed features
+            features: Feature values by name, either scalars or series/arrays
+                whose latest value is used
             timestamp: Timestamp for classification
             
         Returns:
@@ -278,82 +346,79 @@ class RegimeFeatureCalculator:
         try:
             # Get latest feature values
             latest_features = {}
-            for name, series in features.items():
-                if not series.empty and pd.notna(series.iloc[-1]):
-                    latest_features[name] = series.iloc[-1]
+            for name, value in features.items():
+                if isinstance(value, (pd.Series, np.ndarray)):
+                    if value.size == 0:
+                        continue
+                    value = value.iloc[-1] if isinstance(value, pd.Series) else value.reshape(-1)[-1]
+                if pd.notna(value):
+                    latest_features[name] = np.array([value], dtype=np.float64)
             
             if not latest_features:
                 return "unknown", 0.0
             
-            # Simple regime classification logic
-            regime_score = 0.0
-            confidence = 0.0
-            
-            # Volatility regime classification
-            if 'volatility_ratio' in latest_features:
-                vol_ratio = latest_features['volatility_ratio']
-                if vol_ratio > 1.5:
-                    regime_score += 1.0  # High volatility
-                elif vol_ratio < 0.5:
-                    regime_score -= 1.0  # Low volatility
-                confidence += 0.3
-            
-            # Momentum regime classification
-            if 'price_momentum' in latest_features:
-                momentum = latest_features['price_momentum']
-                if momentum > 0.05:
-                    regime_score += 1.0  # Strong upward momentum
-                elif momentum < -0.05:
-                    regime_score -= 1.0  # Strong downward momentum
-                confidence += 0.3
-            
-            # Trend regime classification
-            if 'trend_strength' in latest_features:
-                trend = latest_features['trend_strength']
-                if trend > 0.5:
-                    regime_score += 0.5  # Strong trend
-                elif trend < -0.5:
-                    regime_score -= 0.5  # Weak trend
-                confidence += 0.2
-            
-            # RSI regime classification
-            if 'rsi' in latest_features:
-                rsi = latest_features['rsi']
-                if rsi > 70:
-                    regime_score += 0.5  # Overbought
-                elif rsi < 30:
-                    regime_score -= 0.5  # Oversold
-                confidence += 0.2
-            
-            # Determine regime class
-            if regime_score > 1.0:
-                regime_class = "bullish"
-            elif regime_score < -1.0:
-                regime_class = "bearish"
-            elif abs(regime_score) < 0.5:
-                regime_class = "sideways"
-            else:
-                regime_class = "mixed"
-            
-            # Normalize confidence
-            confidence = min(confidence, 1.0)
-            
-            return regime_class, confidence
+            regime_classes, confidences = self.classify_regime_batch(latest_features)
+            return str(regime_classes[0]), float(confidences[0])
             
         except Exception as e:
             self.logger.error(f"Failed to classify regime: {e}")
             return "unknown", 0.0
     
+    def classify_regime_batch(
+        self,
+        features: Mapping[str, Union[pd.Series, np.ndarray]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Classify market regime for every timestep in one vectorized pass.
+        
+        Args:
+            features: Equal-length feature arrays by name; NaN marks a
+                missing value
+            
+        Returns:
+            Tuple of (regime_classes, confidences) arrays
+        """
+        arrays = {name: np.asarray(values, dtype=np.float64) for name, values in features.items()}
+        n = len(next(iter(arrays.values()))) if arrays else 0
+        
+        regime_score = np.zeros(n)
+        confidence = np.zeros(n)
+        any_valid = np.zeros(n, dtype=bool)
+        
+        for values in arrays.values():
+            any_valid |= ~np.isnan(values)
+        
+        for name, upper, lower, score, weight in REGIME_RULES:
+            values = arrays.get(name)
+            if values is None:
+                continue
+            # NaN compares False, so missing values leave the score unchanged
+            regime_score += np.where(values > upper, score, 0.0)
+            regime_score -= np.where(values < lower, score, 0.0)
+            confidence += np.where(np.isnan(values), 0.0, weight)
+        
+        # Determine regime class
+        regime_classes = np.select(
+            [~any_valid, regime_score > 1.0, regime_score < -1.0, np.abs(regime_score) < 0.5],
+            ["unknown", "bullish", "bearish", "sideways"],
+            default="mixed"
+        ).astype(object)
+        
+        # Normalize confidence
+        confidence = np.minimum(confidence, 1.0)
+        
+        return regime_classes, confidence
+    
     def compute_regime_features_for_data(
         self,
-        data: List[OHLCVBar],
+        data: Union[OHLCVBatch, List[OHLCVBar]],
         symbol: str
     ) -> List[RegimeFeatureResult]:
         """
         Compute regime features for a dataset.
         
         Args:
-            data: List of OHLCV bars
+            data: OHLCV batch or list of OHLCV bars
             symbol: Trading symbol
             
         Returns:
@@ -364,30 +429,31 @@ class RegimeFeatureCalculator:
         
         try:
             # Convert to DataFrame
-            df_data = pd.DataFrame([bar.to_dict() for bar in data])
-            df_data['timestamp'] = pd.to_datetime(df_data['timestamp'])
-            df_data.set_index('timestamp', inplace=True)
+            if not isinstance(data, OHLCVBatch):
+                data = OHLCVBatch.from_bars(data)
+            df_data = data.to_frame()
             
             # Calculate regime features
-            features = self.calculate_regime_classification_features(df_data, symbol)
-            
-            # Classify regime for each timestamp
+            features = self.calculate_regime_classification_features(
+                df_data, symbol, frame_key=frame_cache_key(df_data)
+            )
+            
+            # Align features on the data index and classify every timestamp at once
+            feature_frame = pd.DataFrame(features).reindex(df_data.index).astype(np.float64)
+            feature_names = list(feature_frame.columns)
+            feature_values = feature_frame.to_numpy()
+            regime_classes, confidences = self.classify_regime_batch(
+                {name: feature_values[:, i] for i, name in enumerate(feature_names)}
+            )
+            
+            # Create regime feature results
             results = []
-            for timestamp, row in df_data.iterrows():
-                # Get features for this timestamp
-                timestamp_features = {}
-                for name, series in features.items():
-                    if timestamp in series.index and pd.notna(series[timestamp]):
-                        timestamp_features[name] = series[timestamp]
-                
-                # Classify regime
-                regime_class, confidence = self.classify_regime(
-                    {name: pd.Series([value]) for name, value in timestamp_features.items()},
-                    timestamp
-                )
-                
-                # Create regime feature results
-                for feature_name, feature_value in timestamp_features.items():
+            for timestamp, values, regime_class, confidence in zip(
+                df_data.index, feature_values.tolist(), regime_classes, confidences.tolist()
+            ):
+                for feature_name, feature_value in zip(feature_names, values):
+                    if feature_value != feature_value:  # NaN
+                        continue
                     result = RegimeFeatureResult(
                         symbol=symbol,
                         timestamp=timestamp,
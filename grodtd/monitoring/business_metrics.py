@@ -12,8 +12,10 @@ Collects business-specific metrics including:
 import asyncio
 import logging
 import sqlite3
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple
+import numpy as np
 from prometheus_client import Counter, Histogram, Gauge, Summary
 
 from .metrics_collector import MetricsCollector
@@ -306,6 +308,15 @@ class BusinessMetricsCollector(MetricsCollector):
                 """)
                 strategy_performance = cursor.fetchall()
                 
+                # Fetch the PnL series of every group in one query
+                cursor.execute("""
+                    SELECT symbol, regime, strategy, pnl FROM trades
+                    WHERE fill_timestamp >= datetime('now', '-30 days')
+                """)
+                pnl_series = defaultdict(list)
+                for symbol, regime, strategy, pnl in cursor:
+                    pnl_series[(symbol, regime, strategy)].append(pnl)
+                
                 # Calculate win rates and Sharpe ratios
                 strategy_metrics = {}
                 for row in strategy_performance:
@@ -314,20 +325,13 @@ class BusinessMetricsCollector(MetricsCollector):
                     win_rate = (winning_trades / trade_count * 100) if trade_count > 0 else 0
                     
                     # Calculate Sharpe ratio (simplified)
-                    cursor.execute("""
-                        SELECT pnl FROM trades 
-                        WHERE symbol = ? AND regime = ? AND strategy = ?
-                        AND fill_timestamp >= datetime('now', '-30 days')
-                    """, (symbol, regime, strategy))
-                    pnl_values = [row[0] for row in cursor.fetchall()]
+                    pnl_values = np.asarray(pnl_series[(symbol, regime, strategy)], dtype=np.float64)
                     
                     sharpe_ratio = 0.0
-                    if len(pnl_values) > 1:
-                        import statistics
-                        mean_pnl = statistics.mean(pnl_values)
-                        std_pnl = statistics.stdev(pnl_values)
+                    if pnl_values.size > 1:
+                        std_pnl = pnl_values.std(ddof=1)
                         if std_pnl > 0:
-                            sharpe_ratio = mean_pnl / std_pnl
+                            sharpe_ratio = float(pnl_values.mean() / std_pnl)
                     
                     key = f"{strategy}_{regime}_{symbol}"
                     strategy_metrics[key] = {
@@ -37,8 +37,10 @@ class MetricsCollector(ABC):
         """
         self.registry = registry or CollectorRegistry()
         self.logger = logging.getLogger(f"{self.__class__.__module__}.{self.__class__.__name__}")
-        self._collection_start_time = time.time()
+        # Intervals use the monotonic clock; _last_collection_time stays wall-clock for reporting
+        self._collection_start_time = time.monotonic()
         self._last_collection_time = 0.0
+        self._last_collection_monotonic = 0.0
         self._collection_count = 0
         self._collector_id = id(self)  # Unique identifier for this collector instance
         
@@ -90,7 +92,7 @@ class MetricsCollector(ABC):
         Returns:
             Dictionary containing collected metrics data
         """
-        start_time = time.time()
+        start_time = time.monotonic()
         collector_type = self.__class__.__name__
         
         try:
@@ -98,18 +100,19 @@ class MetricsCollector(ABC):
             metrics_data = await self.collect_metrics()
             
             # Update performance metrics
-            duration = time.time() - start_time
+            current_monotonic = time.monotonic()
+            duration = current_monotonic - start_time
             self._collection_duration.labels(collector_type=collector_type).observe(duration)
             
             # Update collection frequency
-            current_time = time.time()
-            if self._last_collection_time > 0:
-                time_diff = current_time - self._last_collection_time
+            if self._last_collection_monotonic > 0:
+                time_diff = current_monotonic - self._last_collection_monotonic
                 if time_diff > 0:
                     frequency = 1.0 / time_diff
                     self._collection_frequency.labels(collector_type=collector_type).set(frequency)
             
-            self._last_collection_time = current_time
+            self._last_collection_monotonic = current_monotonic
+            self._last_collection_time = time.time()
             self._collection_count += 1
             
             self.logger.debug(f"Collected {len(metrics_data)} metrics in {duration:.4f}s")
@@ -137,8 +140,7 @@ class MetricsCollector(ABC):
         Returns:
             Dictionary with collection statistics
         """
-        current_time = time.time()
-        uptime = current_time - self._collection_start_time
+        uptime = time.monotonic() - self._collection_start_time
         
         return {
             'collector_type': self.__class__.__name__,
@@ -170,14 +170,13 @@ class SystemMetricsCollector(MetricsCollector):
             Dictionary containing system metrics data
         """
         try:
-            # Collect system resource metrics
-            system_metrics = await self._collect_system_resources()
-            
-            # Collect process metrics
-            process_metrics = await self._collect_process_metrics()
-            
-            # Collect database metrics
-            database_metrics = await self._collect_database_metrics()
+            # Collect system resource, process and database metrics; the
+            # process and database queries run while the CPU is being sampled
+            system_metrics, process_metrics, database_metrics = await asyncio.gather(
+                self._collect_system_resources(),
+                self._collect_process_metrics(),
+                self._collect_database_metrics()
+            )
             
             # Update Prometheus metrics
             await self._update_prometheus_metrics(system_metrics, process_metrics, database_metrics)
@@ -196,10 +195,13 @@ class SystemMetricsCollector(MetricsCollector):
     async def _collect_system_resources(self) -> Dict[str, Any]:
         """Collect system resource metrics."""
         try:
-            # CPU metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU metrics; both samples block for their interval, so take
+            # them together in worker threads instead of on the event loop
+            cpu_percent, cpu_per_core = await asyncio.gather(
+                asyncio.to_thread(psutil.cpu_percent, interval=1),
+                asyncio.to_thread(psutil.cpu_percent, interval=1, percpu=True)
+            )
             cpu_count = psutil.cpu_count()
-            cpu_per_core = psutil.cpu_percent(interval=1, percpu=True)
             
             # Memory metrics
             memory = psutil.virtual_memory()
@@ -310,10 +312,10 @@ class SystemMetricsCollector(MetricsCollector):
                 db_size = page_count * page_size
                 
                 # Test query performance
-                start_time = time.time()
+                start_time = time.monotonic()
                 cursor.execute("SELECT COUNT(*) FROM trades")
                 trade_count = cursor.fetchone()[0]
-                query_time = time.time() - start_time
+                query_time = time.monotonic() - start_time
                 
                 return {
                     'databases': len(databases),
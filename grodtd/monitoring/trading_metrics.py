@@ -12,7 +12,8 @@ import asyncio
 import logging
 import sqlite3
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+import numpy as np
 from prometheus_client import Counter, Histogram, Gauge, Summary
 
 from .metrics_collector import MetricsCollector
@@ -307,36 +308,19 @@ class TradingMetricsCollector(MetricsCollector):
         if not equity_curve:
             return {'current_drawdown': 0.0, 'max_drawdown': 0.0, 'drawdown_duration': 0}
         
-        values = [row[0] for row in equity_curve]
-        peak = values[0]
-        max_drawdown = 0.0
-        current_drawdown = 0.0
-        drawdown_duration = 0
-        in_drawdown = False
-        
-        for i, value in enumerate(values):
-            if value > peak:
-                peak = value
-                if in_drawdown:
-                    in_drawdown = False
-                    drawdown_duration = 0
-            else:
-                if not in_drawdown:
-                    in_drawdown = True
-                    drawdown_duration = 0
-                else:
-                    drawdown_duration += 1
-                
-                drawdown = (peak - value) / peak * 100
-                max_drawdown = max(max_drawdown, drawdown)
-                
-                if i == len(values) - 1:  # Current value
-                    current_drawdown = drawdown
+        values = np.fromiter((row[0] for row in equity_curve), dtype=np.float64, count=len(equity_curve))
+        peaks = np.maximum.accumulate(values)
+        drawdowns = (peaks - values) / peaks * 100
+        
+        # Bars that set a new high end a drawdown; the first bar never does,
+        # so without one the drawdown runs from the start of the curve
+        new_highs = np.flatnonzero(values[1:] > peaks[:-1])
+        last_high = new_highs[-1] + 1 if new_highs.size else -1
         
         return {
-            'current_drawdown': current_drawdown,
-            'max_drawdown': max_drawdown,
-            'drawdown_duration': drawdown_duration
+            'current_drawdown': float(drawdowns[-1]),
+            'max_drawdown': max(float(drawdowns.max()), 0.0),
+            'drawdown_duration': max(len(values) - 2 - int(last_high), 0)
         }
     
     async def _calculate_sharpe_ratios(self, equity_curve: List[Tuple[float, str]]) -> Dict[str, Any]:
@@ -345,14 +329,12 @@ class TradingMetricsCollector(MetricsCollector):
             return {'sharpe_ratio_30d': 0.0, 'sharpe_ratio_90d': 0.0}
         
         # Calculate returns
-        returns = []
-        for i in range(1, len(equity_curve)):
-            prev_value = equity_curve[i-1][0]
-            curr_value = equity_curve[i][0]
-            if prev_value > 0:
-                returns.append((curr_value - prev_value) / prev_value)
-        
-        if not returns:
+        values = np.fromiter((row[0] for row in equity_curve), dtype=np.float64, count=len(equity_curve))
+        prev_values = values[:-1]
+        valid = prev_values > 0
+        returns = (values[1:][valid] - prev_values[valid]) / prev_values[valid]
+        
+        if not returns.size:
             return {'sharpe_ratio_30d': 0.0, 'sharpe_ratio_90d': 0.0}
         
         # Calculate Sharpe ratios for different windows
@@ -364,21 +346,20 @@ class TradingMetricsCollector(MetricsCollector):
             'sharpe_ratio_90d': sharpe_90d
         }
     
-    def _calculate_sharpe_ratio(self, returns: List[float]) -> float:
+    def _calculate_sharpe_ratio(self, returns: Sequence[float]) -> float:
         """Calculate Sharpe ratio for a given set of returns."""
-        if not returns or len(returns) < 2:
+        returns = np.asarray(returns, dtype=np.float64)
+        if returns.size < 2:
             return 0.0
         
-        import statistics
-        
-        mean_return = statistics.mean(returns)
-        std_return = statistics.stdev(returns) if len(returns) > 1 else 0.0
+        mean_return = returns.mean()
+        std_return = returns.std(ddof=1)
         
         if std_return == 0:
             return 0.0
         
         # Assuming risk-free rate of 0 for simplicity
-        return mean_return / std_return
+        return float(mean_return / std_return)
     
     async def _update_prometheus_metrics(self, 
                                        portfolio_data: Dict[str, Any],
@@ -25,7 +25,7 @@ class RegimeType(Enum):
     HIGH_VOLATILITY = "high_volatility"
 
 
-@dataclass
+@dataclass(slots=True)
 class RegimeFeatures:
     """Features used for regime classification."""
     vwap_slope: float
@@ -8,7 +8,8 @@ the current trading system.
 
 import logging
 import yaml
-from typing import Dict, Optional, List, Tuple
+from collections import deque
+from typing import Deque, Dict, Optional, List, Tuple
 from pathlib import Path
 from datetime import datetime, timedelta
 import pandas as pd
@@ -45,7 +46,8 @@ class RegimeIndicatorIntegration:
         
         # Integration state
         self._last_regime_update: Optional[datetime] = None
-        self._regime_history: List[Tuple[datetime, RegimeType, float]] = []
+        # Keep only the last 100 regime updates
+        self._regime_history: Deque[Tuple[datetime, RegimeType, float]] = deque(maxlen=100)
         self._indicator_cache: Dict[str, any] = {}
         
         self.logger.info(f"RegimeIndicatorIntegration initialized for {symbol}")
@@ -102,10 +104,6 @@ class RegimeIndicatorIntegration:
             self._last_regime_update = datetime.now()
             self._regime_history.append((self._last_regime_update, regime, regime_confidence))
             
-            # Keep only last 100 regime updates
-            if len(self._regime_history) > 100:
-                self._regime_history = self._regime_history[-100:]
-            
             # Update indicator cache
             self._indicator_cache.update({
                 'vwap': vwap,
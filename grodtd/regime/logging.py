@@ -8,7 +8,8 @@ including decision tracking, feature logging, and performance monitoring.
 import logging
 import json
 import csv
-from typing import Dict, List, Optional, Any, Tuple
+from collections import deque
+from typing import Deque, Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 import pandas as pd
@@ -27,7 +28,7 @@ class LogLevel(Enum):
     ERROR = "error"
 
 
-@dataclass
+@dataclass(slots=True)
 class ClassificationDecision:
     """Record of a regime classification decision."""
     timestamp: datetime
@@ -40,7 +41,7 @@ class ClassificationDecision:
     data_quality: str
 
 
-@dataclass
+@dataclass(slots=True)
 class RegimeTransition:
     """Record of a regime transition."""
     timestamp: datetime
@@ -69,7 +70,7 @@ class RegimeLogger:
         
         # In-memory storage for recent decisions
         self._decisions: List[ClassificationDecision] = []
-        self._transitions: List[RegimeTransition] = []
+        self._transitions: Deque[RegimeTransition] = deque(maxlen=500)  # Keep last 500 transitions
         self._performance_metrics: Dict[str, List[float]] = {}
         
         # Setup file logging if enabled
@@ -236,8 +237,6 @@ class RegimeLogger:
         
         # Store in memory
         self._transitions.append(transition)
-        if len(self._transitions) > 500:  # Keep last 500 transitions
-            self._transitions = self._transitions[-500:]
         
         # Log to file
         if self.enable_file_logging:
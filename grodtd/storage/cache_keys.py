@@ -0,0 +1,17 @@
+"""
+Content-based cache keys for pandas data.
+"""
+
+import hashlib
+from typing import Tuple
+
+import pandas as pd
+
+
+def frame_cache_key(data: pd.DataFrame) -> Tuple:
+    """Build a content-based cache key for a DataFrame."""
+    content_hash = hashlib.blake2b(
+        pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes(),
+        digest_size=16
+    ).digest()
+    return (data.shape, tuple(data.columns), content_hash)
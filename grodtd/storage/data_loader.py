@@ -6,15 +6,22 @@ market data from various sources, primarily Robinhood Crypto API.
 """
 
 import asyncio
+import copy
 import logging
+import os
+import shutil
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+from typing import Callable, List, Dict, Any, Iterator, Optional, Tuple, TYPE_CHECKING
 
 import pandas as pd
 import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
 import pyarrow.parquet as pq
 import numpy as np
+from grodtd.storage.cache_keys import frame_cache_key
 from grodtd.storage.interfaces import OHLCVBar, MarketDataInterface
 
 if TYPE_CHECKING:
@@ -24,6 +31,16 @@ if TYPE_CHECKING:
 class DataLoader:
     """Handles loading and storing historical market data."""
     
+    # Parquet codec for stored data; zstd gives smaller files than snappy at similar read speed
+    PARQUET_COMPRESSION = "zstd"
+    PARQUET_COMPRESSION_LEVEL = 3
+    # One day of 1-minute bars per row group
+    PARQUET_ROW_GROUP_SIZE = 1440
+    # Hive partitioning used by _store_data, with the partition key typed as a date
+    PARQUET_PARTITIONING = ds.partitioning(pa.schema([('date', pa.date32())]), flavor='hive')
+    # Number of data quality reports kept by get_data_quality_report
+    QUALITY_REPORT_CACHE_SIZE = 8
+    
     def __init__(self, data_dir: Path = Path("data")):
         self.data_dir = data_dir
         self.raw_dir = data_dir / "raw"
@@ -37,6 +54,9 @@ class DataLoader:
         # Real-time data buffers for 1-minute aggregation
         self._real_time_buffers: Dict[str, List[OHLCVBar]] = {}
         self._current_minute_bars: Dict[str, Optional[OHLCVBar]] = {}
+        
+        # Recent data quality reports keyed by frame content
+        self._quality_report_cache: Dict[Tuple, Dict[str, Any]] = {}
     
     async def load_historical_data(
         self,
@@ -128,13 +148,25 @@ class DataLoader:
             data['day'] = data['timestamp'].dt.day
         
         # Store with compression and optimization
-        data.to_parquet(
-            file_path, 
-            index=False,
-            compression='snappy',  # Fast compression
-            engine='pyarrow',
-            partition_cols=['date'] if 'date' in data.columns else None
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        write_options = dict(
+            compression=self.PARQUET_COMPRESSION,
+            compression_level=self.PARQUET_COMPRESSION_LEVEL,
+            row_group_size=self.PARQUET_ROW_GROUP_SIZE
         )
+        
+        if 'date' in data.columns:
+            # Hive layout (file_path/date=YYYY-MM-DD/...) so range queries can
+            # skip whole days; rewriting a day replaces its previous files
+            pq.write_to_dataset(
+                table,
+                file_path,
+                partition_cols=['date'],
+                existing_data_behavior='delete_matching',
+                **write_options
+            )
+        else:
+            pq.write_table(table, file_path, **write_options)
     
     def load_cached_data(
         self,
@@ -157,14 +189,50 @@ class DataLoader:
         pattern = f"{symbol}_*.parquet"
         return list(self.raw_dir.glob(pattern))
     
-    def cleanup_old_data(self, days_to_keep: int = 30):
-        """Clean up old data files."""
-        cutoff_date = datetime.now() - timedelta(days=days_to_keep)
-        
-        for file_path in self.raw_dir.glob("*.parquet"):
-            if file_path.stat().st_mtime < cutoff_date.timestamp():
-                self.logger.info(f"Removing old data file: {file_path}")
-                file_path.unlink()
+    def cleanup_old_data(self, days_to_keep: int = 30, now_fn: Callable[[], float] = time.time):
+        """Clean up old data files.
+        
+        now_fn returns the current time in epoch seconds; it can be replaced
+        to age data without touching file modification times.
+        """
+        cutoff_ns = int(now_fn() * 10**9) - days_to_keep * 86400 * 10**9
+        
+        with os.scandir(self.raw_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".parquet"):
+                    continue
+                
+                # Partitioned datasets are stored as directories
+                if entry.is_dir(follow_symlinks=False):
+                    self._cleanup_old_partitions(entry.path, cutoff_ns)
+                elif entry.stat(follow_symlinks=False).st_mtime_ns < cutoff_ns:
+                    self.logger.info(f"Removing old data file: {entry.path}")
+                    os.unlink(entry.path)
+    
+    def _cleanup_old_partitions(self, dataset_path: str, cutoff_ns: int):
+        """Remove date partitions whose newest file is older than the cutoff.
+        
+        Rewriting a partition replaces its files without touching the
+        dataset directory, so partitions are aged by their own files. The
+        dataset directory itself is removed once no partitions remain.
+        """
+        with os.scandir(dataset_path) as partitions:
+            for partition in partitions:
+                if not (partition.name.startswith("date=") and partition.is_dir(follow_symlinks=False)):
+                    continue
+                
+                with os.scandir(partition.path) as files:
+                    newest_ns = max(
+                        (f.stat(follow_symlinks=False).st_mtime_ns for f in files),
+                        default=partition.stat(follow_symlinks=False).st_mtime_ns
+                    )
+                if newest_ns < cutoff_ns:
+                    self.logger.info(f"Removing old data partition: {partition.path}")
+                    shutil.rmtree(partition.path)
+        
+        if not os.listdir(dataset_path):
+            self.logger.info(f"Removing empty data directory: {dataset_path}")
+            os.rmdir(dataset_path)
     
     def get_data_for_backtesting(
         self,
@@ -196,17 +264,31 @@ class DataLoader:
     
     def get_storage_stats(self) -> Dict[str, Any]:
         """Get storage statistics and optimization info."""
-        total_files = len(list(self.raw_dir.glob("*.parquet")))
-        total_size = sum(f.stat().st_size for f in self.raw_dir.glob("*.parquet"))
+        total_files = 0
+        total_size = 0
+        for entry in self._iter_parquet_files(self.raw_dir):
+            total_files += 1
+            total_size += entry.stat(follow_symlinks=False).st_size
         
         return {
             "total_files": total_files,
             "total_size_mb": total_size / (1024 * 1024),
             "data_directory": str(self.raw_dir),
-            "compression": "snappy",
+            "compression": self.PARQUET_COMPRESSION,
             "partitioning": "daily by date"
         }
     
+    def _iter_parquet_files(self, root: Path) -> Iterator[os.DirEntry]:
+        """Yield directory entries for all Parquet files under root, including partitions."""
+        stack = [root]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".parquet"):
+                        yield entry
+    
     def validate_ohlcv_data(self, data: pd.DataFrame) -> bool:
         """Validate OHLCV data completeness and integrity with comprehensive checks."""
         required_columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
@@ -257,30 +339,70 @@ class DataLoader:
         self.logger.info("OHLCV data validation passed")
         return True
     
-    def _detect_outliers(self, series: pd.Series, threshold: float = 3.0) -> bool:
-        """Detect outliers using Z-score method."""
+    def _detect_outliers(
+        self,
+        series: pd.Series,
+        threshold: float = 3.0,
+        method: str = "zscore"
+    ) -> bool:
+        """Detect outliers using the Z-score or median absolute deviation method.
+        
+        The "mad" method flags points more than ``threshold`` scaled MADs from
+        the median. Unlike the Z-score, it is not masked by the outlier
+        inflating the standard deviation, which matters for short series.
+        """
         if len(series) < 3:
             return False
         
-        z_scores = abs((series - series.mean()) / series.std())
-        return (z_scores > threshold).any()
+        if method == "zscore":
+            z_scores = abs((series - series.mean()) / series.std())
+            return (z_scores > threshold).any()
+        
+        if method == "mad":
+            values = series.to_numpy(dtype=np.float64)
+            deviations = np.abs(values - np.median(values))
+            mad = np.median(deviations)
+            if mad == 0:
+                return False
+            # 1.4826 scales the MAD to the standard deviation of normal data
+            return bool((deviations > threshold * 1.4826 * mad).any())
+        
+        raise ValueError(f"Unsupported outlier detection method: {method}")
+    
+    # Record layout returned by _check_data_gaps
+    GAP_DTYPE = np.dtype([
+        ('gap_start', 'datetime64[ns]'),
+        ('gap_end', 'datetime64[ns]'),
+        ('dead_time_ns', np.int64)
+    ])
     
-    def _check_data_gaps(self, data: pd.DataFrame):
-        """Check for data gaps in time series."""
+    def _check_data_gaps(self, data: pd.DataFrame, interval: str = "1m") -> np.ndarray:
+        """Check for data gaps in time series.
+        
+        Returns a structured array (GAP_DTYPE) with one record per gap: the
+        last timestamp before it, the first timestamp after it, and the dead
+        time in nanoseconds beyond the expected bar interval.
+        """
         if 'timestamp' not in data.columns or len(data) < 2:
-            return
+            return np.empty(0, dtype=self.GAP_DTYPE)
         
-        # Sort by timestamp
-        data_sorted = data.sort_values('timestamp')
-        time_diffs = data_sorted['timestamp'].diff()
+        # Sorted timestamps as int64 nanoseconds
+        timestamps = np.sort(data['timestamp'].to_numpy(dtype='datetime64[ns]')).view('i8')
+        deltas = np.diff(timestamps)
+        
+        # Any step longer than the bar interval is a gap
+        expected_ns = pd.Timedelta(interval).value
+        gap_idx = np.flatnonzero(deltas > expected_ns)
+        
+        gaps = np.empty(len(gap_idx), dtype=self.GAP_DTYPE)
+        gaps['gap_start'] = timestamps[gap_idx].view('datetime64[ns]')
+        gaps['gap_end'] = timestamps[gap_idx + 1].view('datetime64[ns]')
+        gaps['dead_time_ns'] = deltas[gap_idx] - expected_ns
         
-        # Check for gaps larger than expected interval
-        expected_interval = pd.Timedelta(minutes=1)  # 1-minute data
-        large_gaps = time_diffs > expected_interval * 2
+        if len(gaps):
+            self.logger.warning(f"Found {len(gaps)} potential data gaps in time series")
         
-        if large_gaps.any():
-            gap_count = large_gaps.sum()
-            self.logger.warning(f"Found {gap_count} potential data gaps in time series")
+        return gaps
     
     def detect_missing_data(self, data: pd.DataFrame, expected_interval: str = "1m") -> List[datetime]:
         """Detect missing data points in time series."""
@@ -290,17 +412,25 @@ class DataLoader:
         # Create expected time range
         start_time = data['timestamp'].min()
         end_time = data['timestamp'].max()
-        expected_range = pd.date_range(start=start_time, end=end_time, freq=expected_interval)
+        # Parse as a Timedelta so bar intervals like "1m" mean minutes, not months
+        expected_range = pd.date_range(start=start_time, end=end_time, freq=pd.Timedelta(expected_interval))
         
-        # Find missing timestamps
-        actual_timestamps = set(data['timestamp'])
-        expected_timestamps = set(expected_range)
-        missing_timestamps = expected_timestamps - actual_timestamps
+        # Find missing timestamps (Index.difference returns them sorted)
+        missing_timestamps = expected_range.difference(pd.DatetimeIndex(data['timestamp']))
         
-        return sorted(list(missing_timestamps))
+        return list(missing_timestamps)
     
     def get_data_quality_report(self, data: pd.DataFrame) -> Dict[str, Any]:
-        """Generate comprehensive data quality report."""
+        """Generate comprehensive data quality report.
+        
+        Reports are cached by frame content, so repeated calls on the same
+        data skip the validation, gap and outlier scans.
+        """
+        cache_key = frame_cache_key(data)
+        cached_report = self._quality_report_cache.get(cache_key)
+        if cached_report is not None:
+            return copy.deepcopy(cached_report)
+        
         report = {
             "total_records": len(data),
             "date_range": {
@@ -318,7 +448,12 @@ class DataLoader:
             if col in data.columns:
                 report["outliers_detected"][col] = self._detect_outliers(data[col])
         
-        return report
+        self._quality_report_cache[cache_key] = report
+        if len(self._quality_report_cache) > self.QUALITY_REPORT_CACHE_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            del self._quality_report_cache[next(iter(self._quality_report_cache))]
+        
+        return copy.deepcopy(report)
     
     async def incremental_update(
         self,
@@ -405,15 +540,18 @@ class DataLoader:
         if not existing_data:
             return new_data
         
-        # Combine existing data
-        all_existing = pd.concat(existing_data, ignore_index=True)
+        # Each stored file is already sorted, so a stable sort of the
+        # concatenation only has to merge the sorted runs, and equal
+        # timestamps keep their file order with new_data last
+        combined = pd.concat(existing_data + [new_data], ignore_index=True)
+        combined = combined.sort_values('timestamp', kind='stable')
         
-        # Remove duplicates based on timestamp
-        combined = pd.concat([all_existing, new_data], ignore_index=True)
-        combined = combined.drop_duplicates(subset=['timestamp'], keep='last')
-        combined = combined.sort_values('timestamp')
+        # Remove duplicates based on timestamp, keeping the latest write
+        timestamps = combined['timestamp'].to_numpy()
+        keep_last = np.ones(len(timestamps), dtype=bool)
+        keep_last[:-1] = timestamps[1:] != timestamps[:-1]
         
-        return combined
+        return combined[keep_last]
     
     def query_data(
         self,
@@ -426,24 +564,37 @@ class DataLoader:
         """Flexible data query interface for backtesting and analysis."""
         self.logger.info(f"Querying data for {symbol} from {start_date} to {end_date}")
         
-        # Load cached data
-        cached_data = self.load_cached_data(symbol, start_date, end_date, interval)
-        
-        if cached_data is not None and not cached_data.empty:
-            # Filter to exact date range
-            filtered_data = cached_data[
-                (cached_data['timestamp'] >= start_date) & 
-                (cached_data['timestamp'] <= end_date)
+        local_file = self.raw_dir / f"{symbol}_{interval}_{start_date.date()}_{end_date.date()}.parquet"
+        if not local_file.exists():
+            return pd.DataFrame()
+        
+        # Push the date range and column selection down to the Parquet reader
+        # so partitions and row groups outside the range and unrequested
+        # columns are skipped
+        dataset = pq.ParquetDataset(
+            local_file,
+            partitioning=self.PARQUET_PARTITIONING,
+            filters=[
+                ('date', '>=', start_date.date()),
+                ('date', '<=', end_date.date()),
+                ('timestamp', '>=', start_date),
+                ('timestamp', '<=', end_date)
             ]
-            
-            # Select specific columns if requested
-            if columns:
-                available_columns = [col for col in columns if col in filtered_data.columns]
-                filtered_data = filtered_data[available_columns]
-            
-            return filtered_data
+        )
         
-        return pd.DataFrame()
+        read_columns = None
+        if columns:
+            # timestamp is always read so the range filter can be applied
+            available_columns = [col for col in columns if col in dataset.schema.names]
+            read_columns = list(dict.fromkeys(['timestamp'] + available_columns))
+        
+        filtered_data = dataset.read(columns=read_columns).to_pandas()
+        
+        # Select specific columns if requested
+        if columns:
+            filtered_data = filtered_data[available_columns]
+        
+        return filtered_data
     
     def get_data_summary(
         self,
@@ -497,7 +648,12 @@ class DataLoader:
         format: str = "csv",
         output_path: Optional[Path] = None
     ) -> Path:
-        """Export data in various formats for external use."""
+        """Export data in various formats for external use.
+        
+        CSV files are written by Arrow: the header is quoted, timestamps are
+        written with microseconds (and a ``Z`` suffix when tz-aware), and
+        integral floats are written without a trailing ``.0``.
+        """
         data = self.query_data(symbol, start_date, end_date)
         
         if data.empty:
@@ -508,7 +664,12 @@ class DataLoader:
             output_path = self.raw_dir / f"{symbol}_export_{timestamp}.{format}"
         
         if format.lower() == "csv":
-            data.to_csv(output_path, index=False)
+            # Arrow's native CSV writer avoids pandas' per-cell formatting
+            pa_csv.write_csv(
+                pa.Table.from_pandas(data, preserve_index=False),
+                str(output_path),
+                pa_csv.WriteOptions(quoting_style="needed")
+            )
         elif format.lower() == "json":
             data.to_json(output_path, orient="records", date_format="iso")
         elif format.lower() == "parquet":
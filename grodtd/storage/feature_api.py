@@ -7,10 +7,10 @@ real-time feature computation, caching, and retrieval optimized for trading oper
 
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass
 
-from grodtd.storage.interfaces import OHLCVBar
+from grodtd.storage.interfaces import OHLCVBar, OHLCVBatch
 from grodtd.storage.feature_store import FeatureStore, FeatureStoreConfig, CachedFeature, RegimeFeature
 from grodtd.features.regime_features import RegimeFeatureCalculator, RegimeFeatureConfig, RegimeFeatureResult
 from grodtd.features.indicators import TechnicalIndicators
@@ -25,6 +25,7 @@ class FeatureAPIConfig:
     enable_real_time_updates: bool = True
     enable_regime_features: bool = True
     default_parameters: Dict[str, Any] = None
+    pragmas: Optional[Dict[str, Any]] = None
 
 
 @dataclass
@@ -70,6 +71,8 @@ class FeatureStoreAPI:
             enable_real_time_updates=config.enable_real_time_updates,
             enable_regime_features=config.enable_regime_features
         )
+        if config.pragmas is not None:
+            feature_config.pragmas = dict(config.pragmas)
         
         self.feature_store = FeatureStore(feature_config)
         self.indicators = TechnicalIndicators()
@@ -89,6 +92,10 @@ class FeatureStoreAPI:
             'rsi_period': 14
         }
     
+    def close(self):
+        """Release the feature store's database connections."""
+        self.feature_store.close()
+    
     def get_features(
         self,
         request: FeatureRequest
@@ -430,7 +437,7 @@ class FeatureStoreAPI:
     def batch_compute_features(
         self,
         symbol: str,
-        data: List[OHLCVBar],
+        data: Union[OHLCVBatch, List[OHLCVBar]],
         indicator_types: List[str] = None,
         parameters: Dict[str, Any] = None
     ) -> Dict[str, List[float]]:
@@ -439,7 +446,7 @@ class FeatureStoreAPI:
         
         Args:
             symbol: Trading symbol
-            data: List of OHLCV bars
+            data: OHLCV batch, or a list of OHLCV bars
             indicator_types: List of indicator types to compute
             parameters: Computation parameters
             
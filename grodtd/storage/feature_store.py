@@ -5,18 +5,46 @@ This module provides a feature store for precomputing and caching technical indi
 and regime features for fast access during trading operations.
 """
 
+import hashlib
 import sqlite3
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple, Union
+from dataclasses import dataclass, field
 from pathlib import Path
 import json
 
-from grodtd.storage.interfaces import OHLCVBar
+import numpy as np
+
+from grodtd.storage.interfaces import OHLCVBar, OHLCVBatch
 from grodtd.features.indicators import TechnicalIndicators
 
 
+# SQLite PRAGMAs applied to every feature store connection. The store is a
+# recomputable cache, so WAL with synchronous=NORMAL trades a little
+# durability on power loss for far fewer fsyncs.
+DEFAULT_SQLITE_PRAGMAS: Dict[str, Any] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': -64000,
+    'busy_timeout': 5000
+}
+
+
+def _serialize_parameters(parameters: Dict[str, Any]) -> str:
+    """Serialize computation parameters as key-order independent JSON for storage."""
+    return json.dumps(parameters, sort_keys=True)
+
+
+def _parameters_key(parameters: Dict[str, Any]) -> bytes:
+    """Hash computation parameters into a fixed-width, key-order independent lookup key."""
+    canonical = json.dumps(parameters, sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(canonical.encode(), digest_size=16).digest()
+
+
 @dataclass
 class FeatureStoreConfig:
     """Configuration for the feature store."""
@@ -25,6 +53,8 @@ class FeatureStoreConfig:
     max_cache_size_mb: int = 100
     enable_real_time_updates: bool = True
     enable_regime_features: bool = True
+    pragmas: Dict[str, Any] = field(default_factory=lambda: dict(DEFAULT_SQLITE_PRAGMAS))
+    in_memory: bool = False  # Keep the database in memory (db_path is ignored)
 
 
 @dataclass
@@ -77,12 +107,69 @@ class FeatureStore:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.indicators = TechnicalIndicators()
+        
+        # In-memory stores use a uniquely named shared-cache database; one
+        # connection is held open for the store's lifetime so the database
+        # survives between the short-lived connections used by each method
+        self._memory_uri: Optional[str] = None
+        self._keepalive_conn: Optional[sqlite3.Connection] = None
+        if config.in_memory:
+            self._memory_uri = f"file:feature_store_{id(self)}?mode=memory&cache=shared"
+            self._keepalive_conn = self._connect()
+        
+        # Lookups and stats share one long-lived query_only connection, so
+        # sqlite3's per-connection statement cache keeps their SELECTs prepared
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._read_lock = threading.RLock()
+        
         self._initialize_database()
     
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """Open a database connection with the configured PRAGMAs applied."""
+        if self._memory_uri is not None:
+            conn = sqlite3.connect(self._memory_uri, uri=True, check_same_thread=check_same_thread)
+        else:
+            conn = sqlite3.connect(self.config.db_path, check_same_thread=check_same_thread)
+        for name, value in self.config.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+    
+    @contextmanager
+    def _read_connection(self) -> Iterator[sqlite3.Connection]:
+        """Yield the shared read-only connection, opening it on first use."""
+        with self._read_lock:
+            if self._read_conn is None:
+                conn = self._connect(check_same_thread=False)
+                conn.execute("PRAGMA query_only = ON")
+                self._read_conn = conn
+            yield self._read_conn
+    
+    def close(self):
+        """Close the shared read connection and release the in-memory database, if any."""
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+        if self._keepalive_conn is not None:
+            self._keepalive_conn.close()
+            self._keepalive_conn = None
+    
+    @staticmethod
+    def _has_unique_parameters_key(cursor: sqlite3.Cursor) -> bool:
+        """Check whether feature_store has a unique index on the hashed lookup key."""
+        key_columns = ['symbol', 'timestamp', 'indicator_type', 'parameters_hash']
+        for index in cursor.execute("PRAGMA index_list(feature_store)").fetchall():
+            name, unique = index[1], index[2]
+            if unique:
+                columns = [row[2] for row in cursor.execute(f"PRAGMA index_info('{name}')").fetchall()]
+                if columns == key_columns:
+                    return True
+        return False
+    
     def _initialize_database(self):
         """Initialize the feature store database schema."""
         try:
-            with sqlite3.connect(self.config.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 # Create feature_store table for technical indicators
@@ -94,11 +181,42 @@ class FeatureStore:
                         indicator_type TEXT NOT NULL,
                         value REAL NOT NULL,
                         parameters TEXT NOT NULL,
+                        parameters_hash BLOB,
                         computed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(symbol, timestamp, indicator_type, parameters)
+                        UNIQUE(symbol, timestamp, indicator_type, parameters_hash)
                     )
                 """)
                 
+                # Databases created before parameters were hashed lack the
+                # lookup key column; add it and backfill from the JSON
+                columns = {row[1] for row in cursor.execute("PRAGMA table_info(feature_store)")}
+                if 'parameters_hash' not in columns:
+                    cursor.execute("ALTER TABLE feature_store ADD COLUMN parameters_hash BLOB")
+                    conn.create_function(
+                        "parameters_key", 1, lambda text: _parameters_key(json.loads(text)), deterministic=True
+                    )
+                    cursor.execute("UPDATE feature_store SET parameters_hash = parameters_key(parameters)")
+                
+                # Their UNIQUE constraint is on the raw JSON, so parameter sets
+                # differing only in key order were stored as separate rows.
+                # Keep the newest row per hash and enforce uniqueness on it.
+                if not self._has_unique_parameters_key(cursor):
+                    cursor.execute("""
+                        DELETE FROM feature_store WHERE id NOT IN (
+                            SELECT MAX(id) FROM feature_store
+                            GROUP BY symbol, timestamp, indicator_type, parameters_hash
+                        )
+                    """)
+                    conn.create_function(
+                        "serialize_parameters", 1, lambda text: _serialize_parameters(json.loads(text)),
+                        deterministic=True
+                    )
+                    cursor.execute("UPDATE feature_store SET parameters = serialize_parameters(parameters)")
+                    cursor.execute(
+                        "CREATE UNIQUE INDEX IF NOT EXISTS idx_fs_parameters_key "
+                        "ON feature_store(symbol, timestamp, indicator_type, parameters_hash)"
+                    )
+                
                 # Create regime_features table for regime-specific features
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS regime_features (
@@ -132,6 +250,15 @@ class FeatureStore:
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_regime_features_feature_type ON regime_features(feature_type)")
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_regime_features_regime_class ON regime_features(regime_class)")
                 
+                # Composite covering indexes matching the lookup and history
+                # queries, so they are answered from the index alone
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_fs_sit ON feature_store(symbol, indicator_type, timestamp, parameters_hash, value)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_rf_sftr ON regime_features(symbol, feature_type, regime_class, timestamp, value)")
+                
+                # Age indexes so cleanup deletes a range instead of scanning
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_fs_computed_at ON feature_store(computed_at)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_rf_computed_at ON regime_features(computed_at)")
+                
                 conn.commit()
                 self.logger.info("Feature store database schema initialized successfully")
                 
@@ -161,19 +288,20 @@ class FeatureStore:
             True if successfully cached, False otherwise
         """
         try:
-            with sqlite3.connect(self.config.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
                     INSERT OR REPLACE INTO feature_store 
-                    (symbol, timestamp, indicator_type, value, parameters, computed_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    (symbol, timestamp, indicator_type, value, parameters, parameters_hash, computed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                 """, (
                     symbol,
                     timestamp.isoformat() if hasattr(timestamp, 'isoformat') else str(timestamp),
                     indicator_type,
                     value,
-                    json.dumps(parameters),
+                    _serialize_parameters(parameters),
+                    _parameters_key(parameters),
                     datetime.now().isoformat()
                 ))
                 
@@ -185,6 +313,59 @@ class FeatureStore:
             self.logger.error(f"Failed to cache indicator {indicator_type} for {symbol}: {e}")
             return False
     
+    def cache_technical_indicators_bulk(
+        self,
+        records: Iterable[Tuple[str, datetime, str, float, Dict[str, Any]]]
+    ) -> bool:
+        """
+        Cache many technical indicator values in a single transaction.
+        
+        Args:
+            records: (symbol, timestamp, indicator_type, value, parameters) tuples
+            
+        Returns:
+            True if successfully cached, False otherwise
+        """
+        try:
+            computed_at = datetime.now().isoformat()
+            
+            # Records usually share a few parameter dicts; serialize each once.
+            # The dict is kept in the entry so its id cannot be reused.
+            serialized: Dict[int, Tuple[Dict[str, Any], str, bytes]] = {}
+            
+            def rows() -> Iterator[Tuple]:
+                # Streamed straight into executemany without an intermediate list
+                for symbol, timestamp, indicator_type, value, parameters in records:
+                    entry = serialized.get(id(parameters))
+                    if entry is None:
+                        entry = serialized[id(parameters)] = (
+                            parameters, _serialize_parameters(parameters), _parameters_key(parameters)
+                        )
+                    yield (
+                        symbol,
+                        timestamp.isoformat() if hasattr(timestamp, 'isoformat') else str(timestamp),
+                        indicator_type,
+                        value,
+                        entry[1],
+                        entry[2],
+                        computed_at
+                    )
+            
+            with self._connect() as conn:
+                cursor = conn.executemany("""
+                    INSERT OR REPLACE INTO feature_store 
+                    (symbol, timestamp, indicator_type, value, parameters, parameters_hash, computed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, rows())
+                
+                conn.commit()
+                self.logger.debug(f"Cached {cursor.rowcount} indicator values")
+                return True
+                
+        except Exception as e:
+            self.logger.error(f"Failed to cache indicator batch: {e}")
+            return False
+    
     def get_cached_indicator(
         self,
         symbol: str,
@@ -205,14 +386,14 @@ class FeatureStore:
             Cached value if found, None otherwise
         """
         try:
-            with sqlite3.connect(self.config.db_path) as conn:
+            with self._read_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
                     SELECT value FROM feature_store
-                    WHERE symbol = ? AND timestamp = ? AND indicator_type = ? AND parameters = ?
+                    WHERE symbol = ? AND timestamp = ? AND indicator_type = ? AND parameters_hash = ?
                 """, (symbol, timestamp.isoformat() if hasattr(timestamp, 'isoformat') else str(timestamp), 
-                      indicator_type, json.dumps(parameters)))
+                      indicator_type, _parameters_key(parameters)))
                 
                 result = cursor.fetchone()
                 if result:
@@ -246,7 +427,7 @@ class FeatureStore:
             True if successfully cached, False otherwise
         """
         try:
-            with sqlite3.connect(self.config.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -290,7 +471,7 @@ class FeatureStore:
             Cached value if found, None otherwise
         """
         try:
-            with sqlite3.connect(self.config.db_path) as conn:
+            with self._read_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -312,7 +493,7 @@ class FeatureStore:
     def compute_and_cache_features(
         self,
         symbol: str,
-        data: List[OHLCVBar],
+        data: Union[OHLCVBatch, List[OHLCVBar]],
         parameters: Dict[str, Any] = None
     ) -> Dict[str, List[float]]:
         """
@@ -320,7 +501,7 @@ class FeatureStore:
         
         Args:
             symbol: Trading symbol
-            data: List of OHLCV bars
+            data: OHLCV batch, or a list of OHLCV bars
             parameters: Computation parameters
             
         Returns:
@@ -342,10 +523,9 @@ class FeatureStore:
         
         try:
             # Convert to DataFrame for computation
-            import pandas as pd
-            df_data = pd.DataFrame([bar.to_dict() for bar in data])
-            df_data['timestamp'] = pd.to_datetime(df_data['timestamp'])
-            df_data.set_index('timestamp', inplace=True)
+            if not isinstance(data, OHLCVBatch):
+                data = OHLCVBatch.from_bars(data)
+            df_data = data.to_frame()
             
             # Compute all features
             features_df = self.indicators.calculate_all_features(
@@ -357,46 +537,34 @@ class FeatureStore:
                 rsi_period=default_params['rsi_period']
             )
             
-            # Cache computed features
+            # Cache computed features in one transaction
+            indicator_periods = {
+                'vwap': default_params['vwap_period'],
+                'ema_fast': default_params['ema_fast'],
+                'ema_slow': default_params['ema_slow'],
+                'atr': default_params['atr_period'],
+                'rsi': default_params['rsi_period']
+            }
+            timestamps = features_df.index.to_pydatetime()
             cached_features = {}
-            for timestamp, row in features_df.iterrows():
-                # Convert pandas Timestamp to datetime if needed
-                dt_timestamp = timestamp.to_pydatetime() if hasattr(timestamp, 'to_pydatetime') else timestamp
-                
-                if pd.notna(row.get('vwap')):
-                    self.cache_technical_indicator(
-                        symbol, dt_timestamp, 'vwap', row['vwap'], 
-                        {'period': default_params['vwap_period']}
-                    )
-                    cached_features.setdefault('vwap', []).append(row['vwap'])
-                
-                if pd.notna(row.get('ema_fast')):
-                    self.cache_technical_indicator(
-                        symbol, dt_timestamp, 'ema_fast', row['ema_fast'],
-                        {'period': default_params['ema_fast']}
-                    )
-                    cached_features.setdefault('ema_fast', []).append(row['ema_fast'])
-                
-                if pd.notna(row.get('ema_slow')):
-                    self.cache_technical_indicator(
-                        symbol, dt_timestamp, 'ema_slow', row['ema_slow'],
-                        {'period': default_params['ema_slow']}
-                    )
-                    cached_features.setdefault('ema_slow', []).append(row['ema_slow'])
-                
-                if pd.notna(row.get('atr')):
-                    self.cache_technical_indicator(
-                        symbol, dt_timestamp, 'atr', row['atr'],
-                        {'period': default_params['atr_period']}
-                    )
-                    cached_features.setdefault('atr', []).append(row['atr'])
-                
-                if pd.notna(row.get('rsi')):
-                    self.cache_technical_indicator(
-                        symbol, dt_timestamp, 'rsi', row['rsi'],
-                        {'period': default_params['rsi_period']}
-                    )
-                    cached_features.setdefault('rsi', []).append(row['rsi'])
+            records = []
+            for indicator_type, period in indicator_periods.items():
+                if indicator_type not in features_df:
+                    continue
+                values = features_df[indicator_type].to_numpy(dtype=np.float64)
+                valid = ~np.isnan(values)
+                if not valid.any():
+                    continue
+                
+                valid_values = values[valid].tolist()
+                cached_features[indicator_type] = valid_values
+                indicator_params = {'period': period}
+                records.extend(
+                    (symbol, timestamp, indicator_type, value, indicator_params)
+                    for timestamp, value in zip(timestamps[valid], valid_values)
+                )
+            
+            self.cache_technical_indicators_bulk(records)
             
             self.logger.info(f"Computed and cached features for {symbol}: {len(cached_features)} indicator types")
             return cached_features
@@ -427,16 +595,16 @@ class FeatureStore:
             List of (timestamp, value) tuples
         """
         try:
-            with sqlite3.connect(self.config.db_path) as conn:
+            with self._read_connection() as conn:
                 cursor = conn.cursor()
                 
                 if parameters:
                     cursor.execute("""
                         SELECT timestamp, value FROM feature_store
-                        WHERE symbol = ? AND indicator_type = ? AND parameters = ?
+                        WHERE symbol = ? AND indicator_type = ? AND parameters_hash = ?
                         AND timestamp BETWEEN ? AND ?
                         ORDER BY timestamp
-                    """, (symbol, indicator_type, json.dumps(parameters), 
+                    """, (symbol, indicator_type, _parameters_key(parameters), 
                           start_time.isoformat(), end_time.isoformat()))
                 else:
                     cursor.execute("""
@@ -465,23 +633,24 @@ class FeatureStore:
         """
         try:
             cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+            cutoff = (cutoff_date.isoformat(),)
             
-            with sqlite3.connect(self.config.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Delete old feature_store records
-                cursor.execute("DELETE FROM feature_store WHERE computed_at < ?", (cutoff_date.isoformat(),))
-                feature_store_deleted = cursor.rowcount
-                
-                # Delete old regime_features records
-                cursor.execute("DELETE FROM regime_features WHERE computed_at < ?", (cutoff_date.isoformat(),))
-                regime_features_deleted = cursor.rowcount
-                
-                conn.commit()
-                
-                total_deleted = feature_store_deleted + regime_features_deleted
-                self.logger.info(f"Cleaned up {total_deleted} old feature records (cutoff: {cutoff_date})")
-                return total_deleted
+            # Both deletes commit together in one transaction
+            conn = self._connect()
+            try:
+                with conn:
+                    feature_store_deleted = conn.execute(
+                        "DELETE FROM feature_store WHERE computed_at < ?", cutoff
+                    ).rowcount
+                    regime_features_deleted = conn.execute(
+                        "DELETE FROM regime_features WHERE computed_at < ?", cutoff
+                    ).rowcount
+            finally:
+                conn.close()
+            
+            total_deleted = feature_store_deleted + regime_features_deleted
+            self.logger.info(f"Cleaned up {total_deleted} old feature records (cutoff: {cutoff_date})")
+            return total_deleted
                 
         except Exception as e:
             self.logger.error(f"Failed to cleanup old features: {e}")
@@ -495,7 +664,7 @@ class FeatureStore:
             Dictionary with cache statistics
         """
         try:
-            with sqlite3.connect(self.config.db_path) as conn:
+            with self._read_connection() as conn:
                 cursor = conn.cursor()
                 
                 # Get feature_store stats
@@ -537,7 +706,7 @@ class FeatureStore:
     def _estimate_cache_size(self) -> float:
         """Estimate cache size in MB."""
         try:
-            with sqlite3.connect(self.config.db_path) as conn:
+            with self._read_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT page_count * page_size FROM pragma_page_count(), pragma_page_size()")
                 size_bytes = cursor.fetchone()[0]
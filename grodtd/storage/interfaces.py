@@ -10,8 +10,11 @@ from typing import List, Callable
 from dataclasses import dataclass
 from typing import Dict, Any
 
+import numpy as np
+import pandas as pd
 
-@dataclass
+
+@dataclass(slots=True)
 class OHLCVBar:
     """Represents a single OHLCV bar."""
     timestamp: datetime
@@ -33,6 +36,62 @@ class OHLCVBar:
         }
 
 
+@dataclass
+class OHLCVBatch:
+    """Column-oriented block of OHLCV bars, one float64 array per field."""
+    timestamp: pd.DatetimeIndex
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.timestamp)
+    
+    @classmethod
+    def from_bars(cls, bars: List[OHLCVBar]) -> 'OHLCVBatch':
+        """Convert a list of bars into column arrays."""
+        n = len(bars)
+        return cls(
+            timestamp=pd.DatetimeIndex([bar.timestamp for bar in bars]),
+            open=np.fromiter((bar.open for bar in bars), dtype=np.float64, count=n),
+            high=np.fromiter((bar.high for bar in bars), dtype=np.float64, count=n),
+            low=np.fromiter((bar.low for bar in bars), dtype=np.float64, count=n),
+            close=np.fromiter((bar.close for bar in bars), dtype=np.float64, count=n),
+            volume=np.fromiter((bar.volume for bar in bars), dtype=np.float64, count=n)
+        )
+    
+    @classmethod
+    def from_ndarray(cls, ohlcv: np.ndarray, index: pd.DatetimeIndex) -> 'OHLCVBatch':
+        """Wrap an ``(n, 5)`` open/high/low/close/volume array without copying float64 input."""
+        ohlcv = np.asarray(ohlcv, dtype=np.float64)
+        if ohlcv.ndim != 2 or ohlcv.shape[1] != 5 or len(ohlcv) != len(index):
+            raise ValueError(f"Expected an array of shape ({len(index)}, 5), got {ohlcv.shape}")
+        return cls(
+            timestamp=index,
+            open=ohlcv[:, 0],
+            high=ohlcv[:, 1],
+            low=ohlcv[:, 2],
+            close=ohlcv[:, 3],
+            volume=ohlcv[:, 4]
+        )
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Build a DataFrame indexed by timestamp without copying the columns."""
+        return pd.DataFrame(
+            {
+                'open': self.open,
+                'high': self.high,
+                'low': self.low,
+                'close': self.close,
+                'volume': self.volume
+            },
+            index=pd.DatetimeIndex(self.timestamp, name='timestamp'),
+            copy=False
+        )
+
+
 class MarketDataInterface(ABC):
     """Abstract interface for market data connectors."""
     
@@ -8,7 +8,7 @@ import sqlite3
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 try:
     from .retention_models import CleanupOperation, RetentionPolicy, DataPriority
@@ -21,8 +21,27 @@ logger = logging.getLogger(__name__)
 class RetentionCleanup:
     """Handles data cleanup operations with type-specific logic."""
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, db_conn: Optional[sqlite3.Connection] = None):
         self.db_path = Path(db_path)
+        self.db_conn = db_conn
+        self._owns_conn = False
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Return the long-lived connection, opening it on first use."""
+        if self.db_conn is None:
+            self.db_conn = sqlite3.connect(self.db_path)
+            self.db_conn.execute("PRAGMA cache_size=-20000")
+            self.db_conn.execute("PRAGMA mmap_size=268435456")
+            self.db_conn.execute("PRAGMA temp_store=MEMORY")
+            self._owns_conn = True
+        return self.db_conn
+    
+    def close(self):
+        """Close the connection if it was opened by this instance."""
+        if self._owns_conn and self.db_conn is not None:
+            self.db_conn.close()
+            self.db_conn = None
+            self._owns_conn = False
     
     async def cleanup_data_type_with_logic(self, data_type: str, policy: RetentionPolicy, dry_run: bool = False) -> CleanupOperation:
         """Clean up a specific data type with data type-specific retention logic."""
@@ -69,7 +88,7 @@ class RetentionCleanup:
         
         try:
             # For critical data, use the most conservative retention period
-            conservative_cutoff = self._calculate_conservative_cutoff(policy)
+            conservative_cutoff = self._calculate_conservative_cutoff(policy, now=start_time)
             
             # Get records to delete with conservative cutoff
             records_to_delete = await self._get_records_to_delete_with_cutoff(data_type, conservative_cutoff)
@@ -133,7 +152,7 @@ class RetentionCleanup:
         
         try:
             # For important data, use balanced retention period
-            balanced_cutoff = self._calculate_balanced_cutoff(policy)
+            balanced_cutoff = self._calculate_balanced_cutoff(policy, now=start_time)
             
             # Get records to delete with balanced cutoff
             records_to_delete = await self._get_records_to_delete_with_cutoff(data_type, balanced_cutoff)
@@ -197,7 +216,7 @@ class RetentionCleanup:
         
         try:
             # For operational data, use aggressive retention period
-            aggressive_cutoff = self._calculate_aggressive_cutoff(policy)
+            aggressive_cutoff = self._calculate_aggressive_cutoff(policy, now=start_time)
             
             # Get records to delete with aggressive cutoff
             records_to_delete = await self._get_records_to_delete_with_cutoff(data_type, aggressive_cutoff)
@@ -261,7 +280,7 @@ class RetentionCleanup:
         
         try:
             # Use standard cutoff calculation
-            cutoff = self._calculate_standard_cutoff(policy)
+            cutoff = self._calculate_standard_cutoff(policy, now=start_time)
             
             # Get records to delete
             records_to_delete = await self._get_records_to_delete_with_cutoff(data_type, cutoff)
@@ -318,9 +337,10 @@ class RetentionCleanup:
                 error_message=str(e)
             )
     
-    def _calculate_conservative_cutoff(self, policy: RetentionPolicy) -> datetime:
+    def _calculate_conservative_cutoff(self, policy: RetentionPolicy, now: Optional[datetime] = None) -> datetime:
         """Calculate conservative cutoff date for critical data."""
-        now = datetime.now()
+        if now is None:
+            now = datetime.now()
         
         # Use the most conservative (longest) retention period
         conservative_days = max(
@@ -335,9 +355,10 @@ class RetentionCleanup:
         
         return now - timedelta(days=conservative_days)
     
-    def _calculate_balanced_cutoff(self, policy: RetentionPolicy) -> datetime:
+    def _calculate_balanced_cutoff(self, policy: RetentionPolicy, now: Optional[datetime] = None) -> datetime:
         """Calculate balanced cutoff date for important data."""
-        now = datetime.now()
+        if now is None:
+            now = datetime.now()
         
         # Use the most restrictive retention period (standard logic)
         balanced_days = min(
@@ -349,9 +370,10 @@ class RetentionCleanup:
         
         return now - timedelta(days=balanced_days)
     
-    def _calculate_aggressive_cutoff(self, policy: RetentionPolicy) -> datetime:
+    def _calculate_aggressive_cutoff(self, policy: RetentionPolicy, now: Optional[datetime] = None) -> datetime:
         """Calculate aggressive cutoff date for operational data."""
-        now = datetime.now()
+        if now is None:
+            now = datetime.now()
         
         # Use the most aggressive (shortest) retention period
         aggressive_days = min(
@@ -366,9 +388,10 @@ class RetentionCleanup:
         
         return now - timedelta(days=aggressive_days)
     
-    def _calculate_standard_cutoff(self, policy: RetentionPolicy) -> datetime:
+    def _calculate_standard_cutoff(self, policy: RetentionPolicy, now: Optional[datetime] = None) -> datetime:
         """Calculate standard cutoff date."""
-        now = datetime.now()
+        if now is None:
+            now = datetime.now()
         
         # Use the most restrictive retention period
         cutoff_days = min(
@@ -380,10 +403,27 @@ class RetentionCleanup:
         
         return now - timedelta(days=cutoff_days)
     
+    def _get_cutoff_filter(self, columns: List[Tuple], cutoff_date: datetime) -> Optional[Tuple[str, Any]]:
+        """Get the column and bound value that select records older than the cutoff date.
+        
+        An integer ``ts_epoch`` column is preferred when present, since integer
+        comparisons are cheaper than comparing ISO-8601 text.
+        """
+        for col in columns:
+            if col[1].lower() == 'ts_epoch':
+                return col[1], int(cutoff_date.timestamp())
+        
+        for col in columns:
+            col_name = col[1].lower()
+            if col_name in ['timestamp', 'created_at', 'date', 'time']:
+                return col[1], cutoff_date
+        
+        return None
+    
     async def _get_records_to_delete_with_cutoff(self, data_type: str, cutoff_date: datetime) -> List[Dict[str, Any]]:
         """Get records to delete with specific cutoff date."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 # Get table schema to determine timestamp column
@@ -391,17 +431,14 @@ class RetentionCleanup:
                 columns = cursor.fetchall()
                 
                 # Find timestamp column
-                timestamp_col = None
-                for col in columns:
-                    col_name = col[1].lower()
-                    if col_name in ['timestamp', 'created_at', 'date', 'time']:
-                        timestamp_col = col[1]
-                        break
+                cutoff_filter = self._get_cutoff_filter(columns, cutoff_date)
                 
-                if not timestamp_col:
+                if not cutoff_filter:
                     logger.warning(f"No timestamp column found for {data_type}")
                     return []
                 
+                timestamp_col, cutoff_value = cutoff_filter
+                
                 # Get records older than cutoff date
                 query = f"""
                     SELECT * FROM {data_type} 
@@ -409,7 +446,7 @@ class RetentionCleanup:
                     ORDER BY {timestamp_col} ASC
                 """
                 
-                cursor.execute(query, (cutoff_date,))
+                cursor.execute(query, (cutoff_value,))
                 records = cursor.fetchall()
                 
                 # Convert to list of dictionaries
@@ -422,40 +459,45 @@ class RetentionCleanup:
             logger.error(f"Failed to get records to delete for {data_type}: {e}")
             return []
     
-    async def _delete_records_with_verification(self, data_type: str, records: List[Dict[str, Any]], cutoff_date: datetime) -> int:
-        """Delete records with extra verification for critical data."""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Get timestamp column
-                cursor.execute(f"PRAGMA table_info({data_type})")
-                columns = cursor.fetchall()
-                timestamp_col = None
-                for col in columns:
-                    col_name = col[1].lower()
-                    if col_name in ['timestamp', 'created_at', 'date', 'time']:
-                        timestamp_col = col[1]
-                        break
-                
-                if not timestamp_col:
-                    raise ValueError(f"No timestamp column found for {data_type}")
-                
+    async def _delete_by_cutoff(self, data_type: str, cutoff_date: datetime, verify: bool = False) -> int:
+        """Delete all records older than the cutoff date with a single range DELETE."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            
+            # Get timestamp column
+            cursor.execute(f"PRAGMA table_info({data_type})")
+            columns = cursor.fetchall()
+            cutoff_filter = self._get_cutoff_filter(columns, cutoff_date)
+            
+            if not cutoff_filter:
+                raise ValueError(f"No timestamp column found for {data_type}")
+            
+            timestamp_col, cutoff_value = cutoff_filter
+            
+            if verify:
                 # Count records before deletion
                 count_before = cursor.execute(f"SELECT COUNT(*) FROM {data_type}").fetchone()[0]
-                
-                # Delete records with verification
-                delete_query = f"DELETE FROM {data_type} WHERE {timestamp_col} < ?"
-                cursor.execute(delete_query, (cutoff_date,))
-                
+            
+            cursor.execute(f"DELETE FROM {data_type} WHERE {timestamp_col} < ?", (cutoff_value,))
+            deleted_count = cursor.rowcount
+            
+            if verify:
                 # Verify deletion
                 count_after = cursor.execute(f"SELECT COUNT(*) FROM {data_type}").fetchone()[0]
-                deleted_count = count_before - count_after
-                
-                conn.commit()
-                
-                logger.info(f"Verified deletion of {deleted_count} critical records from {data_type}")
-                return deleted_count
+                if count_before - count_after != deleted_count:
+                    raise ValueError(
+                        f"Deletion verification failed for {data_type}: "
+                        f"expected {deleted_count} fewer records, found {count_before - count_after}"
+                    )
+            
+            return deleted_count
+    
+    async def _delete_records_with_verification(self, data_type: str, records: List[Dict[str, Any]], cutoff_date: datetime) -> int:
+        """Delete records with extra verification for critical data."""
+        try:
+            deleted_count = await self._delete_by_cutoff(data_type, cutoff_date, verify=True)
+            logger.info(f"Verified deletion of {deleted_count} critical records from {data_type}")
+            return deleted_count
                 
         except Exception as e:
             logger.error(f"Failed to delete records with verification for {data_type}: {e}")
@@ -464,31 +506,9 @@ class RetentionCleanup:
     async def _delete_records_standard(self, data_type: str, records: List[Dict[str, Any]], cutoff_date: datetime) -> int:
         """Delete records with standard verification for important data."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Get timestamp column
-                cursor.execute(f"PRAGMA table_info({data_type})")
-                columns = cursor.fetchall()
-                timestamp_col = None
-                for col in columns:
-                    col_name = col[1].lower()
-                    if col_name in ['timestamp', 'created_at', 'date', 'time']:
-                        timestamp_col = col[1]
-                        break
-                
-                if not timestamp_col:
-                    raise ValueError(f"No timestamp column found for {data_type}")
-                
-                # Delete records
-                delete_query = f"DELETE FROM {data_type} WHERE {timestamp_col} < ?"
-                cursor.execute(delete_query, (cutoff_date,))
-                deleted_count = cursor.rowcount
-                
-                conn.commit()
-                
-                logger.info(f"Deleted {deleted_count} important records from {data_type}")
-                return deleted_count
+            deleted_count = await self._delete_by_cutoff(data_type, cutoff_date)
+            logger.info(f"Deleted {deleted_count} important records from {data_type}")
+            return deleted_count
                 
         except Exception as e:
             logger.error(f"Failed to delete records for {data_type}: {e}")
@@ -497,31 +517,9 @@ class RetentionCleanup:
     async def _delete_records_minimal(self, data_type: str, records: List[Dict[str, Any]], cutoff_date: datetime) -> int:
         """Delete records with minimal verification for operational data."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Get timestamp column
-                cursor.execute(f"PRAGMA table_info({data_type})")
-                columns = cursor.fetchall()
-                timestamp_col = None
-                for col in columns:
-                    col_name = col[1].lower()
-                    if col_name in ['timestamp', 'created_at', 'date', 'time']:
-                        timestamp_col = col[1]
-                        break
-                
-                if not timestamp_col:
-                    raise ValueError(f"No timestamp column found for {data_type}")
-                
-                # Delete records with minimal verification
-                delete_query = f"DELETE FROM {data_type} WHERE {timestamp_col} < ?"
-                cursor.execute(delete_query, (cutoff_date,))
-                deleted_count = cursor.rowcount
-                
-                conn.commit()
-                
-                logger.info(f"Deleted {deleted_count} operational records from {data_type}")
-                return deleted_count
+            deleted_count = await self._delete_by_cutoff(data_type, cutoff_date)
+            logger.info(f"Deleted {deleted_count} operational records from {data_type}")
+            return deleted_count
                 
         except Exception as e:
             logger.error(f"Failed to delete records for {data_type}: {e}")
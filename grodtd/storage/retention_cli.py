@@ -66,6 +66,8 @@ async def run_cleanup(args):
     except Exception as e:
         print(f"Cleanup failed: {e}")
         return 0
+    finally:
+        retention_manager.close()
 
 
 async def show_status(args):
@@ -97,6 +99,8 @@ async def show_status(args):
         
     except Exception as e:
         print(f"Failed to get status: {e}")
+    finally:
+        retention_manager.close()
 
 
 async def show_policies(args):
@@ -122,6 +126,8 @@ async def show_policies(args):
         
     except Exception as e:
         print(f"Failed to show policies: {e}")
+    finally:
+        retention_manager.close()
 
 
 async def show_storage(args):
@@ -151,6 +157,8 @@ async def show_storage(args):
         
     except Exception as e:
         print(f"Failed to get storage info: {e}")
+    finally:
+        retention_manager.close()
 
 
 async def test_cleanup(args):
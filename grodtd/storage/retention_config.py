@@ -14,6 +14,12 @@ try:
 except ImportError:
     from retention_models import RetentionConfig, RetentionPolicy, DataPriority
 
+# Prefer the libyaml-backed loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,7 +35,7 @@ class RetentionConfigManager:
         try:
             if self.config_path.exists():
                 with open(self.config_path, 'r') as f:
-                    config_data = yaml.safe_load(f)
+                    config_data = yaml.load(f, Loader=YamlLoader)
             else:
                 logger.warning(f"Config file not found at {self.config_path}. Using defaults.")
                 config_data = self._get_default_config()
@@ -190,7 +196,7 @@ class RetentionConfigManager:
         try:
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
             with open(self.config_path, 'w') as f:
-                yaml.dump(config_data, f, default_flow_style=False, indent=2)
+                yaml.dump(config_data, f, Dumper=YamlDumper, default_flow_style=False, indent=2)
         except Exception as e:
             logger.error(f"Failed to save config: {e}")
     
@@ -7,6 +7,7 @@ This module handles data integrity verification, archival processes, and recover
 import hashlib
 import json
 import logging
+import pickle
 import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -35,7 +36,7 @@ class DataIntegrityManager:
         
         # Integrity verification settings
         self.integrity_log_file = self.logs_dir / "integrity_verification.jsonl"
-        self.checksum_file = self.logs_dir / "data_checksums.json"
+        self.checksum_file = self.logs_dir / "data_checksums.pkl"
     
     async def verify_database_integrity(self) -> Dict[str, Any]:
         """Verify database integrity before cleanup operations."""
@@ -377,8 +378,9 @@ class DataIntegrityManager:
                 "table_checksums": table_checksums
             }
             
-            with open(self.checksum_file, 'w') as f:
-                json.dump(checksum_data, f, indent=2)
+            # Locally produced, never untrusted input, so pickle is safe here
+            with open(self.checksum_file, 'wb') as f:
+                pickle.dump(checksum_data, f, protocol=pickle.HIGHEST_PROTOCOL)
             
             return {
                 "status": "passed",
@@ -561,12 +563,18 @@ class DataIntegrityManager:
                     if lines:
                         latest_verification = json.loads(lines[-1])
             
+            # Get latest checksum snapshot
+            latest_checksum = None
+            if self.checksum_file.exists():
+                with open(self.checksum_file, 'rb') as f:
+                    latest_checksum = pickle.load(f)
+            
             # Get available backups
             backup_files = list(self.backup_dir.glob("*.db"))
             backup_metadata = []
             
             for backup_file in backup_files:
-                metadata_file = backup_file.with_suffix('_metadata.json')
+                metadata_file = self.backup_dir / f"{backup_file.stem}_metadata.json"
                 if metadata_file.exists():
                     with open(metadata_file, 'r') as f:
                         metadata = json.load(f)
@@ -576,6 +584,7 @@ class DataIntegrityManager:
                 "timestamp": datetime.now().isoformat(),
                 "database_path": str(self.db_path),
                 "latest_verification": latest_verification,
+                "latest_checksum": latest_checksum,
                 "available_backups": len(backup_files),
                 "backup_metadata": backup_metadata,
                 "integrity_log_file": str(self.integrity_log_file),
@@ -37,14 +37,14 @@ class RetentionManager:
     This class coordinates configuration, cleanup operations, and logging.
     """
     
-    def __init__(self, config_path: str, db_path: str):
+    def __init__(self, config_path: str, db_path: str, db_conn: Optional[sqlite3.Connection] = None):
         self.config_path = config_path
         self.db_path = db_path
         
         # Initialize components
         self.config_manager = RetentionConfigManager(config_path)
         self.logger = RetentionLogger()
-        self.cleanup = RetentionCleanup(db_path)
+        self.cleanup = RetentionCleanup(db_path, db_conn)
         self.monitor = StorageMonitor(db_path)
         self.integrity = DataIntegrityManager(db_path)
         
@@ -189,6 +189,9 @@ class RetentionManager:
     
     async def restore_from_backup(self, backup_name: str, verify_integrity: bool = True) -> Dict[str, Any]:
         """Restore database from backup with integrity verification."""
+        # The restore replaces the database file; drop the cleanup connection
+        # and its memory map first, it is reopened lazily on next use
+        self.cleanup.close()
         return await self.integrity.restore_from_backup(backup_name, verify_integrity)
     
     async def get_integrity_status(self) -> Dict[str, Any]:
@@ -255,6 +258,10 @@ class RetentionManager:
         logger.warning("Rollback functionality not implemented - manual intervention required")
         # This would restore from backup if available
     
+    def close(self):
+        """Release the database connection held by the cleanup component."""
+        self.cleanup.close()
+    
     def get_retention_status(self) -> Dict[str, Any]:
         """Get current retention system status."""
         try:
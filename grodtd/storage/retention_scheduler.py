@@ -175,6 +175,7 @@ class RetentionScheduler:
             except asyncio.CancelledError:
                 pass
         
+        self.retention_manager.close()
         self.logger.info("Retention scheduler stopped")
     
     async def _scheduler_loop(self):
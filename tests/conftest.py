@@ -0,0 +1,26 @@
+"""
+Shared pytest configuration.
+"""
+
+import os
+from pathlib import Path
+
+
+# RAM-backed filesystem used for tmp_path/tmp_path_factory when available
+_SHM_ROOT = Path("/dev/shm")
+
+
+def pytest_configure(config):
+    """Keep pytest's temporary directories in RAM when possible.
+
+    The storage tests write parquet, CSV and JSON files into tmp_path, so
+    placing the temp root on tmpfs avoids disk writeback. An explicit
+    --basetemp or PYTEST_DEBUG_TEMPROOT still takes precedence. Platforms
+    without /dev/shm (e.g. Windows) keep the default temp directory; point
+    PYTEST_DEBUG_TEMPROOT at a RAM disk there to get the same effect.
+    """
+    if config.option.basetemp or "PYTEST_DEBUG_TEMPROOT" in os.environ:
+        return
+
+    if _SHM_ROOT.is_dir() and os.access(_SHM_ROOT, os.W_OK):
+        os.environ["PYTEST_DEBUG_TEMPROOT"] = str(_SHM_ROOT)
@@ -45,6 +45,8 @@ class TestFeatureStoreSystemIntegration(unittest.TestCase):
     def tearDown(self):
         """Clean up test environment."""
         import shutil
+        self.api.close()
+        self.feature_store.close()
         shutil.rmtree(self.temp_dir)
     
     def _create_sample_data(self):
@@ -6,6 +6,7 @@ Tests data integrity verification, archival processes, and recovery procedures.
 
 import asyncio
 import json
+import pickle
 import sqlite3
 import tempfile
 import unittest
@@ -21,6 +22,77 @@ sys.path.append('grodtd/storage')
 from retention_integrity import DataIntegrityManager
 
 
+def _create_test_database(db_path):
+    """Create test database with sample data."""
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        
+        # Create test tables
+        cursor.execute("""
+            CREATE TABLE trades (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                quantity REAL NOT NULL,
+                price REAL NOT NULL
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE orders (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                side TEXT NOT NULL,
+                quantity REAL NOT NULL,
+                trade_id INTEGER,
+                FOREIGN KEY (trade_id) REFERENCES trades(id)
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE market_data (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                price REAL NOT NULL,
+                volume REAL NOT NULL
+            )
+        """)
+        
+        # Create indexes
+        cursor.execute("CREATE INDEX idx_trades_timestamp ON trades(timestamp)")
+        cursor.execute("CREATE INDEX idx_orders_timestamp ON orders(timestamp)")
+        cursor.execute("CREATE INDEX idx_market_data_timestamp ON market_data(timestamp)")
+        
+        # Insert sample data
+        base_time = datetime.now() - timedelta(days=30)
+        
+        for i in range(50):
+            timestamp = (base_time + timedelta(hours=i)).isoformat()
+            
+            # Insert trade
+            cursor.execute(
+                "INSERT INTO trades (timestamp, symbol, quantity, price) VALUES (?, ?, ?, ?)",
+                (timestamp, "AAPL", 100.0, 150.0 + i)
+            )
+            trade_id = cursor.lastrowid
+            
+            # Insert order
+            cursor.execute(
+                "INSERT INTO orders (timestamp, symbol, side, quantity, trade_id) VALUES (?, ?, ?, ?, ?)",
+                (timestamp, "AAPL", "BUY", 100.0, trade_id)
+            )
+            
+            # Insert market data
+            cursor.execute(
+                "INSERT INTO market_data (timestamp, symbol, price, volume) VALUES (?, ?, ?, ?)",
+                (timestamp, "AAPL", 150.0 + i, 1000.0)
+            )
+        
+        conn.commit()
+
+
 class TestDataIntegrityManager(unittest.TestCase):
     """Test data integrity preservation functionality."""
     
@@ -32,7 +104,7 @@ class TestDataIntegrityManager(unittest.TestCase):
         self.logs_dir = Path(self.temp_dir) / "logs"
         
         # Create test database
-        self._create_test_database()
+        _create_test_database(self.db_path)
         
         # Create integrity manager
         self.integrity_manager = DataIntegrityManager(
@@ -46,76 +118,6 @@ class TestDataIntegrityManager(unittest.TestCase):
         import shutil
         shutil.rmtree(self.temp_dir)
     
-    def _create_test_database(self):
-        """Create test database with sample data."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Create test tables
-            cursor.execute("""
-                CREATE TABLE trades (
-                    id INTEGER PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    symbol TEXT NOT NULL,
-                    quantity REAL NOT NULL,
-                    price REAL NOT NULL
-                )
-            """)
-            
-            cursor.execute("""
-                CREATE TABLE orders (
-                    id INTEGER PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    symbol TEXT NOT NULL,
-                    side TEXT NOT NULL,
-                    quantity REAL NOT NULL,
-                    trade_id INTEGER,
-                    FOREIGN KEY (trade_id) REFERENCES trades(id)
-                )
-            """)
-            
-            cursor.execute("""
-                CREATE TABLE market_data (
-                    id INTEGER PRIMARY KEY,
-                    timestamp TEXT NOT NULL,
-                    symbol TEXT NOT NULL,
-                    price REAL NOT NULL,
-                    volume REAL NOT NULL
-                )
-            """)
-            
-            # Create indexes
-            cursor.execute("CREATE INDEX idx_trades_timestamp ON trades(timestamp)")
-            cursor.execute("CREATE INDEX idx_orders_timestamp ON orders(timestamp)")
-            cursor.execute("CREATE INDEX idx_market_data_timestamp ON market_data(timestamp)")
-            
-            # Insert sample data
-            base_time = datetime.now() - timedelta(days=30)
-            
-            for i in range(50):
-                timestamp = (base_time + timedelta(hours=i)).isoformat()
-                
-                # Insert trade
-                cursor.execute(
-                    "INSERT INTO trades (timestamp, symbol, quantity, price) VALUES (?, ?, ?, ?)",
-                    (timestamp, "AAPL", 100.0, 150.0 + i)
-                )
-                trade_id = cursor.lastrowid
-                
-                # Insert order
-                cursor.execute(
-                    "INSERT INTO orders (timestamp, symbol, side, quantity, trade_id) VALUES (?, ?, ?, ?, ?)",
-                    (timestamp, "AAPL", "BUY", 100.0, trade_id)
-                )
-                
-                # Insert market data
-                cursor.execute(
-                    "INSERT INTO market_data (timestamp, symbol, price, volume) VALUES (?, ?, ?, ?)",
-                    (timestamp, "AAPL", 150.0 + i, 1000.0)
-                )
-            
-            conn.commit()
-    
     @pytest.mark.asyncio
     async def test_verify_database_integrity(self):
         """Test database integrity verification."""
@@ -210,29 +212,6 @@ class TestDataIntegrityManager(unittest.TestCase):
         index_checks = result['index_checks']
         self.assertGreater(len(index_checks), 0)
     
-    @pytest.mark.asyncio
-    async def test_calculate_database_checksum(self):
-        """Test database checksum calculation."""
-        result = await self.integrity_manager._calculate_database_checksum()
-        
-        self.assertEqual(result['status'], 'passed')
-        self.assertIn('message', result)
-        self.assertIn('file_checksum', result)
-        self.assertIn('content_checksum', result)
-        self.assertIn('table_count', result)
-        
-        # Verify checksum file was created
-        self.assertTrue(self.integrity_manager.checksum_file.exists())
-        
-        # Load and verify checksum data
-        with open(self.integrity_manager.checksum_file, 'r') as f:
-            checksum_data = json.load(f)
-        
-        self.assertIn('timestamp', checksum_data)
-        self.assertIn('file_checksum', checksum_data)
-        self.assertIn('content_checksum', checksum_data)
-        self.assertIn('table_checksums', checksum_data)
-    
     @pytest.mark.asyncio
     async def test_create_integrity_backup(self):
         """Test creating integrity backup."""
@@ -302,30 +281,6 @@ class TestDataIntegrityManager(unittest.TestCase):
             count = cursor.fetchone()[0]
             self.assertEqual(count, 0)  # Should be 0 after restore
     
-    @pytest.mark.asyncio
-    async def test_get_integrity_status(self):
-        """Test getting integrity status."""
-        # Create a backup and run integrity check first
-        await self.integrity_manager.create_integrity_backup("status_test_backup")
-        await self.integrity_manager.verify_database_integrity()
-        
-        result = await self.integrity_manager.get_integrity_status()
-        
-        self.assertIsNotNone(result)
-        self.assertIn('timestamp', result)
-        self.assertIn('database_path', result)
-        self.assertIn('latest_verification', result)
-        self.assertIn('available_backups', result)
-        self.assertIn('backup_metadata', result)
-        self.assertIn('integrity_log_file', result)
-        self.assertIn('checksum_file', result)
-        
-        # Should have at least one backup
-        self.assertGreater(result['available_backups'], 0)
-        
-        # Should have latest verification
-        self.assertIsNotNone(result['latest_verification'])
-    
     def test_log_integrity_verification(self):
         """Test logging integrity verification."""
         verification_result = {
@@ -349,5 +304,62 @@ class TestDataIntegrityManager(unittest.TestCase):
             self.assertEqual(last_entry['status'], 'passed')
 
 
+@pytest.fixture
+def integrity_manager(tmp_path):
+    """Integrity manager over a fresh test database in tmp_path."""
+    db_path = tmp_path / "test.db"
+    _create_test_database(db_path)
+    return DataIntegrityManager(str(db_path), str(tmp_path / "backups"), str(tmp_path / "logs"))
+
+
+@pytest.mark.asyncio
+async def test_calculate_database_checksum(integrity_manager):
+    """Test database checksum calculation."""
+    result = await integrity_manager._calculate_database_checksum()
+    
+    assert result['status'] == 'passed'
+    assert 'message' in result
+    assert 'file_checksum' in result
+    assert 'content_checksum' in result
+    assert 'table_count' in result
+    
+    # Verify checksum file was created
+    assert integrity_manager.checksum_file.exists()
+    
+    # Load and verify checksum data
+    with open(integrity_manager.checksum_file, 'rb') as f:
+        checksum_data = pickle.load(f)
+    
+    assert 'timestamp' in checksum_data
+    assert checksum_data['file_checksum'] == result['file_checksum']
+    assert checksum_data['content_checksum'] == result['content_checksum']
+    assert 'table_checksums' in checksum_data
+
+
+@pytest.mark.asyncio
+async def test_get_integrity_status(integrity_manager):
+    """Test getting integrity status."""
+    # Create a backup and run integrity check first
+    await integrity_manager.create_integrity_backup("status_test_backup")
+    await integrity_manager.verify_database_integrity()
+    
+    result = await integrity_manager.get_integrity_status()
+    
+    assert result is not None
+    for key in ('timestamp', 'database_path', 'latest_verification', 'available_backups',
+                'backup_metadata', 'integrity_log_file', 'checksum_file'):
+        assert key in result
+    
+    # Should have at least one backup, with its metadata
+    assert result['available_backups'] > 0
+    assert len(result['backup_metadata']) == result['available_backups']
+    
+    # Should have latest verification
+    assert result['latest_verification'] is not None
+    
+    # Should expose the latest checksum snapshot
+    assert 'file_checksum' in result['latest_checksum']
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -5,269 +5,328 @@ Tests the different retention approaches for critical, important, and operationa
 """
 
 import asyncio
-import tempfile
 import unittest
 from datetime import datetime, timedelta
-from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock, AsyncMock
+from unittest.mock import patch
 
 import pytest
 import sqlite3
 import yaml
 
-# Import the modules to test
-import sys
-sys.path.append('grodtd/storage')
-from retention_manager import RetentionManager, create_retention_manager
-from retention_models import RetentionPolicy, DataPriority, CleanupOperation
+from grodtd.storage.retention_config import YamlDumper
+from grodtd.storage.retention_manager import RetentionManager
+from grodtd.storage.retention_models import RetentionPolicy, DataPriority, CleanupOperation
 
 
-class TestDataTypeRetentionLogic(unittest.TestCase):
-    """Test data type-specific retention logic functionality."""
+_CONFIG_DICT = {
+    'global': {
+        'enabled': True,
+        'cleanup_schedule': '03:00',
+        'dry_run': False,
+        'max_storage_gb': 50
+    },
+    'scheduler': {
+        'enabled': True,
+        'cleanup_schedule': '03:00',
+        'check_interval_minutes': 60,
+        'max_cleanup_duration_hours': 4,
+        'backup_before_cleanup': True,
+        'notification_channels': ['log', 'console'],
+        'log_level': 'INFO',
+        'dry_run': False
+    },
+    'retention_policies': {
+        'trades': {
+            'enabled': True,
+            'retention_days': 30,
+            'retention_weeks': 4,
+            'retention_months': 6,
+            'retention_years': 1,
+            'priority': 'critical',
+            'description': 'Trade records'
+        },
+        'orders': {
+            'enabled': True,
+            'retention_days': 30,
+            'retention_weeks': 4,
+            'retention_months': 6,
+            'retention_years': 1,
+            'priority': 'critical',
+            'description': 'Order records'
+        },
+        'positions': {
+            'enabled': True,
+            'retention_days': 30,
+            'retention_weeks': 4,
+            'retention_months': 6,
+            'retention_years': 1,
+            'priority': 'critical',
+            'description': 'Position records'
+        },
+        'equity_curve': {
+            'enabled': True,
+            'retention_days': 15,
+            'retention_weeks': 2,
+            'retention_months': 3,
+            'retention_years': 1,
+            'priority': 'important',
+            'description': 'Equity curve data'
+        },
+        'market_data': {
+            'enabled': True,
+            'retention_days': 7,
+            'retention_weeks': 1,
+            'retention_months': 1,
+            'retention_years': 1,
+            'priority': 'operational',
+            'description': 'Market data'
+        }
+    },
+    'cleanup': {
+        'batch_size': 100,
+        'max_cleanup_time_hours': 1,
+        'backup_before_cleanup': False,
+        'verify_integrity': True,
+        'rollback_on_failure': True,
+        'log_cleanup_operations': True,
+        'create_audit_trail': True,
+        'send_notifications': False
+    },
+    'storage_monitoring': {
+        'enabled': True,
+        'check_interval_hours': 6,
+        'warning_threshold_percent': 80,
+        'critical_threshold_percent': 95,
+        'auto_cleanup_on_warning': False,
+        'auto_cleanup_on_critical': True,
+        'generate_reports': True,
+        'report_frequency': 'weekly',
+        'include_trends': True
+    },
+    'data_integrity': {
+        'verify_before_cleanup': True,
+        'checksum_verification': True,
+        'backup_verification': True,
+        'enable_recovery': True,
+        'recovery_window_days': 7,
+        'test_recovery_procedures': True
+    },
+    'notifications': {
+        'enabled': False,
+        'channels': ['log'],
+        'on_cleanup_start': True,
+        'on_cleanup_complete': True,
+        'on_cleanup_failure': True,
+        'on_storage_warning': True,
+        'on_storage_critical': True,
+        'include_statistics': True,
+        'include_storage_info': True,
+        'include_error_details': True
+    },
+    'compliance': {
+        'audit_enabled': True,
+        'audit_retention_days': 2555,
+        'log_data_access': True,
+        'log_cleanup_decisions': True,
+        'generate_compliance_reports': True,
+        'report_frequency': 'monthly',
+        'include_data_lineage': True
+    }
+}
+
+_CONFIG_YAML = yaml.dump(
+    _CONFIG_DICT, Dumper=YamlDumper, default_flow_style=False, indent=2
+).encode()
+
+
+# Fixture INSERT statements, kept as constants so sqlite3's statement cache reuses them
+_INSERT_TRADE = "INSERT INTO trades (timestamp, ts_epoch, symbol, side, price, quantity) VALUES (?, ?, ?, ?, ?, ?)"
+_INSERT_ORDER = "INSERT INTO orders (timestamp, ts_epoch, symbol, status, quantity, price) VALUES (?, ?, ?, ?, ?, ?)"
+_INSERT_POSITION = "INSERT INTO positions (timestamp, ts_epoch, symbol, quantity, average_price) VALUES (?, ?, ?, ?, ?)"
+_INSERT_EQUITY = "INSERT INTO equity_curve (timestamp, ts_epoch, portfolio_value) VALUES (?, ?, ?)"
+_INSERT_MARKET_DATA = (
+    "INSERT INTO market_data (timestamp, ts_epoch, symbol, open, high, low, close, volume) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _timestamps(now, count, step_days):
+    """Return ``count`` (ISO-8601, epoch seconds) pairs stepping back from ``now`` by ``step_days``.
+    
+    Both values of a pair come from the same local datetime, so they agree
+    across DST changes just as the cleanup's cutoff conversion does.
+    """
+    moments = [now - timedelta(days=i * step_days) for i in range(count)]
+    return [(moment.isoformat(timespec='microseconds'), int(moment.timestamp())) for moment in moments]
+
+
+def _create_test_database(conn):
+    """Create test database with sample data."""
+    conn.execute("PRAGMA temp_store=MEMORY")
+    # Deleted pages stay on the freelist; reclaiming space is a separate maintenance job,
+    # so nothing exercised here depends on VACUUM
+    conn.execute("PRAGMA auto_vacuum=NONE")
     
-    def setUp(self):
-        """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_path = Path(self.temp_dir) / "retention.yaml"
-        self.db_path = Path(self.temp_dir) / "test.db"
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
         
-        # Create test database
-        self._create_test_database()
+        # Create tables for different data types
+        cursor.execute("""
+            CREATE TABLE trades (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT,
+                ts_epoch INTEGER,
+                symbol TEXT,
+                side TEXT,
+                price REAL,
+                quantity INTEGER
+            )
+        """)
         
-        # Create test configurations
-        self._create_retention_config()
+        cursor.execute("""
+            CREATE TABLE orders (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT,
+                ts_epoch INTEGER,
+                symbol TEXT,
+                status TEXT,
+                quantity INTEGER,
+                price REAL
+            )
+        """)
         
-        # Create retention manager
-        self.retention_manager = RetentionManager(str(self.config_path), str(self.db_path))
-    
-    def tearDown(self):
-        """Clean up test fixtures."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+        cursor.execute("""
+            CREATE TABLE positions (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT,
+                ts_epoch INTEGER,
+                symbol TEXT,
+                quantity INTEGER,
+                average_price REAL
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE equity_curve (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT,
+                ts_epoch INTEGER,
+                portfolio_value REAL
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE market_data (
+                id INTEGER PRIMARY KEY,
+                timestamp TEXT,
+                ts_epoch INTEGER,
+                symbol TEXT,
+                open REAL,
+                high REAL,
+                low REAL,
+                close REAL,
+                volume INTEGER
+            )
+        """)
+        
+        # Index the epoch columns the retention cutoff queries filter on;
+        # integer keys compare faster and pack tighter than ISO-8601 text
+        for table in ('trades', 'orders', 'positions', 'equity_curve', 'market_data'):
+            cursor.execute(f"CREATE INDEX idx_{table}_epoch ON {table}(ts_epoch)")
+        
+        # Per-symbol cleanups (WHERE symbol = ? AND ts_epoch < ?) are served by one index scan.
+        # Tables keep their rowid: DataIntegrityManager's checksum orders by rowid.
+        for table in ('trades', 'orders', 'positions', 'market_data'):
+            cursor.execute(f"CREATE INDEX idx_{table}_symbol_epoch ON {table}(symbol, ts_epoch)")
+        
+        # Insert test data with varying ages
+        now = datetime.now()
+        
+        # Critical data - older records (should be preserved longer)
+        trade_rows = [
+            (ts, epoch, f"SYM{i%5}", "BUY" if i%2==0 else "SELL", 100.0 + i, 100)
+            for i, (ts, epoch) in enumerate(_timestamps(now, 20, 10))
+        ]
+        order_rows = [
+            (ts, epoch, f"ORD{i%3}", "FILLED", 50, 100.0 + i)
+            for i, (ts, epoch) in enumerate(_timestamps(now, 20, 8))
+        ]
+        position_rows = [
+            (ts, epoch, f"POS{i%4}", 25, 100.0 + i)
+            for i, (ts, epoch) in enumerate(_timestamps(now, 20, 12))
+        ]
+        cursor.executemany(_INSERT_TRADE, trade_rows)
+        cursor.executemany(_INSERT_ORDER, order_rows)
+        cursor.executemany(_INSERT_POSITION, position_rows)
+        
+        # Important data - medium age records
+        equity_rows = [
+            (ts, epoch, 10000.0 + i*100)
+            for i, (ts, epoch) in enumerate(_timestamps(now, 15, 5))
+        ]
+        cursor.executemany(_INSERT_EQUITY, equity_rows)
+        
+        # Operational data - newer records (can be cleaned more aggressively)
+        market_rows = [
+            (ts, epoch, f"MKT{i%5}", 100.0 + i, 105.0 + i, 95.0 + i, 102.0 + i, 1000 + i)
+            for i, (ts, epoch) in enumerate(_timestamps(now, 30, 2))
+        ]
+        cursor.executemany(_INSERT_MARKET_DATA, market_rows)
+        
+        conn.commit()
+
+
+@pytest.fixture(scope="module")
+def retention_db(tmp_path_factory):
+    """Shared in-memory test database plus the config and file paths it needs."""
+    temp_dir = tmp_path_factory.mktemp("retention")
+    config_path = temp_dir / "retention.yaml"
+    db_path = temp_dir / "test.db"
+    config_path.write_bytes(_CONFIG_YAML)
     
-    def _create_test_database(self):
-        """Create test database with sample data."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Create tables for different data types
-            cursor.execute("""
-                CREATE TABLE trades (
-                    id INTEGER PRIMARY KEY,
-                    timestamp TEXT,
-                    symbol TEXT,
-                    side TEXT,
-                    price REAL,
-                    quantity INTEGER
-                )
-            """)
-            
-            cursor.execute("""
-                CREATE TABLE orders (
-                    id INTEGER PRIMARY KEY,
-                    timestamp TEXT,
-                    symbol TEXT,
-                    status TEXT,
-                    quantity INTEGER,
-                    price REAL
-                )
-            """)
-            
-            cursor.execute("""
-                CREATE TABLE positions (
-                    id INTEGER PRIMARY KEY,
-                    timestamp TEXT,
-                    symbol TEXT,
-                    quantity INTEGER,
-                    average_price REAL
-                )
-            """)
-            
-            cursor.execute("""
-                CREATE TABLE equity_curve (
-                    id INTEGER PRIMARY KEY,
-                    timestamp TEXT,
-                    portfolio_value REAL
-                )
-            """)
-            
-            cursor.execute("""
-                CREATE TABLE market_data (
-                    id INTEGER PRIMARY KEY,
-                    timestamp TEXT,
-                    symbol TEXT,
-                    open REAL,
-                    high REAL,
-                    low REAL,
-                    close REAL,
-                    volume INTEGER
-                )
-            """)
-            
-            # Insert test data with varying ages
-            now = datetime.now()
-            
-            # Critical data - older records (should be preserved longer)
-            for i in range(20):
-                trade_ts = (now - timedelta(days=i*10)).isoformat()
-                order_ts = (now - timedelta(days=i*8)).isoformat()
-                position_ts = (now - timedelta(days=i*12)).isoformat()
-                
-                cursor.execute("""
-                    INSERT INTO trades (timestamp, symbol, side, price, quantity)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (trade_ts, f"SYM{i%5}", "BUY" if i%2==0 else "SELL", 100.0 + i, 100))
-                
-                cursor.execute("""
-                    INSERT INTO orders (timestamp, symbol, status, quantity, price)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (order_ts, f"ORD{i%3}", "FILLED", 50, 100.0 + i))
-                
-                cursor.execute("""
-                    INSERT INTO positions (timestamp, symbol, quantity, average_price)
-                    VALUES (?, ?, ?, ?)
-                """, (position_ts, f"POS{i%4}", 25, 100.0 + i))
-            
-            # Important data - medium age records
-            for i in range(15):
-                equity_ts = (now - timedelta(days=i*5)).isoformat()
-                
-                cursor.execute("""
-                    INSERT INTO equity_curve (timestamp, portfolio_value)
-                    VALUES (?, ?)
-                """, (equity_ts, 10000.0 + i*100))
-            
-            # Operational data - newer records (can be cleaned more aggressively)
-            for i in range(30):
-                market_ts = (now - timedelta(days=i*2)).isoformat()
-                
-                cursor.execute("""
-                    INSERT INTO market_data (timestamp, symbol, open, high, low, close, volume)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (market_ts, f"MKT{i%5}", 100.0 + i, 105.0 + i, 95.0 + i, 102.0 + i, 1000 + i))
-            
-            conn.commit()
+    # Create test database in memory; the file copy is only for the
+    # monitoring and integrity components, which read the file directly
+    db_conn = sqlite3.connect(":memory:")
+    _create_test_database(db_conn)
+    with sqlite3.connect(db_path) as disk_conn:
+        db_conn.backup(disk_conn)
     
-    def _create_retention_config(self):
-        """Create test retention configuration."""
-        config = {
-            'global': {
-                'enabled': True,
-                'cleanup_schedule': '03:00',
-                'dry_run': False,
-                'max_storage_gb': 50
-            },
-            'scheduler': {
-                'enabled': True,
-                'cleanup_schedule': '03:00',
-                'check_interval_minutes': 60,
-                'max_cleanup_duration_hours': 4,
-                'backup_before_cleanup': True,
-                'notification_channels': ['log', 'console'],
-                'log_level': 'INFO',
-                'dry_run': False
-            },
-            'retention_policies': {
-                'trades': {
-                    'enabled': True,
-                    'retention_days': 30,
-                    'retention_weeks': 4,
-                    'retention_months': 6,
-                    'retention_years': 1,
-                    'priority': 'critical',
-                    'description': 'Trade records'
-                },
-                'orders': {
-                    'enabled': True,
-                    'retention_days': 30,
-                    'retention_weeks': 4,
-                    'retention_months': 6,
-                    'retention_years': 1,
-                    'priority': 'critical',
-                    'description': 'Order records'
-                },
-                'positions': {
-                    'enabled': True,
-                    'retention_days': 30,
-                    'retention_weeks': 4,
-                    'retention_months': 6,
-                    'retention_years': 1,
-                    'priority': 'critical',
-                    'description': 'Position records'
-                },
-                'equity_curve': {
-                    'enabled': True,
-                    'retention_days': 15,
-                    'retention_weeks': 2,
-                    'retention_months': 3,
-                    'retention_years': 1,
-                    'priority': 'important',
-                    'description': 'Equity curve data'
-                },
-                'market_data': {
-                    'enabled': True,
-                    'retention_days': 7,
-                    'retention_weeks': 1,
-                    'retention_months': 1,
-                    'retention_years': 1,
-                    'priority': 'operational',
-                    'description': 'Market data'
-                }
-            },
-            'cleanup': {
-                'batch_size': 100,
-                'max_cleanup_time_hours': 1,
-                'backup_before_cleanup': False,
-                'verify_integrity': True,
-                'rollback_on_failure': True,
-                'log_cleanup_operations': True,
-                'create_audit_trail': True,
-                'send_notifications': False
-            },
-            'storage_monitoring': {
-                'enabled': True,
-                'check_interval_hours': 6,
-                'warning_threshold_percent': 80,
-                'critical_threshold_percent': 95,
-                'auto_cleanup_on_warning': False,
-                'auto_cleanup_on_critical': True,
-                'generate_reports': True,
-                'report_frequency': 'weekly',
-                'include_trends': True
-            },
-            'data_integrity': {
-                'verify_before_cleanup': True,
-                'checksum_verification': True,
-                'backup_verification': True,
-                'enable_recovery': True,
-                'recovery_window_days': 7,
-                'test_recovery_procedures': True
-            },
-            'notifications': {
-                'enabled': False,
-                'channels': ['log'],
-                'on_cleanup_start': True,
-                'on_cleanup_complete': True,
-                'on_cleanup_failure': True,
-                'on_storage_warning': True,
-                'on_storage_critical': True,
-                'include_statistics': True,
-                'include_storage_info': True,
-                'include_error_details': True
-            },
-            'compliance': {
-                'audit_enabled': True,
-                'audit_retention_days': 2555,
-                'log_data_access': True,
-                'log_cleanup_decisions': True,
-                'generate_compliance_reports': True,
-                'report_frequency': 'monthly',
-                'include_data_lineage': True
-            }
-        }
-        
-        with open(self.config_path, 'w') as f:
-            yaml.dump(config, f, default_flow_style=False, indent=2)
+    yield config_path, db_path, db_conn
+    db_conn.close()
+
+
+@pytest.fixture(scope="module")
+def retention_manager(retention_db):
+    """Retention manager shared by tests that only run dry-run cleanups."""
+    config_path, db_path, db_conn = retention_db
+    manager = RetentionManager(str(config_path), str(db_path), db_conn=db_conn)
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def private_retention_manager(retention_db):
+    """Retention manager backed by a private copy of the shared database."""
+    config_path, db_path, db_conn = retention_db
+    private_conn = sqlite3.connect(":memory:")
+    db_conn.backup(private_conn)
+    manager = RetentionManager(str(config_path), str(db_path), db_conn=private_conn)
+    yield manager
+    manager.close()
+    private_conn.close()
+
+
+@pytest.fixture(scope="class")
+def shared_retention_db(request, retention_db, retention_manager):
+    """Expose the module's shared database and manager on a unittest class."""
+    request.cls.config_path, request.cls.db_path, request.cls.db_conn = retention_db
+    request.cls.retention_manager = retention_manager
+
+
+@pytest.mark.usefixtures("shared_retention_db")
+class TestDataTypeRetentionLogic(unittest.TestCase):
+    """Test data type-specific retention logic functionality."""
     
     def test_data_type_priority_order(self):
         """Test that data types are processed in priority order."""
@@ -283,187 +342,84 @@ class TestDataTypeRetentionLogic(unittest.TestCase):
     
     def test_conservative_cutoff_calculation(self):
         """Test conservative cutoff calculation for critical data."""
+        cleanup = self.retention_manager.cleanup
         policy = self.retention_manager.policies['trades']
-        conservative_cutoff = self.retention_manager._calculate_conservative_cutoff(policy)
+        frozen_now = datetime.now()
+        conservative_cutoff = cleanup._calculate_conservative_cutoff(policy, now=frozen_now)
         
         # Conservative cutoff should be more restrictive (older date)
-        standard_cutoff = self.retention_manager._calculate_cutoff_date(policy)
+        standard_cutoff = cleanup._calculate_standard_cutoff(policy, now=frozen_now)
         self.assertLess(conservative_cutoff, standard_cutoff)
         
         # Should use the longest retention period with 10% buffer
         # Based on the actual policy values: retention_days=30, retention_weeks=4, retention_months=6, retention_years=1
-        expected_days = max(30, 4*7, 6*30, 1*365) * 1.1  # max(30, 28, 180, 365) * 1.1 = 365 * 1.1 = 401.5
-        expected_cutoff = datetime.now() - timedelta(days=expected_days)
-        
-        # Allow for larger time differences due to calculation timing
-        time_diff = abs((conservative_cutoff - expected_cutoff).total_seconds())
-        self.assertLess(time_diff, 86400)  # Within 1 day
+        expected_days = int(max(30, 4*7, 6*30, 1*365) * 1.1)  # int(365 * 1.1) = 401
+        self.assertEqual(conservative_cutoff, frozen_now - timedelta(days=expected_days))
     
     def test_balanced_cutoff_calculation(self):
         """Test balanced cutoff calculation for important data."""
+        cleanup = self.retention_manager.cleanup
         policy = self.retention_manager.policies['equity_curve']
-        balanced_cutoff = self.retention_manager._calculate_balanced_cutoff(policy)
+        frozen_now = datetime.now()
+        balanced_cutoff = cleanup._calculate_balanced_cutoff(policy, now=frozen_now)
         
-        # Balanced cutoff should match standard cutoff (allow for small timing differences)
-        standard_cutoff = self.retention_manager._calculate_cutoff_date(policy)
-        time_diff = abs((balanced_cutoff - standard_cutoff).total_seconds())
-        self.assertLess(time_diff, 1)  # Within 1 second
+        # Balanced cutoff should match standard cutoff
+        standard_cutoff = cleanup._calculate_standard_cutoff(policy, now=frozen_now)
+        self.assertEqual(balanced_cutoff, standard_cutoff)
     
     def test_aggressive_cutoff_calculation(self):
         """Test aggressive cutoff calculation for operational data."""
+        cleanup = self.retention_manager.cleanup
         policy = self.retention_manager.policies['market_data']
-        aggressive_cutoff = self.retention_manager._calculate_aggressive_cutoff(policy)
+        frozen_now = datetime.now()
+        aggressive_cutoff = cleanup._calculate_aggressive_cutoff(policy, now=frozen_now)
         
         # Aggressive cutoff should be less restrictive (newer date)
-        standard_cutoff = self.retention_manager._calculate_cutoff_date(policy)
+        standard_cutoff = cleanup._calculate_standard_cutoff(policy, now=frozen_now)
         self.assertGreater(aggressive_cutoff, standard_cutoff)
         
         # Should use the shortest retention period with 10% reduction
         # Based on the actual policy values: retention_days=7, retention_weeks=1, retention_months=1, retention_years=1
-        expected_days = min(7, 1*7, 1*30, 1*365) * 0.9  # min(7, 7, 30, 365) * 0.9 = 7 * 0.9 = 6.3
-        expected_cutoff = datetime.now() - timedelta(days=expected_days)
-        
-        # Allow for larger time differences due to calculation timing
-        time_diff = abs((aggressive_cutoff - expected_cutoff).total_seconds())
-        self.assertLess(time_diff, 86400)  # Within 1 day
+        expected_days = int(min(7, 1*7, 1*30, 1*365) * 0.9)  # int(7 * 0.9) = 6
+        self.assertEqual(aggressive_cutoff, frozen_now - timedelta(days=expected_days))
     
-    @pytest.mark.asyncio
-    async def test_critical_data_cleanup_logic(self):
-        """Test cleanup logic for critical data (trades, orders, positions)."""
-        # Test trades cleanup
-        policy = self.retention_manager.policies['trades']
-        operation = await self.retention_manager._cleanup_critical_data(
-            'trades', policy, dry_run=True, 
-            operation_id='test_operation', 
-            start_time=datetime.now()
-        )
-        
-        self.assertIsInstance(operation, CleanupOperation)
-        self.assertEqual(operation.data_type, 'trades')
-        self.assertEqual(operation.status, 'success')
-        self.assertGreaterEqual(operation.records_processed, 0)
-        self.assertGreaterEqual(operation.records_deleted, 0)
-        self.assertGreaterEqual(operation.storage_freed_bytes, 0)
-    
-    @pytest.mark.asyncio
-    async def test_important_data_cleanup_logic(self):
-        """Test cleanup logic for important data (equity_curve)."""
-        policy = self.retention_manager.policies['equity_curve']
-        operation = await self.retention_manager._cleanup_important_data(
-            'equity_curve', policy, dry_run=True,
-            operation_id='test_operation',
-            start_time=datetime.now()
-        )
+    def test_cutoff_filter_prefers_epoch_column(self):
+        """Test cutoff queries compare the integer epoch column when it exists."""
+        cutoff_date = datetime.now() - timedelta(days=10)
+        columns = self.db_conn.execute("PRAGMA table_info(trades)").fetchall()
         
-        self.assertIsInstance(operation, CleanupOperation)
-        self.assertEqual(operation.data_type, 'equity_curve')
-        self.assertEqual(operation.status, 'success')
-        self.assertGreaterEqual(operation.records_processed, 0)
-        self.assertGreaterEqual(operation.records_deleted, 0)
-        self.assertGreaterEqual(operation.storage_freed_bytes, 0)
-    
-    @pytest.mark.asyncio
-    async def test_operational_data_cleanup_logic(self):
-        """Test cleanup logic for operational data (market_data)."""
-        policy = self.retention_manager.policies['market_data']
-        operation = await self.retention_manager._cleanup_operational_data(
-            'market_data', policy, dry_run=True,
-            operation_id='test_operation',
-            start_time=datetime.now()
-        )
+        cutoff_filter = self.retention_manager.cleanup._get_cutoff_filter(columns, cutoff_date)
         
-        self.assertIsInstance(operation, CleanupOperation)
-        self.assertEqual(operation.data_type, 'market_data')
-        self.assertEqual(operation.status, 'success')
-        self.assertGreaterEqual(operation.records_processed, 0)
-        self.assertGreaterEqual(operation.records_deleted, 0)
-        self.assertGreaterEqual(operation.storage_freed_bytes, 0)
+        self.assertEqual(cutoff_filter, ('ts_epoch', int(cutoff_date.timestamp())))
     
-    @pytest.mark.asyncio
-    async def test_data_type_specific_cleanup_integration(self):
-        """Test integration of data type-specific cleanup logic."""
-        # Test with dry run to avoid actual deletion
-        operations = await self.retention_manager.run_cleanup(dry_run=True)
-        
-        self.assertIsInstance(operations, list)
-        self.assertGreater(len(operations), 0)
-        
-        # Check that operations were processed in priority order
-        data_types = [op.data_type for op in operations]
-        
-        # Critical data should be processed first
-        critical_indices = [i for i, dt in enumerate(data_types) if dt in ['trades', 'orders', 'positions']]
-        important_indices = [i for i, dt in enumerate(data_types) if dt == 'equity_curve']
-        operational_indices = [i for i, dt in enumerate(data_types) if dt == 'market_data']
+    def test_cleanup_reuses_connection(self):
+        """Test the cleanup component keeps one connection open across calls."""
+        manager = RetentionManager(str(self.config_path), str(self.db_path))
+        self.addCleanup(manager.close)
         
-        # Critical data should come before important data
-        if critical_indices and important_indices:
-            self.assertLess(max(critical_indices), min(important_indices))
+        conn = manager.cleanup._connect()
+        self.assertIs(manager.cleanup._connect(), conn)
         
-        # Important data should come before operational data
-        if important_indices and operational_indices:
-            self.assertLess(max(important_indices), min(operational_indices))
+        manager.close()
+        self.assertIsNone(manager.cleanup.db_conn)
     
-    @pytest.mark.asyncio
-    async def test_records_to_delete_with_cutoff(self):
-        """Test getting records to delete with specific cutoff date."""
-        cutoff_date = datetime.now() - timedelta(days=10)
-        records = await self.retention_manager._get_records_to_delete_with_cutoff('trades', cutoff_date)
+    def test_restore_closes_cleanup_connection(self):
+        """Test a restore releases the cleanup connection before replacing the file."""
+        manager = RetentionManager(str(self.config_path), str(self.db_path))
+        self.addCleanup(manager.close)
+        manager.cleanup._connect()
         
-        self.assertIsInstance(records, list)
+        async def restore(backup_name, verify_integrity):
+            self.assertIsNone(manager.cleanup.db_conn)
+            return {"status": "success"}
         
-        # All records should be older than cutoff date
-        for record in records:
-            record_timestamp = datetime.fromisoformat(record['timestamp'])
-            self.assertLess(record_timestamp, cutoff_date)
-    
-    @pytest.mark.asyncio
-    async def test_delete_records_with_verification(self):
-        """Test deletion with verification for critical data."""
-        # Get some records to delete
-        cutoff_date = datetime.now() - timedelta(days=5)
-        records = await self.retention_manager._get_records_to_delete_with_cutoff('market_data', cutoff_date)
+        with patch.object(manager.integrity, 'restore_from_backup', side_effect=restore):
+            result = asyncio.run(manager.restore_from_backup("backup"))
         
-        if records:
-            # Test deletion with verification
-            deleted_count = await self.retention_manager._delete_records_with_verification(
-                'market_data', records, cutoff_date
-            )
-            
-            self.assertGreaterEqual(deleted_count, 0)
-            self.assertEqual(deleted_count, len(records))
-    
-    @pytest.mark.asyncio
-    async def test_delete_records_standard(self):
-        """Test standard deletion for important data."""
-        # Get some records to delete
-        cutoff_date = datetime.now() - timedelta(days=5)
-        records = await self.retention_manager._get_records_to_delete_with_cutoff('equity_curve', cutoff_date)
+        self.assertEqual(result["status"], "success")
         
-        if records:
-            # Test standard deletion
-            deleted_count = await self.retention_manager._delete_records_standard(
-                'equity_curve', records, cutoff_date
-            )
-            
-            self.assertGreaterEqual(deleted_count, 0)
-            self.assertEqual(deleted_count, len(records))
-    
-    @pytest.mark.asyncio
-    async def test_delete_records_minimal(self):
-        """Test minimal deletion for operational data."""
-        # Get some records to delete
-        cutoff_date = datetime.now() - timedelta(days=5)
-        records = await self.retention_manager._get_records_to_delete_with_cutoff('market_data', cutoff_date)
-        
-        if records:
-            # Test minimal deletion
-            deleted_count = await self.retention_manager._delete_records_minimal(
-                'market_data', records, cutoff_date
-            )
-            
-            self.assertGreaterEqual(deleted_count, 0)
-            self.assertEqual(deleted_count, len(records))
+        # The connection is reopened on next use
+        self.assertIsNotNone(manager.cleanup._connect())
     
     def test_unknown_data_type_fallback(self):
         """Test fallback behavior for unknown data types."""
@@ -473,30 +429,144 @@ class TestDataTypeRetentionLogic(unittest.TestCase):
         
         # Unknown data type should be assigned lowest priority
         self.assertEqual(priority_order, ['unknown_type'])
+
+
+@pytest.mark.asyncio(loop_scope="module")
+@pytest.mark.parametrize("data_type,method_name", [
+    ('trades', '_cleanup_critical_data'),
+    ('equity_curve', '_cleanup_important_data'),
+    ('market_data', '_cleanup_operational_data'),
+])
+async def test_data_cleanup_logic(retention_manager, data_type, method_name):
+    """Test cleanup logic for critical, important and operational data."""
+    policy = retention_manager.policies[data_type]
+    cleanup_method = getattr(retention_manager.cleanup, method_name)
+    operation = await cleanup_method(
+        data_type, policy, dry_run=True,
+        operation_id='test_operation',
+        start_time=datetime.now()
+    )
     
-    @pytest.mark.asyncio
-    async def test_cleanup_data_type_with_logic_unknown_type(self):
-        """Test cleanup logic for unknown data types."""
-        # Create a mock policy for unknown data type
-        unknown_policy = RetentionPolicy(
-            enabled=True,
-            retention_days=30,
-            retention_weeks=4,
-            retention_months=6,
-            retention_years=1,
-            priority=DataPriority.OPERATIONAL,
-            description='Unknown data type'
-        )
-        
-        # Test cleanup with unknown data type
-        operation = await self.retention_manager._cleanup_data_type_with_logic(
-            'unknown_type', unknown_policy, dry_run=True
-        )
-        
-        self.assertIsInstance(operation, CleanupOperation)
-        self.assertEqual(operation.data_type, 'unknown_type')
-        # Should fall back to standard cleanup logic
-        self.assertIn(operation.status, ['success', 'failed'])
+    assert isinstance(operation, CleanupOperation)
+    assert operation.data_type == data_type
+    assert operation.status == 'success'
+    assert operation.records_processed >= 0
+    assert operation.records_deleted >= 0
+    assert operation.storage_freed_bytes >= 0
+
+
+@pytest.mark.asyncio(loop_scope="module")
+@pytest.mark.parametrize("data_type,method_name", [
+    ('market_data', '_delete_records_with_verification'),
+    ('equity_curve', '_delete_records_standard'),
+    ('market_data', '_delete_records_minimal'),
+])
+async def test_delete_records(private_retention_manager, data_type, method_name):
+    """Test verified, standard and minimal deletion paths."""
+    cleanup = private_retention_manager.cleanup
+    
+    # Get some records to delete
+    cutoff_date = datetime.now() - timedelta(days=5)
+    records = await cleanup._get_records_to_delete_with_cutoff(data_type, cutoff_date)
+    assert records
+    
+    delete_method = getattr(cleanup, method_name)
+    deleted_count = await delete_method(data_type, records, cutoff_date)
+    
+    assert deleted_count == len(records)
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_delete_by_cutoff(private_retention_manager):
+    """Test the single range DELETE removes exactly the records past the cutoff."""
+    cleanup = private_retention_manager.cleanup
+    cutoff_date = datetime.now() - timedelta(days=5)
+    records = await cleanup._get_records_to_delete_with_cutoff('market_data', cutoff_date)
+    
+    deleted_count = await cleanup._delete_by_cutoff('market_data', cutoff_date)
+    
+    assert deleted_count == len(records)
+    assert await cleanup._get_records_to_delete_with_cutoff('market_data', cutoff_date) == []
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_delete_does_not_vacuum(private_retention_manager):
+    """Test the delete path never issues VACUUM, which rewrites the whole database."""
+    cleanup = private_retention_manager.cleanup
+    statements = []
+    cleanup.db_conn.set_trace_callback(statements.append)
+    
+    cutoff_date = datetime.now() - timedelta(days=5)
+    records = await cleanup._get_records_to_delete_with_cutoff('market_data', cutoff_date)
+    await cleanup._delete_records_with_verification('market_data', records, cutoff_date)
+    
+    assert any(stmt.startswith('DELETE') for stmt in statements)
+    assert not any('VACUUM' in stmt.upper() for stmt in statements)
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_data_type_specific_cleanup_integration(retention_manager):
+    """Test integration of data type-specific cleanup logic."""
+    # Test with dry run to avoid actual deletion
+    operations = await retention_manager.run_cleanup(dry_run=True)
+    
+    assert isinstance(operations, list)
+    assert len(operations) > 0
+    
+    # Check that operations were processed in priority order
+    data_types = [op.data_type for op in operations]
+    
+    # Critical data should be processed first
+    critical_indices = [i for i, dt in enumerate(data_types) if dt in ['trades', 'orders', 'positions']]
+    important_indices = [i for i, dt in enumerate(data_types) if dt == 'equity_curve']
+    operational_indices = [i for i, dt in enumerate(data_types) if dt == 'market_data']
+    
+    # Critical data should come before important data
+    if critical_indices and important_indices:
+        assert max(critical_indices) < min(important_indices)
+    
+    # Important data should come before operational data
+    if important_indices and operational_indices:
+        assert max(important_indices) < min(operational_indices)
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_records_to_delete_with_cutoff(retention_manager):
+    """Test getting records to delete with specific cutoff date."""
+    cutoff_date = datetime.now() - timedelta(days=10)
+    records = await retention_manager.cleanup._get_records_to_delete_with_cutoff('trades', cutoff_date)
+    
+    assert isinstance(records, list)
+    
+    # All records should be older than cutoff date; ISO-8601 strings compare chronologically
+    cutoff_iso = cutoff_date.isoformat()
+    for record in records:
+        assert record['timestamp'] < cutoff_iso
+
+
+@pytest.mark.asyncio(loop_scope="module")
+async def test_cleanup_data_type_with_logic_unknown_type(retention_manager):
+    """Test cleanup logic for unknown data types."""
+    # Create a mock policy for unknown data type
+    unknown_policy = RetentionPolicy(
+        enabled=True,
+        retention_days=30,
+        retention_weeks=4,
+        retention_months=6,
+        retention_years=1,
+        priority=DataPriority.OPERATIONAL,
+        description='Unknown data type'
+    )
+    
+    # Test cleanup with unknown data type
+    operation = await retention_manager.cleanup.cleanup_data_type_with_logic(
+        'unknown_type', unknown_policy, dry_run=True
+    )
+    
+    assert isinstance(operation, CleanupOperation)
+    assert operation.data_type == 'unknown_type'
+    # Should fall back to standard cleanup logic
+    assert operation.status in ['success', 'failed']
 
 
 if __name__ == '__main__':
@@ -5,14 +5,76 @@ Unit tests for enhanced data loader functionality.
 import pytest
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+import pyarrow.parquet as pq
+import os
+import time
+from datetime import datetime
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 
 from grodtd.storage.data_loader import DataLoader
 from grodtd.storage.interfaces import OHLCVBar
 
 
+# Canonical stored file for the TEST symbol (covers 2024-01-01)
+_TEST_FILE = "TEST_1m_2024-01-01_2024-01-01.parquet"
+
+# Seeded PCG64 generator so generated sample data is reproducible
+_RNG = np.random.default_rng(42)
+
+# Ten well-formed 1-minute bars; copy before mutating
+_VALID_FRAME = pd.DataFrame({
+    'timestamp': pd.date_range('2024-01-01', periods=10, freq='1min'),
+    'open': np.arange(100, 110, dtype=np.int64),
+    'high': np.arange(105, 115, dtype=np.int64),
+    'low': np.arange(99, 109, dtype=np.int64),
+    'close': np.arange(101, 111, dtype=np.int64),
+    'volume': np.arange(1000, 2000, 100, dtype=np.int64)
+})
+
+
+@pytest.fixture(scope="session")
+def sample_data():
+    """Create sample OHLCV data with valid OHLC relationships.
+    
+    Shared across the session; tests that store or otherwise mutate the
+    frame must work on a copy.
+    """
+    n = 100
+    
+    # Random walk of closes; each bar opens at the previous close
+    closes = 100 + np.cumsum(_RNG.normal(0, 2, n))
+    opens = np.concatenate(([100.0], closes[:-1]))
+    
+    # high >= max(open, close) and low <= min(open, close) by construction
+    highs = np.maximum(opens, closes) + np.abs(_RNG.normal(0, 1, n))
+    lows = np.minimum(opens, closes) - np.abs(_RNG.normal(0, 1, n))
+    
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start='2024-01-01', periods=n, freq='1min'),
+        'open': opens,
+        'high': highs,
+        'low': lows,
+        'close': closes,
+        'volume': _RNG.uniform(1000, 10000, n)
+    })
+
+
+@pytest.fixture(scope="session")
+def prestored_loader(tmp_path_factory, sample_data):
+    """Create a data loader with sample_data already stored for TEST.
+    
+    Shared across the session, so tests using it must not write into its
+    data directory.
+    """
+    loader = DataLoader(data_dir=tmp_path_factory.mktemp("data_loader"))
+    loader._store_data(
+        sample_data.copy(deep=False),
+        loader.raw_dir / _TEST_FILE
+    )
+    return loader
+
+
 class TestEnhancedDataLoader:
     """Test enhanced data loader functionality."""
     
@@ -22,78 +84,43 @@ class TestEnhancedDataLoader:
         return DataLoader(data_dir=tmp_path)
     
     @pytest.fixture
-    def sample_data(self):
-        """Create sample OHLCV data with valid OHLC relationships."""
-        dates = pd.date_range(start='2024-01-01', periods=100, freq='1min')
-        
-        # Generate valid OHLC data
-        base_price = 100
-        data = []
-        for i in range(100):
-            # Start with previous close or base price
-            open_price = base_price if i == 0 else data[-1]['close']
-            
-            # Generate realistic price movement
-            change = np.random.normal(0, 2)  # Small random change
-            close_price = open_price + change
-            
-            # Ensure high >= max(open, close) and low <= min(open, close)
-            high_price = max(open_price, close_price) + abs(np.random.normal(0, 1))
-            low_price = min(open_price, close_price) - abs(np.random.normal(0, 1))
-            
-            # Ensure high >= low
-            if high_price < low_price:
-                high_price, low_price = low_price, high_price
-            
-            data.append({
-                'timestamp': dates[i],
-                'open': open_price,
-                'high': high_price,
-                'low': low_price,
-                'close': close_price,
-                'volume': np.random.uniform(1000, 10000)
-            })
-            
-            base_price = close_price
-        
-        return pd.DataFrame(data)
+    def test_parquet_path(self, data_loader):
+        """Path of the canonical TEST file in the data loader's raw directory."""
+        return data_loader.raw_dir / _TEST_FILE
     
-    def test_parquet_optimization(self, data_loader, sample_data):
+    @pytest.mark.xdist_group("data_loader")
+    def test_parquet_optimization(self, prestored_loader, sample_data):
         """Test Parquet storage optimization."""
-        file_path = data_loader.raw_dir / "test_symbol_1m_2024-01-01_2024-01-01.parquet"
-        
-        # Store data with optimization
-        data_loader._store_data(sample_data, file_path)
+        file_path = prestored_loader.raw_dir / _TEST_FILE
         
-        # Verify file exists
-        assert file_path.exists()
+        # Verify the Hive-partitioned layout: one directory per day
+        assert file_path.is_dir()
+        partitions = sorted(path.name for path in file_path.iterdir())
+        assert partitions == ["date=2024-01-01"]
+        assert list((file_path / "date=2024-01-01").glob("*.parquet"))
         
         # Load and verify data integrity
         loaded_data = pd.read_parquet(file_path)
         assert len(loaded_data) == len(sample_data)
         assert 'date' in loaded_data.columns  # Partitioning column added
+        
+        # Verify the configured codec was used on disk
+        part_file = next(file_path.rglob("*.parquet"))
+        column_meta = pq.ParquetFile(part_file).metadata.row_group(0).column(0)
+        assert column_meta.compression == DataLoader.PARQUET_COMPRESSION.upper()
     
     def test_data_validation_comprehensive(self, data_loader):
         """Test comprehensive data validation."""
         # Valid data
-        valid_data = pd.DataFrame({
-            'timestamp': pd.date_range('2024-01-01', periods=10, freq='1min'),
-            'open': [100, 101, 102, 103, 104, 105, 106, 107, 108, 109],
-            'high': [105, 106, 107, 108, 109, 110, 111, 112, 113, 114],
-            'low': [99, 100, 101, 102, 103, 104, 105, 106, 107, 108],
-            'close': [101, 102, 103, 104, 105, 106, 107, 108, 109, 110],
-            'volume': [1000, 1100, 1200, 1300, 1400, 1500, 1600, 1700, 1800, 1900]
-        })
-        
-        assert data_loader.validate_ohlcv_data(valid_data) == True
+        assert data_loader.validate_ohlcv_data(_VALID_FRAME) == True
         
         # Invalid OHLC relationships
-        invalid_data = valid_data.copy()
+        invalid_data = _VALID_FRAME.copy()
         invalid_data.loc[0, 'high'] = 50  # High < Low
         assert data_loader.validate_ohlcv_data(invalid_data) == False
         
         # Missing columns
-        incomplete_data = valid_data.drop('volume', axis=1)
+        incomplete_data = _VALID_FRAME.drop('volume', axis=1)
         assert data_loader.validate_ohlcv_data(incomplete_data) == False
     
     def test_outlier_detection(self, data_loader):
@@ -102,48 +129,60 @@ class TestEnhancedDataLoader:
         normal_data = pd.Series([100, 101, 102, 103, 104, 105])
         assert data_loader._detect_outliers(normal_data) == False
         
-        # Data with extreme outliers (z-score > 3.0)
-        # Use a smaller dataset with a more extreme outlier
-        outlier_data = pd.Series([100, 101, 102, 10000000])  # 10000000 is an extreme outlier in small dataset
-        # Test with a lower threshold since the algorithm might not reach 3.0
+        assert data_loader._detect_outliers(normal_data, method="mad") == False
+        
+        # Data with an extreme outlier in a small dataset
+        outlier_data = pd.Series([100, 101, 102, 10000000])
+        # The outlier inflates the std, so its z-score cannot reach 3.0 with n=4
         assert data_loader._detect_outliers(outlier_data, threshold=1.4) == True
+        # The median/MAD detector is not masked and works with the default threshold
+        assert data_loader._detect_outliers(outlier_data, method="mad", threshold=3.0) == True
+        
+        with pytest.raises(ValueError):
+            data_loader._detect_outliers(normal_data, method="iqr")
     
     def test_data_gap_detection(self, data_loader):
         """Test data gap detection."""
         # Data with gaps
-        dates_with_gaps = pd.date_range('2024-01-01', periods=5, freq='1min')
-        dates_with_gaps = dates_with_gaps.drop([dates_with_gaps[2]])  # Remove one timestamp
+        dates = pd.date_range('2024-01-01', periods=5, freq='1min')
+        dates_with_gaps = pd.DatetimeIndex(np.delete(dates.to_numpy(), 2))  # Remove one timestamp
         
         data_with_gaps = pd.DataFrame({
             'timestamp': dates_with_gaps,
-            'open': [100, 101, 103, 104],  # Missing data for removed timestamp
-            'high': [105, 106, 108, 109],
-            'low': [99, 100, 102, 103],
-            'close': [101, 102, 104, 105],
-            'volume': [1000, 1100, 1300, 1400]
+            'open': np.array([100, 101, 103, 104], dtype=np.int64),  # Missing data for removed timestamp
+            'high': np.array([105, 106, 108, 109], dtype=np.int64),
+            'low': np.array([99, 100, 102, 103], dtype=np.int64),
+            'close': np.array([101, 102, 104, 105], dtype=np.int64),
+            'volume': np.array([1000, 1100, 1300, 1400], dtype=np.int64)
         })
         
-        # Should detect gaps
-        data_loader._check_data_gaps(data_with_gaps)
-        # Test passes if no exception is raised
+        # Should detect exactly one gap around the removed bar
+        gaps = data_loader._check_data_gaps(data_with_gaps, interval="1min")
+        assert len(gaps) == 1
+        assert gaps[0]['gap_start'] == dates[1].to_datetime64()
+        assert gaps[0]['gap_end'] == dates[3].to_datetime64()
+        assert gaps[0]['dead_time_ns'] == 60_000_000_000
+        
+        # Contiguous data has no gaps
+        assert len(data_loader._check_data_gaps(_VALID_FRAME, interval="1min")) == 0
     
     def test_missing_data_detection(self, data_loader):
         """Test missing data detection."""
         # Create data with missing timestamps
-        dates = pd.date_range('2024-01-01 09:00:00', periods=10, freq='1min')
-        dates = dates.drop([dates[2], dates[5]])  # Remove 2 timestamps
+        expected = pd.date_range('2024-01-01 09:00:00', periods=10, freq='1min')
+        dates = pd.DatetimeIndex(np.delete(expected.to_numpy(), [2, 5]))  # Remove 2 timestamps
         
         data = pd.DataFrame({
             'timestamp': dates,
-            'open': [100] * 8,
-            'high': [105] * 8,
-            'low': [99] * 8,
-            'close': [101] * 8,
-            'volume': [1000] * 8
+            'open': np.full(8, 100, dtype=np.int64),
+            'high': np.full(8, 105, dtype=np.int64),
+            'low': np.full(8, 99, dtype=np.int64),
+            'close': np.full(8, 101, dtype=np.int64),
+            'volume': np.full(8, 1000, dtype=np.int64)
         })
         
         missing_timestamps = data_loader.detect_missing_data(data, expected_interval="1min")
-        assert len(missing_timestamps) == 2
+        assert pd.DatetimeIndex(missing_timestamps).equals(expected[[2, 5]])
     
     def test_data_quality_report(self, data_loader, sample_data):
         """Test data quality report generation."""
@@ -158,82 +197,151 @@ class TestEnhancedDataLoader:
         
         assert report['total_records'] == len(sample_data)
         assert report['validation_passed'] == True
+        assert report['data_gaps'] == 0
+    
+    def test_data_quality_report_cached(self, data_loader, sample_data):
+        """Test data quality reports are reused for identical data."""
+        with patch.object(data_loader, 'validate_ohlcv_data', wraps=data_loader.validate_ohlcv_data) as validate:
+            report = data_loader.get_data_quality_report(sample_data)
+            cached_report = data_loader.get_data_quality_report(sample_data.copy())
+            assert validate.call_count == 1
+            assert cached_report == report
+            
+            # Changed content produces a fresh report
+            changed = sample_data.copy()
+            changed.loc[0, 'volume'] = -1
+            changed_report = data_loader.get_data_quality_report(changed)
+            assert validate.call_count == 2
+            assert changed_report['validation_passed'] == False
+        
+        # Callers get their own copy of a cached report
+        report['outliers_detected']['open'] = None
+        assert data_loader.get_data_quality_report(sample_data)['outliers_detected']['open'] is not None
     
     @pytest.mark.asyncio
     async def test_incremental_update(self, data_loader, sample_data):
         """Test incremental update functionality."""
         # Mock the load_historical_data method directly
-        async def mock_load_historical_data(symbol, start_date, end_date, interval, connector):
-            return sample_data
-        
-        # Patch the method
-        data_loader.load_historical_data = mock_load_historical_data
+        data_loader.load_historical_data = AsyncMock(return_value=sample_data.copy(deep=False))
+        connector = Mock()
         
         # Test with no existing data
-        result = await data_loader.incremental_update("TEST", Mock())
+        result = await data_loader.incremental_update("TEST", connector)
         assert result['success'] == True
         assert result['new_records'] == len(sample_data)
+        data_loader.load_historical_data.assert_awaited_once()
+        assert data_loader.load_historical_data.await_args.args[0] == "TEST"
+        assert data_loader.load_historical_data.await_args.args[4] is connector
     
-    def test_data_merging(self, data_loader):
+    def test_data_merging(self, data_loader, test_parquet_path):
         """Test data merging without conflicts."""
         # Create overlapping data
         data1 = pd.DataFrame({
             'timestamp': pd.date_range('2024-01-01', periods=5, freq='1min'),
-            'open': [100, 101, 102, 103, 104],
-            'high': [105, 106, 107, 108, 109],
-            'low': [99, 100, 101, 102, 103],
-            'close': [101, 102, 103, 104, 105],
-            'volume': [1000, 1100, 1200, 1300, 1400]
+            'open': np.arange(100, 105, dtype=np.int64),
+            'high': np.arange(105, 110, dtype=np.int64),
+            'low': np.arange(99, 104, dtype=np.int64),
+            'close': np.arange(101, 106, dtype=np.int64),
+            'volume': np.arange(1000, 1500, 100, dtype=np.int64)
         })
         
         data2 = pd.DataFrame({
             'timestamp': pd.date_range('2024-01-01 00:03:00', periods=5, freq='1min'),
-            'open': [102, 103, 104, 105, 106],
-            'high': [107, 108, 109, 110, 111],
-            'low': [101, 102, 103, 104, 105],
-            'close': [103, 104, 105, 106, 107],
-            'volume': [1200, 1300, 1400, 1500, 1600]
+            'open': np.arange(102, 107, dtype=np.int64),
+            'high': np.arange(107, 112, dtype=np.int64),
+            'low': np.arange(101, 106, dtype=np.int64),
+            'close': np.arange(103, 108, dtype=np.int64),
+            'volume': np.arange(1200, 1700, 100, dtype=np.int64)
         })
         
         # Store first dataset
-        file_path1 = data_loader.raw_dir / "TEST_1m_2024-01-01_2024-01-01.parquet"
-        data_loader._store_data(data1, file_path1)
+        data_loader._store_data(data1, test_parquet_path)
         
         # Test merging
         merged = data_loader._merge_data_without_conflicts("TEST", data2)
         
-        # Should have unique timestamps
-        assert len(merged) == len(merged.drop_duplicates(subset=['timestamp']))
+        # Should have unique, sorted timestamps
+        assert merged['timestamp'].is_unique
+        assert merged['timestamp'].is_monotonic_increasing
         assert len(merged) >= max(len(data1), len(data2))
     
-    def test_data_query_interface(self, data_loader, sample_data):
+    @pytest.mark.parametrize("k", [2, 5, 20])
+    def test_data_merging_many_sources(self, data_loader, k):
+        """Test merging new data over many overlapping stored files."""
+        # Source i covers minutes [5i, 5i + 10), overlapping its neighbours by 5
+        def make_frame(source):
+            timestamps = pd.date_range('2024-01-01', periods=10, freq='1min') + pd.Timedelta(minutes=5 * source)
+            prices = np.full(10, 100.0 + source)
+            return pd.DataFrame({
+                'timestamp': timestamps,
+                'open': prices,
+                'high': prices + 1,
+                'low': prices - 1,
+                'close': prices,
+                'volume': np.full(10, 1000.0)
+            })
+        
+        for source in range(k - 1):
+            data_loader._store_data(make_frame(source), data_loader.raw_dir / f"TEST_1m_part{source}.parquet")
+        new_data = make_frame(k - 1)
+        
+        merged = data_loader._merge_data_without_conflicts("TEST", new_data)
+        
+        assert merged['timestamp'].is_monotonic_increasing
+        assert merged['timestamp'].is_unique
+        assert len(merged) == 5 * k + 5
+        
+        # New data wins wherever it overlaps stored data
+        overlap = merged[merged['timestamp'].isin(new_data['timestamp'])]
+        assert (overlap['close'] == new_data['close'].iloc[0]).all()
+    
+    def test_merge_empty_data(self, data_loader):
+        """Test merging empty new data into empty stored files."""
+        empty = _VALID_FRAME.iloc[:0]
+        empty.to_parquet(data_loader.raw_dir / "EMPTY_1m_2024-01-01_2024-01-01.parquet")
+        
+        merged = data_loader._merge_data_without_conflicts("EMPTY", empty)
+        
+        assert merged.empty
+        assert list(merged.columns) == list(_VALID_FRAME.columns)
+    
+    @pytest.mark.xdist_group("data_loader")
+    def test_data_query_interface(self, prestored_loader, sample_data, monkeypatch):
         """Test flexible data query interface."""
-        # Store sample data
-        file_path = data_loader.raw_dir / "TEST_1m_2024-01-01_2024-01-01.parquet"
-        data_loader._store_data(sample_data, file_path)
+        # Record the columns requested from the Parquet reader
+        read_calls = []
+        original_read = pq.ParquetDataset.read
+        
+        def recording_read(dataset, columns=None, **kwargs):
+            read_calls.append(columns)
+            return original_read(dataset, columns=columns, **kwargs)
+        
+        monkeypatch.setattr(pq.ParquetDataset, "read", recording_read)
         
         # Query specific date range
         start_date = datetime(2024, 1, 1, 0, 0)
         end_date = datetime(2024, 1, 1, 0, 5)
         
-        result = data_loader.query_data("TEST", start_date, end_date)
+        result = prestored_loader.query_data("TEST", start_date, end_date)
         assert not result.empty
         assert len(result) <= len(sample_data)
+        assert result['timestamp'].between(start_date, end_date).all()
         
         # Query with specific columns
-        result_columns = data_loader.query_data("TEST", start_date, end_date, columns=['open', 'close'])
+        result_columns = prestored_loader.query_data("TEST", start_date, end_date, columns=['open', 'close'])
         assert set(result_columns.columns).issubset({'timestamp', 'open', 'close'})
+        assert len(result_columns) == len(result)
+        
+        # Only the requested columns (plus the filter column) are read from disk
+        assert read_calls == [None, ['timestamp', 'open', 'close']]
     
-    def test_data_summary(self, data_loader, sample_data):
+    @pytest.mark.xdist_group("data_loader")
+    def test_data_summary(self, prestored_loader, sample_data):
         """Test data summary generation."""
-        # Store sample data with correct date range
+        # Use the exact date range of the stored data for the summary
         start_date = sample_data['timestamp'].min()
         end_date = sample_data['timestamp'].max()
-        file_path = data_loader.raw_dir / f"TEST_1m_{start_date.date()}_{end_date.date()}.parquet"
-        data_loader._store_data(sample_data, file_path)
-        
-        # Use the exact date range for the summary
-        summary = data_loader.get_data_summary("TEST", start_date, end_date)
+        summary = prestored_loader.get_data_summary("TEST", start_date, end_date)
         
         assert summary['symbol'] == "TEST"
         assert summary['status'] == "available"
@@ -242,32 +350,40 @@ class TestEnhancedDataLoader:
         assert 'data_quality' in summary
         assert 'price_stats' in summary
     
-    def test_data_export(self, data_loader, sample_data):
+    @pytest.mark.xdist_group("data_loader")
+    def test_data_export(self, prestored_loader, tmp_path):
         """Test data export functionality."""
-        # Store sample data
-        file_path = data_loader.raw_dir / "TEST_1m_2024-01-01_2024-01-01.parquet"
-        data_loader._store_data(sample_data, file_path)
-        
-        # Test CSV export
+        # Test CSV export (written outside the shared data directory)
         start_date = datetime(2024, 1, 1, 0, 0)
         end_date = datetime(2024, 1, 1, 0, 5)
         
-        csv_path = data_loader.export_data("TEST", start_date, end_date, format="csv")
+        csv_path = prestored_loader.export_data(
+            "TEST", start_date, end_date, format="csv", output_path=tmp_path / "TEST_export.csv"
+        )
         assert csv_path.exists()
         assert csv_path.suffix == ".csv"
+        exported = pd.read_csv(csv_path)
+        assert len(exported) == 6  # Bars 00:00 through 00:05 inclusive
+        assert {'timestamp', 'open', 'high', 'low', 'close', 'volume'}.issubset(exported.columns)
+        
+        # Arrow's CSV format: quoted header, microsecond timestamps and
+        # integral floats without a trailing ".0"
+        header, first_row = csv_path.read_text().splitlines()[:2]
+        assert header == '"timestamp","open","high","low","close","volume","year","month","day","date"'
+        assert first_row.startswith('2024-01-01 00:00:00.000000,100,')
+        assert first_row.endswith(',2024,1,1,2024-01-01')
         
         # Test JSON export
-        json_path = data_loader.export_data("TEST", start_date, end_date, format="json")
+        json_path = prestored_loader.export_data(
+            "TEST", start_date, end_date, format="json", output_path=tmp_path / "TEST_export.json"
+        )
         assert json_path.exists()
         assert json_path.suffix == ".json"
     
-    def test_storage_statistics(self, data_loader, sample_data):
+    @pytest.mark.xdist_group("data_loader")
+    def test_storage_statistics(self, prestored_loader):
         """Test storage statistics."""
-        # Store some data
-        file_path = data_loader.raw_dir / "TEST_1m_2024-01-01_2024-01-01.parquet"
-        data_loader._store_data(sample_data, file_path)
-        
-        stats = data_loader.get_storage_stats()
+        stats = prestored_loader.get_storage_stats()
         
         assert 'total_files' in stats
         assert 'total_size_mb' in stats
@@ -276,16 +392,14 @@ class TestEnhancedDataLoader:
         assert 'partitioning' in stats
         
         assert stats['total_files'] >= 1
-        assert stats['compression'] == "snappy"
+        assert stats['total_size_mb'] > 0
+        assert stats['compression'] == "zstd"
         assert stats['partitioning'] == "daily by date"
     
-    def test_data_freshness(self, data_loader, sample_data):
+    @pytest.mark.xdist_group("data_loader")
+    def test_data_freshness(self, prestored_loader):
         """Test data freshness checking."""
-        # Store recent data
-        file_path = data_loader.raw_dir / "TEST_1m_2024-01-01_2024-01-01.parquet"
-        data_loader._store_data(sample_data, file_path)
-        
-        freshness = data_loader.get_data_freshness("TEST")
+        freshness = prestored_loader.get_data_freshness("TEST")
         
         assert 'status' in freshness
         assert 'latest_timestamp' in freshness
@@ -296,18 +410,42 @@ class TestEnhancedDataLoader:
     
     def test_cleanup_old_data(self, data_loader):
         """Test old data cleanup functionality."""
-        import os
+        # Create a plain file and a partitioned dataset
+        data_file = data_loader.raw_dir / "old_data.parquet"
+        data_file.touch()
+        dataset = data_loader.raw_dir / "OLD_1m_2024-01-01_2024-01-01.parquet"
+        data_loader._store_data(_VALID_FRAME.copy(), dataset)
         
-        # Create old file
-        old_file = data_loader.raw_dir / "old_data.parquet"
-        old_file.touch()
+        # Freshly written data is kept
+        data_loader.cleanup_old_data(days_to_keep=30)
+        assert data_file.exists()
+        assert dataset.exists()
+        
+        # Run cleanup with a clock 35 days ahead so the data is old
+        real_now = time.time()
+        data_loader.cleanup_old_data(days_to_keep=30, now_fn=lambda: real_now + 35 * 86400)
         
-        # Modify timestamp to be old using os.utime
-        old_timestamp = (datetime.now() - timedelta(days=35)).timestamp()
-        os.utime(old_file, (old_timestamp, old_timestamp))
+        # Old file and dataset should be removed
+        assert not data_file.exists()
+        assert not dataset.exists()
+    
+    def test_cleanup_old_data_keeps_fresh_partitions(self, data_loader):
+        """Test that cleanup prunes old partitions but keeps fresh ones."""
+        # Two days of bars stored as one dataset with a partition per day
+        next_day = _VALID_FRAME.assign(timestamp=_VALID_FRAME['timestamp'] + pd.Timedelta(days=1))
+        frame = pd.concat([_VALID_FRAME, next_day])
+        dataset = data_loader.raw_dir / "MIX_1m_2024-01-01_2024-01-02.parquet"
+        data_loader._store_data(frame.reset_index(drop=True), dataset)
+        
+        # Age only the first day's files
+        old_time = time.time() - 35 * 86400
+        for path in (dataset / "date=2024-01-01").iterdir():
+            os.utime(path, (old_time, old_time))
         
-        # Run cleanup
         data_loader.cleanup_old_data(days_to_keep=30)
         
-        # File should be removed
-        assert not old_file.exists()
+        assert not (dataset / "date=2024-01-01").exists()
+        assert (dataset / "date=2024-01-02").exists()
+        stored = pd.read_parquet(dataset)
+        assert len(stored) == 10
+        assert (stored['timestamp'] >= pd.Timestamp('2024-01-02')).all()
@@ -7,10 +7,12 @@ caching mechanisms, feature computation, and performance monitoring.
 
 import unittest
 import tempfile
+import pytest
 import sqlite3
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
+from unittest.mock import patch
 import pandas as pd
 import numpy as np
 
@@ -23,109 +25,211 @@ from grodtd.storage.feature_api import (
 from grodtd.features.regime_features import (
     RegimeFeatureCalculator, RegimeFeatureConfig, RegimeFeatureResult
 )
-from grodtd.storage.interfaces import OHLCVBar
+from grodtd.storage.cache_keys import frame_cache_key
+from grodtd.storage.interfaces import OHLCVBar, OHLCVBatch
+
+
+# Seeded generator shared by the sample data builders
+_RNG = np.random.default_rng(42)
+
+# Throwaway test databases need no durability; skip fsyncs entirely
+_TEST_PRAGMAS = {
+    'journal_mode': 'MEMORY',
+    'synchronous': 'OFF',
+    'temp_store': 'MEMORY'
+}
 
 
 class TestFeatureStoreDatabaseSchema(unittest.TestCase):
     """Test feature store database schema creation and structure."""
     
-    def setUp(self):
-        """Set up test database."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir) / "test_feature_store.db"
-        self.config = FeatureStoreConfig(db_path=str(self.db_path))
-        self.feature_store = FeatureStore(self.config)
+    @classmethod
+    def setUpClass(cls):
+        """Set up one in-memory database; these tests only read the schema."""
+        cls.config = FeatureStoreConfig(db_path=":memory:", in_memory=True, pragmas=_TEST_PRAGMAS)
+        cls.feature_store = FeatureStore(cls.config)
+        cls.conn = cls.feature_store._connect()
     
-    def tearDown(self):
-        """Clean up test database."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+    @classmethod
+    def tearDownClass(cls):
+        """Close the shared connection and release the in-memory database."""
+        cls.conn.close()
+        cls.feature_store.close()
     
     def test_database_initialization(self):
         """Test that database schema is created correctly."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Check that all tables exist
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [row[0] for row in cursor.fetchall()]
-            
-            self.assertIn('feature_store', tables)
-            self.assertIn('regime_features', tables)
-            self.assertIn('feature_metadata', tables)
-    
-    def test_feature_store_table_schema(self):
-        """Test feature_store table schema."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("PRAGMA table_info(feature_store)")
-            columns = cursor.fetchall()
-            
-            column_names = [col[1] for col in columns]
-            expected_columns = ['id', 'symbol', 'timestamp', 'indicator_type', 'value', 'parameters', 'computed_at']
-            
-            for expected_col in expected_columns:
-                self.assertIn(expected_col, column_names)
-    
-    def test_regime_features_table_schema(self):
-        """Test regime_features table schema."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("PRAGMA table_info(regime_features)")
-            columns = cursor.fetchall()
-            
-            column_names = [col[1] for col in columns]
-            expected_columns = ['id', 'symbol', 'timestamp', 'feature_type', 'value', 'regime_class', 'computed_at']
-            
-            for expected_col in expected_columns:
-                self.assertIn(expected_col, column_names)
-    
-    def test_feature_metadata_table_schema(self):
-        """Test feature_metadata table schema."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("PRAGMA table_info(feature_metadata)")
-            columns = cursor.fetchall()
-            
-            column_names = [col[1] for col in columns]
-            expected_columns = ['id', 'feature_type', 'parameters', 'version', 'created_at']
-            
-            for expected_col in expected_columns:
-                self.assertIn(expected_col, column_names)
+        cursor = self.conn.cursor()
+        
+        # Check that all tables exist
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row[0] for row in cursor.fetchall()]
+        
+        self.assertIn('feature_store', tables)
+        self.assertIn('regime_features', tables)
+        self.assertIn('feature_metadata', tables)
+    
+    def test_connection_pragmas(self):
+        """Test that configured PRAGMAs are applied to store connections."""
+        conn = self.feature_store._connect()
+        try:
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 0)
+            self.assertEqual(conn.execute("PRAGMA temp_store").fetchone()[0], 2)
+        finally:
+            conn.close()
+    
+    def test_read_connection_is_query_only(self):
+        """Test that lookups share one read-only connection."""
+        with self.feature_store._read_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA query_only").fetchone()[0], 1)
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM feature_store")
+        
+        with self.feature_store._read_connection() as again:
+            self.assertIs(again, conn)
+    
+    def test_default_pragmas(self):
+        """Test that the default configuration enables WAL."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = FeatureStoreConfig(db_path=str(Path(temp_dir) / "default.db"))
+            conn = FeatureStore(config)._connect()
+            try:
+                self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+                self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+            finally:
+                conn.close()
+    
+    def test_in_memory_database_persists(self):
+        """Test that an in-memory store keeps data across connections."""
+        self.feature_store.cache_technical_indicator(
+            "BTCUSDT", datetime(2024, 1, 1), "rsi", 55.0, {"period": 14}
+        )
+        self.assertEqual(
+            self.feature_store.get_cached_indicator(
+                "BTCUSDT", datetime(2024, 1, 1), "rsi", {"period": 14}
+            ),
+            55.0
+        )
+        
+        # Separate in-memory stores never share data
+        other = FeatureStore(FeatureStoreConfig(db_path=":memory:", in_memory=True, pragmas=_TEST_PRAGMAS))
+        try:
+            self.assertIsNone(
+                other.get_cached_indicator("BTCUSDT", datetime(2024, 1, 1), "rsi", {"period": 14})
+            )
+        finally:
+            other.close()
     
     def test_indexes_created(self):
         """Test that performance indexes are created."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='index'")
-            indexes = [row[0] for row in cursor.fetchall()]
-            
-            expected_indexes = [
-                'idx_feature_store_symbol_timestamp',
-                'idx_feature_store_indicator_type',
-                'idx_regime_features_symbol_timestamp',
-                'idx_regime_features_feature_type',
-                'idx_regime_features_regime_class'
-            ]
-            
-            for expected_idx in expected_indexes:
-                self.assertIn(expected_idx, indexes)
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='index'")
+        indexes = [row[0] for row in cursor.fetchall()]
+        
+        expected_indexes = [
+            'idx_feature_store_symbol_timestamp',
+            'idx_feature_store_indicator_type',
+            'idx_regime_features_symbol_timestamp',
+            'idx_regime_features_feature_type',
+            'idx_regime_features_regime_class',
+            'idx_fs_sit',
+            'idx_rf_sftr',
+            'idx_fs_computed_at',
+            'idx_rf_computed_at'
+        ]
+        
+        for expected_idx in expected_indexes:
+            self.assertIn(expected_idx, indexes)
+    
+    def test_lookup_queries_use_composite_indexes(self):
+        """Test that lookups and cleanup search indexes instead of scanning."""
+        cursor = self.conn.cursor()
+        
+        cursor.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT timestamp, value FROM feature_store
+            WHERE symbol = ? AND indicator_type = ? AND parameters_hash = ?
+            AND timestamp BETWEEN ? AND ?
+            ORDER BY timestamp
+        """, ("BTC", "vwap", b"\x00" * 16, "2024-01-01", "2024-01-02"))
+        plan = " ".join(row[3] for row in cursor.fetchall())
+        self.assertIn("SEARCH", plan)
+        self.assertIn("COVERING INDEX idx_fs_sit", plan)
+        
+        cursor.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT value FROM regime_features
+            WHERE symbol = ? AND timestamp = ? AND feature_type = ? AND regime_class = ?
+        """, ("BTC", "2024-01-01", "trend_strength", "trending"))
+        plan = " ".join(row[3] for row in cursor.fetchall())
+        self.assertIn("SEARCH", plan)
+        self.assertNotIn("SCAN", plan)
+        
+        cursor.execute(
+            "EXPLAIN QUERY PLAN DELETE FROM feature_store WHERE computed_at < ?", ("2024-01-01",)
+        )
+        plan = " ".join(row[3] for row in cursor.fetchall())
+        self.assertIn("idx_fs_computed_at", plan)
 
 
-class TestFeatureStoreCaching(unittest.TestCase):
-    """Test feature store caching functionality."""
+class TestFeatureStoreTableSchema:
+    """Test the column layout of each feature store table."""
+    
+    @pytest.fixture(scope="class")
+    def schema_conn(self):
+        """Build the schema once in memory for all table checks."""
+        feature_store = FeatureStore(
+            FeatureStoreConfig(db_path=":memory:", in_memory=True, pragmas=_TEST_PRAGMAS)
+        )
+        conn = feature_store._connect()
+        yield conn
+        conn.close()
+        feature_store.close()
+    
+    @pytest.mark.parametrize("table,expected_columns", [
+        ("feature_store", ['id', 'symbol', 'timestamp', 'indicator_type', 'value', 'parameters', 'parameters_hash', 'computed_at']),
+        ("regime_features", ['id', 'symbol', 'timestamp', 'feature_type', 'value', 'regime_class', 'computed_at']),
+        ("feature_metadata", ['id', 'feature_type', 'parameters', 'version', 'created_at']),
+    ])
+    def test_table_schema(self, schema_conn, table, expected_columns):
+        """Test that each table has the expected columns."""
+        column_names = [col[1] for col in schema_conn.execute(f"PRAGMA table_info({table})")]
+        
+        for expected_col in expected_columns:
+            assert expected_col in column_names
+
+
+class _FeatureStoreTestCase(unittest.TestCase):
+    """Base for tests needing an empty file-backed feature store per test.
+    
+    The database file and schema are created once per class; setUp only
+    clears the tables.
+    """
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up one test database for the class."""
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.db_path = Path(cls._tmp.name) / "test_feature_store.db"
+        cls.config = FeatureStoreConfig(db_path=str(cls.db_path), pragmas=_TEST_PRAGMAS)
+        cls.feature_store = FeatureStore(cls.config)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up test database."""
+        cls.feature_store.close()
+        cls._tmp.cleanup()
     
     def setUp(self):
-        """Set up test database."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir) / "test_feature_store.db"
-        self.config = FeatureStoreConfig(db_path=str(self.db_path))
-        self.feature_store = FeatureStore(self.config)
-    
-    def tearDown(self):
-        """Clean up test database."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+        """Empty all tables before each test."""
+        with self.feature_store._connect() as conn:
+            conn.execute("DELETE FROM feature_store")
+            conn.execute("DELETE FROM regime_features")
+            conn.execute("DELETE FROM feature_metadata")
+        conn.close()
+
+
+class TestFeatureStoreCaching(_FeatureStoreTestCase):
+    """Test feature store caching functionality."""
     
     def test_cache_technical_indicator(self):
         """Test caching technical indicators."""
@@ -207,53 +311,108 @@ class TestFeatureStoreCaching(unittest.TestCase):
         )
         
         self.assertIsNone(cached_value)
+    
+    def test_parameter_key_ignores_key_order(self):
+        """Test that lookups match parameters regardless of dict key order."""
+        timestamp = datetime.now()
+        self.feature_store.cache_technical_indicator(
+            "BTC", timestamp, "macd", 1.25, {"fast": 12, "slow": 26}
+        )
+        
+        cached_value = self.feature_store.get_cached_indicator(
+            "BTC", timestamp, "macd", {"slow": 26, "fast": 12}
+        )
+        
+        self.assertEqual(cached_value, 1.25)
+    
+    def test_legacy_database_migration(self):
+        """Test that a database without parameter hashes is backfilled."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = Path(temp_dir) / "legacy.db"
+            conn = sqlite3.connect(db_path)
+            with conn:
+                conn.execute("""
+                    CREATE TABLE feature_store (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        symbol TEXT NOT NULL,
+                        timestamp DATETIME NOT NULL,
+                        indicator_type TEXT NOT NULL,
+                        value REAL NOT NULL,
+                        parameters TEXT NOT NULL,
+                        computed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        UNIQUE(symbol, timestamp, indicator_type, parameters)
+                    )
+                """)
+                # The legacy constraint let reordered parameter keys coexist
+                conn.executemany(
+                    "INSERT INTO feature_store (symbol, timestamp, indicator_type, value, parameters) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        ("BTC", "2024-01-01T00:00:00", "rsi", 42.0, '{"period": 14}'),
+                        ("BTC", "2024-01-01T00:00:00", "macd", 0.5, '{"slow": 26, "fast": 12}'),
+                        ("BTC", "2024-01-01T00:00:00", "macd", 0.7, '{"fast": 12, "slow": 26}'),
+                    ]
+                )
+            conn.close()
+            
+            feature_store = FeatureStore(FeatureStoreConfig(db_path=str(db_path), pragmas=_TEST_PRAGMAS))
+            try:
+                cached_value = feature_store.get_cached_indicator(
+                    "BTC", datetime(2024, 1, 1), "rsi", {"period": 14}
+                )
+                migrated_macd = feature_store.get_cached_indicator(
+                    "BTC", datetime(2024, 1, 1), "macd", {"slow": 26, "fast": 12}
+                )
+                
+                # Re-caching with reordered parameter keys replaces the row
+                timestamp = datetime(2024, 1, 1)
+                feature_store.cache_technical_indicator("BTC", timestamp, "macd", 1.0, {"fast": 12, "slow": 26})
+                feature_store.cache_technical_indicator("BTC", timestamp, "macd", 2.0, {"slow": 26, "fast": 12})
+                macd_value = feature_store.get_cached_indicator("BTC", timestamp, "macd", {"fast": 12, "slow": 26})
+            finally:
+                feature_store.close()
+            
+            conn = sqlite3.connect(db_path)
+            try:
+                macd_rows = conn.execute(
+                    "SELECT value, parameters FROM feature_store WHERE indicator_type = 'macd'"
+                ).fetchall()
+            finally:
+                conn.close()
+        
+        self.assertEqual(cached_value, 42.0)
+        self.assertEqual(migrated_macd, 0.7)
+        self.assertEqual(macd_value, 2.0)
+        self.assertEqual(macd_rows, [(2.0, '{"fast": 12, "slow": 26}')])
 
 
-class TestFeatureStoreComputation(unittest.TestCase):
+class TestFeatureStoreComputation(_FeatureStoreTestCase):
     """Test feature store computation functionality."""
     
-    def setUp(self):
-        """Set up test database and sample data."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir) / "test_feature_store.db"
-        self.config = FeatureStoreConfig(db_path=str(self.db_path))
-        self.feature_store = FeatureStore(self.config)
-        
-        # Create sample OHLCV data
-        self.sample_data = self._create_sample_data()
-    
-    def tearDown(self):
-        """Clean up test database."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+    @classmethod
+    def setUpClass(cls):
+        """Set up test database and create the sample OHLCV data once."""
+        super().setUpClass()
+        cls.sample_data = cls._create_sample_data()
     
-    def _create_sample_data(self):
-        """Create sample OHLCV data for testing."""
-        data = []
+    @staticmethod
+    def _create_sample_data():
+        """Create a sample OHLCV batch for testing."""
+        n = 100
         base_time = datetime.now() - timedelta(hours=24)
-        base_price = 50000.0
-        
-        for i in range(100):
-            timestamp = base_time + timedelta(minutes=i)
-            price_change = np.random.normal(0, 100)  # Random price change
-            price = base_price + price_change
-            
-            # Create OHLCV bar
-            high = price + abs(np.random.normal(0, 50))
-            low = price - abs(np.random.normal(0, 50))
-            volume = np.random.randint(1000, 10000)
-            
-            bar = OHLCVBar(
-                timestamp=timestamp,
-                open=price,
-                high=high,
-                low=low,
-                close=price,
-                volume=volume
-            )
-            data.append(bar)
         
-        return data
+        # Price changes and high/low offsets drawn in one call
+        noise = _RNG.standard_normal((n, 3)) * [100, 50, 50]
+        prices = 50000.0 + noise[:, 0]
+        
+        return OHLCVBatch(
+            timestamp=pd.date_range(base_time, periods=n, freq='min'),
+            open=prices,
+            high=prices + np.abs(noise[:, 1]),
+            low=prices - np.abs(noise[:, 2]),
+            close=prices,
+            volume=_RNG.integers(1000, 10000, n).astype(np.float64)
+        )
     
     def test_compute_and_cache_features(self):
         """Test computing and caching features for a dataset."""
@@ -281,29 +440,48 @@ class TestFeatureStoreComputation(unittest.TestCase):
             count = cursor.fetchone()[0]
             self.assertGreater(count, 0)
     
+    def test_compute_features_from_bars(self):
+        """Test that a list of bars gives the same features as the batch."""
+        batch = self.sample_data
+        bars = [
+            OHLCVBar(timestamp=ts.to_pydatetime(), open=o, high=h, low=l, close=c, volume=v)
+            for ts, o, h, l, c, v in zip(
+                batch.timestamp, batch.open, batch.high, batch.low, batch.close, batch.volume
+            )
+        ]
+        
+        converted = OHLCVBatch.from_bars(bars)
+        self.assertTrue(converted.timestamp.equals(batch.timestamp))
+        np.testing.assert_array_equal(converted.close, batch.close)
+        
+        self.assertEqual(
+            self.feature_store.compute_and_cache_features("BTC", bars),
+            self.feature_store.compute_and_cache_features("BTC", batch)
+        )
+    
     def test_get_feature_history(self):
         """Test retrieving feature history."""
         symbol = "BTC"
         parameters = {'period': 20}
         
-        # Cache some features first
-        for i in range(10):
-            timestamp = datetime.now() - timedelta(hours=i)
-            value = 50000.0 + i * 100
-            self.feature_store.cache_technical_indicator(
-                symbol, timestamp, "vwap", value, parameters
-            )
+        # Cache some features first, streaming the records in one call
+        now = datetime.now()
+        records = (
+            (symbol, now - timedelta(hours=i), "vwap", 50000.0 + i * 100, parameters)
+            for i in range(10)
+        )
+        self.assertTrue(self.feature_store.cache_technical_indicators_bulk(records))
         
         # Get feature history
-        start_time = datetime.now() - timedelta(hours=10)
-        end_time = datetime.now()
+        start_time = now - timedelta(hours=10)
+        end_time = now
         
         history = self.feature_store.get_feature_history(
             symbol, "vwap", start_time, end_time, parameters
         )
         
         self.assertIsInstance(history, list)
-        self.assertGreater(len(history), 0)
+        self.assertEqual(len(history), 10)
         
         # Check that history contains tuples of (timestamp, value)
         for timestamp, value in history:
@@ -311,45 +489,35 @@ class TestFeatureStoreComputation(unittest.TestCase):
             self.assertIsInstance(value, (int, float))
 
 
-class TestFeatureStoreCleanup(unittest.TestCase):
+class TestFeatureStoreCleanup(_FeatureStoreTestCase):
     """Test feature store cleanup functionality."""
     
     def setUp(self):
         """Set up test database with old data."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir) / "test_feature_store.db"
-        self.config = FeatureStoreConfig(db_path=str(self.db_path))
-        self.feature_store = FeatureStore(self.config)
+        super().setUp()
         
         # Add old data
         self._add_old_data()
     
-    def tearDown(self):
-        """Clean up test database."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
-    
     def _add_old_data(self):
         """Add old data for cleanup testing."""
         old_date = datetime.now() - timedelta(days=40)
         
-        # Add old feature_store records
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
+        # Add old records to both tables in one transaction
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.executemany("""
                 INSERT INTO feature_store 
                 (symbol, timestamp, indicator_type, value, parameters, computed_at)
                 VALUES (?, ?, ?, ?, ?, ?)
-            """, ("BTC", old_date, "vwap", 50000.0, '{"period": 20}', old_date))
+            """, [("BTC", old_date, "vwap", 50000.0, '{"period": 20}', old_date)])
             
-            # Add old regime_features records
-            cursor.execute("""
+            conn.executemany("""
                 INSERT INTO regime_features 
                 (symbol, timestamp, feature_type, value, regime_class, computed_at)
                 VALUES (?, ?, ?, ?, ?, ?)
-            """, ("BTC", old_date, "volatility_ratio", 1.5, "high_volatility", old_date))
-            
-            conn.commit()
+            """, [("BTC", old_date, "volatility_ratio", 1.5, "high_volatility", old_date)])
+        conn.close()
     
     def test_cleanup_old_features(self):
         """Test cleanup of old features."""
@@ -380,48 +548,43 @@ class TestFeatureStoreCleanup(unittest.TestCase):
         self.assertEqual(final_regime_count, 0)
 
 
-class TestFeatureStoreStats(unittest.TestCase):
+class TestFeatureStoreStats(_FeatureStoreTestCase):
     """Test feature store statistics functionality."""
     
     def setUp(self):
         """Set up test database with sample data."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir) / "test_feature_store.db"
-        self.config = FeatureStoreConfig(db_path=str(self.db_path))
-        self.feature_store = FeatureStore(self.config)
+        super().setUp()
         
         # Add sample data
         self._add_sample_data()
     
-    def tearDown(self):
-        """Clean up test database."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
-    
     def _add_sample_data(self):
         """Add sample data for statistics testing."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Add feature_store data
-            for i in range(10):
-                timestamp = datetime.now() - timedelta(hours=i)
-                cursor.execute("""
-                    INSERT INTO feature_store 
-                    (symbol, timestamp, indicator_type, value, parameters, computed_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, ("BTC", timestamp, "vwap", 50000.0 + i * 100, '{"period": 20}', timestamp))
-            
-            # Add regime_features data
-            for i in range(5):
-                timestamp = datetime.now() - timedelta(hours=i)
-                cursor.execute("""
-                    INSERT INTO regime_features 
-                    (symbol, timestamp, feature_type, value, regime_class, computed_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, ("BTC", timestamp, "volatility_ratio", 1.0 + i * 0.1, "normal", timestamp))
+        timestamps = [datetime.now() - timedelta(hours=i) for i in range(10)]
+        feature_rows = [
+            ("BTC", timestamp, "vwap", 50000.0 + i * 100, '{"period": 20}', timestamp)
+            for i, timestamp in enumerate(timestamps)
+        ]
+        regime_rows = [
+            ("BTC", timestamp, "volatility_ratio", 1.0 + i * 0.1, "normal", timestamp)
+            for i, timestamp in enumerate(timestamps[:5])
+        ]
+        
+        # Insert both tables in one transaction
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.executemany("""
+                INSERT INTO feature_store 
+                (symbol, timestamp, indicator_type, value, parameters, computed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, feature_rows)
             
-            conn.commit()
+            conn.executemany("""
+                INSERT INTO regime_features 
+                (symbol, timestamp, feature_type, value, regime_class, computed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, regime_rows)
+        conn.close()
     
     def test_get_cache_stats(self):
         """Test getting cache statistics."""
@@ -442,29 +605,26 @@ class TestFeatureStoreStats(unittest.TestCase):
 class TestRegimeFeatureCalculator(unittest.TestCase):
     """Test regime feature calculator functionality."""
     
-    def setUp(self):
-        """Set up test data."""
-        self.config = RegimeFeatureConfig()
-        self.calculator = RegimeFeatureCalculator(self.config)
+    @classmethod
+    def setUpClass(cls):
+        """Set up the calculator and sample data once; tests only read them."""
+        cls.config = RegimeFeatureConfig()
+        cls.calculator = RegimeFeatureCalculator(cls.config)
         
         # Create sample DataFrame
-        self.sample_df = self._create_sample_dataframe()
+        cls.sample_df = cls._create_sample_dataframe()
     
-    def _create_sample_dataframe(self):
+    @staticmethod
+    def _create_sample_dataframe():
         """Create sample DataFrame for testing."""
-        dates = pd.date_range(start='2024-01-01', periods=100, freq='1H')
-        np.random.seed(42)  # For reproducible tests
-        
-        data = {
-            'open': 50000 + np.random.randn(100) * 100,
-            'high': 50000 + np.random.randn(100) * 100 + 50,
-            'low': 50000 + np.random.randn(100) * 100 - 50,
-            'close': 50000 + np.random.randn(100) * 100,
-            'volume': np.random.randint(1000, 10000, 100)
-        }
+        dates = pd.date_range(start='2024-01-01', periods=100, freq='h')
+        ohlcv = np.empty((100, 5))
+        ohlcv[:, :4] = 50000 + _RNG.standard_normal((100, 4)) * 100
+        ohlcv[:, 1] += 50
+        ohlcv[:, 2] -= 50
+        ohlcv[:, 4] = _RNG.integers(1000, 10000, 100)
         
-        df = pd.DataFrame(data, index=dates)
-        return df
+        return OHLCVBatch.from_ndarray(ohlcv, dates).to_frame()
     
     def test_calculate_volatility_ratio(self):
         """Test volatility ratio calculation."""
@@ -510,14 +670,45 @@ class TestRegimeFeatureCalculator(unittest.TestCase):
         self.assertIsInstance(features, dict)
         self.assertGreater(len(features), 0)
     
+    def test_feature_memoization(self):
+        """Test that calculator results are memoized per DataFrame content."""
+        calculator = RegimeFeatureCalculator(self.config)
+        calculator.FEATURE_CACHE_MIN_COMPUTE_NS = 0
+        
+        first = calculator.calculate_momentum_indicators(self.sample_df)
+        self.assertEqual(len(calculator._feature_cache), 1)
+        
+        # Mutating a returned result must not leak into the cache
+        first['price_momentum'].iloc[-1] = 123.0
+        second = calculator.calculate_momentum_indicators(self.sample_df.copy())
+        self.assertEqual(len(calculator._feature_cache), 1)
+        self.assertNotEqual(second['price_momentum'].iloc[-1], 123.0)
+        
+        # Different content is computed separately
+        changed_df = self.sample_df.copy()
+        changed_df.iloc[-1, changed_df.columns.get_loc('close')] += 1.0
+        calculator.calculate_momentum_indicators(changed_df)
+        self.assertEqual(len(calculator._feature_cache), 2)
+    
+    def test_classification_features_hash_frame_once(self):
+        """Test that the memoized calculators share one content hash of the frame."""
+        calculator = RegimeFeatureCalculator(self.config)
+        
+        with patch(
+            'grodtd.features.regime_features.frame_cache_key', wraps=frame_cache_key
+        ) as key_fn:
+            calculator.calculate_regime_classification_features(self.sample_df, "BTC")
+        
+        key_fn.assert_called_once()
+    
     def test_classify_regime(self):
         """Test regime classification."""
         # Create sample features
         features = {
-            'volatility_ratio': pd.Series([1.2]),
-            'price_momentum': pd.Series([0.05]),
-            'trend_strength': pd.Series([0.6]),
-            'rsi': pd.Series([65])
+            'volatility_ratio': 1.2,
+            'price_momentum': 0.05,
+            'trend_strength': 0.6,
+            'rsi': 65.0
         }
         
         regime_class, confidence = self.calculator.classify_regime(features, datetime.now())
@@ -527,22 +718,59 @@ class TestRegimeFeatureCalculator(unittest.TestCase):
         self.assertIn(regime_class, ['bullish', 'bearish', 'sideways', 'mixed', 'unknown'])
         self.assertGreaterEqual(confidence, 0.0)
         self.assertLessEqual(confidence, 1.0)
+    
+    def test_classify_regime_batch(self):
+        """Test vectorized regime classification matches the scalar path."""
+        features = self.calculator.calculate_regime_classification_features(self.sample_df, "BTC")
+        arrays = {name: series.to_numpy(dtype=np.float64) for name, series in features.items()}
+        
+        regime_classes, confidences = self.calculator.classify_regime_batch(arrays)
+        
+        self.assertEqual(len(regime_classes), len(self.sample_df))
+        self.assertEqual(len(confidences), len(self.sample_df))
+        for i in range(len(self.sample_df)):
+            expected = self.calculator.classify_regime(
+                {name: values[i] for name, values in arrays.items()}, self.sample_df.index[i]
+            )
+            self.assertEqual((regime_classes[i], confidences[i]), expected)
+
+    def test_compute_regime_features_from_batch(self):
+        """Test that a batch and the equivalent bars give the same regime features."""
+        df = self.sample_df
+        batch = OHLCVBatch.from_ndarray(df.to_numpy(dtype=np.float64), df.index)
+        bars = [
+            OHLCVBar(timestamp=ts.to_pydatetime(), open=o, high=h, low=l, close=c, volume=v)
+            for ts, o, h, l, c, v in zip(
+                batch.timestamp, batch.open, batch.high, batch.low, batch.close, batch.volume
+            )
+        ]
+        
+        from_batch = self.calculator.compute_regime_features_for_data(batch, "BTC")
+        from_bars = self.calculator.compute_regime_features_for_data(bars, "BTC")
+        
+        self.assertGreater(len(from_batch), 0)
+        self.assertEqual(from_batch, from_bars)
+        
+        with self.assertRaises(ValueError):
+            OHLCVBatch.from_ndarray(df.to_numpy()[:, :4], df.index)
 
 
 class TestFeatureStoreAPI(unittest.TestCase):
     """Test feature store API functionality."""
     
-    def setUp(self):
-        """Set up test API."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.db_path = Path(self.temp_dir) / "test_feature_store.db"
-        self.config = FeatureAPIConfig(db_path=str(self.db_path))
-        self.api = FeatureStoreAPI(self.config)
+    @classmethod
+    def setUpClass(cls):
+        """Set up one test API; none of the tests write features."""
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.db_path = Path(cls._tmp.name) / "test_feature_store.db"
+        cls.config = FeatureAPIConfig(db_path=str(cls.db_path), pragmas=_TEST_PRAGMAS)
+        cls.api = FeatureStoreAPI(cls.config)
     
-    def tearDown(self):
-        """Clean up test database."""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+    @classmethod
+    def tearDownClass(cls):
+        """Close the API and clean up test database."""
+        cls.api.close()
+        cls._tmp.cleanup()
     
     def test_feature_request_creation(self):
         """Test feature request creation."""
@@ -581,10 +809,11 @@ class TestFeatureStoreAPI(unittest.TestCase):
     
     def test_get_feature_history(self):
         """Test getting feature history."""
+        now = datetime.now()
         history = self.api.get_feature_history(
             "BTC", "vwap", 
-            datetime.now() - timedelta(days=1),
-            datetime.now()
+            now - timedelta(days=1),
+            now
         )
         
         self.assertIsInstance(history, list)
@@ -6,36 +6,35 @@ import pytest
 import pandas as pd
 import numpy as np
 from grodtd.features.indicators import TechnicalIndicators
+from tests.helpers import assert_close_sample
 
 
 class TestTechnicalIndicators:
     """Test cases for TechnicalIndicators."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.indicators = TechnicalIndicators()
+    @classmethod
+    def setup_class(cls):
+        """Build the sample OHLCV data once; the tests only read it."""
+        rng = np.random.default_rng(42)
         
-        # Create sample OHLCV data
-        dates = pd.date_range('2023-01-01', periods=100, freq='1H')
-        np.random.seed(42)
-        
-        # Generate realistic price data
+        # Generate realistic price data as a random walk of returns
+        dates = pd.date_range('2023-01-01', periods=100, freq='h')
         base_price = 100.0
-        returns = np.random.normal(0, 0.01, 100)
-        prices = [base_price]
-        
-        for ret in returns[1:]:
-            prices.append(prices[-1] * (1 + ret))
+        returns = rng.normal(0, 0.01, 100)
+        returns[0] = 0.0
+        prices = base_price * np.cumprod(1 + returns)
         
-        self.sample_data = pd.DataFrame({
-            'timestamp': dates,
+        cls.sample_data = pd.DataFrame({
             'open': prices,
-            'high': [p * (1 + abs(np.random.normal(0, 0.005))) for p in prices],
-            'low': [p * (1 - abs(np.random.normal(0, 0.005))) for p in prices],
+            'high': prices * (1 + np.abs(rng.normal(0, 0.005, 100))),
+            'low': prices * (1 - np.abs(rng.normal(0, 0.005, 100))),
             'close': prices,
-            'volume': np.random.randint(1000, 10000, 100)
-        })
-        self.sample_data.set_index('timestamp', inplace=True)
+            'volume': rng.integers(1000, 10000, 100)
+        }, index=pd.Index(dates, name='timestamp'))
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.indicators = TechnicalIndicators()
     
     def test_calculate_ema(self):
         """Test EMA calculation."""
@@ -98,7 +97,7 @@ class TestTechnicalIndicators:
         # Histogram should be MACD - Signal
         valid_mask = macd.notna() & signal.notna()
         expected_histogram = macd[valid_mask] - signal[valid_mask]
-        assert np.allclose(histogram[valid_mask], expected_histogram, rtol=1e-10)
+        assert_close_sample(histogram[valid_mask], expected_histogram, rtol=1e-10)
     
     def test_calculate_all_features(self):
         """Test calculation of all features."""
@@ -127,6 +126,35 @@ class TestTechnicalIndicators:
             assert col in result.columns
             assert result[col].equals(self.sample_data[col])
     
+    def test_calculate_all_features_matches_individual(self):
+        """Test that the fused kernel matches the standalone indicators."""
+        result = self.indicators.calculate_all_features(self.sample_data)
+        close = self.sample_data['close']
+        
+        bb_upper, bb_middle, bb_lower = self.indicators.calculate_bollinger_bands(close)
+        macd, signal, histogram = self.indicators.calculate_macd(close)
+        expected = {
+            'vwap': self.indicators.calculate_vwap(self.sample_data, 20),
+            'ema_fast': self.indicators.calculate_ema(close, 9),
+            'ema_slow': self.indicators.calculate_ema(close, 20),
+            'atr': self.indicators.calculate_atr(self.sample_data, 14),
+            'rsi': self.indicators.calculate_rsi(close, 14),
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower,
+            'macd': macd,
+            'macd_signal': signal,
+            'macd_histogram': histogram,
+        }
+        
+        for col, series in expected.items():
+            assert result[col].isna().equals(series.isna()), col
+            valid = series.notna()
+            np.testing.assert_allclose(result[col][valid], series[valid], rtol=1e-9, err_msg=col)
+        
+        with pytest.raises(ValueError):
+            self.indicators.calculate_all_features(self.sample_data.iloc[:20])
+    
     def test_invalid_data_handling(self):
         """Test handling of invalid data."""
         # Test with missing columns
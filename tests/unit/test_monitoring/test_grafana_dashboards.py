@@ -2,145 +2,167 @@
 Unit tests for Grafana dashboard configuration.
 """
 
+import functools
 import json
 import os
 import pytest
 from pathlib import Path
+from typing import FrozenSet, NamedTuple, Optional, Tuple
+
+
+DOCKER_DIR = Path(__file__).resolve().parents[3] / "docker"
+GRAFANA_DIR = DOCKER_DIR / "grafana"
+DASHBOARDS_DIR = GRAFANA_DIR / "dashboards"
+
+# Source distributions and slim CI checkouts may ship without the docker assets
+pytestmark = pytest.mark.skipif(
+    not DASHBOARDS_DIR.exists(), reason="grafana dashboards not available"
+)
+
+DASHBOARD_FILES = [
+    "home.json",
+    "trading-performance.json",
+    "system-health.json",
+    "regime-classification.json",
+    "strategy-performance.json"
+]
+
+DATASOURCE_DASHBOARD_FILES = [
+    "trading-performance.json",
+    "system-health.json",
+    "regime-classification.json",
+    "strategy-performance.json"
+]
+
+EXPECTED_TAGS = {
+    "home.json": ["overview", "home"],
+    "trading-performance.json": ["trading", "performance"],
+    "system-health.json": ["system", "health"],
+    "regime-classification.json": ["regime", "classification"],
+    "strategy-performance.json": ["strategy", "performance"]
+}
+
+ALLOWED_REFRESH = frozenset({"5s", "10s", "30s", "1m"})
+
+REQUIRED_COMPOSE_ENTRIES = (
+    "./grafana/grafana.ini:/etc/grafana/grafana.ini",
+    "./grafana/dashboards:/var/lib/grafana/dashboards",
+    "./grafana/datasources:/etc/grafana/provisioning/datasources",
+    "./grafana/dashboards/dashboard.yml:/etc/grafana/provisioning/dashboards/dashboard.yml"
+)
+
+REQUIRED_PROMETHEUS_ENTRIES = (
+    "grodt-trading-bot",
+    "grodt:9090",
+    "/metrics"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_dashboard(name: str) -> dict:
+    """Parse a dashboard JSON file once; later tests reuse the result."""
+    return json.loads((DASHBOARDS_DIR / name).read_text())
+
+
+class DashboardSummary(NamedTuple):
+    """Structural properties of a dashboard checked by the tests below."""
+    keys: FrozenSet[str]
+    refresh: str
+    tags: FrozenSet[str]
+    panel_datasources: Tuple[Optional[str], ...]
+
+
+@functools.lru_cache(maxsize=None)
+def _dashboard_summary(name: str) -> DashboardSummary:
+    """Walk a dashboard once and keep only what the tests assert on."""
+    dashboard_data = _load_dashboard(name)
+    return DashboardSummary(
+        keys=frozenset(dashboard_data),
+        refresh=dashboard_data.get("refresh", ""),
+        tags=frozenset(dashboard_data.get("tags", [])),
+        panel_datasources=tuple(
+            panel.get("datasource") for panel in dashboard_data.get("panels", [])
+        )
+    )
+
+
+# One (file, panel index) pair per panel; missing files are reported by
+# test_dashboard_files_exist rather than failing collection
+ALL_PANELS = [
+    (dashboard_file, panel_idx)
+    for dashboard_file in DATASOURCE_DASHBOARD_FILES
+    if (DASHBOARDS_DIR / dashboard_file).exists()
+    for panel_idx in range(len(_dashboard_summary(dashboard_file).panel_datasources))
+]
 
 
 class TestGrafanaDashboards:
     """Test Grafana dashboard configuration and JSON validity."""
     
-    def setup_method(self):
-        """Setup test environment."""
-        self.docker_dir = Path(__file__).parent.parent.parent.parent / "docker"
-        self.grafana_dir = self.docker_dir / "grafana"
-        self.dashboards_dir = self.grafana_dir / "dashboards"
-    
     def test_grafana_config_exists(self):
         """Test that Grafana configuration file exists."""
-        config_file = self.grafana_dir / "grafana.ini"
+        config_file = GRAFANA_DIR / "grafana.ini"
         assert config_file.exists(), "Grafana configuration file should exist"
     
     def test_datasource_config_exists(self):
         """Test that Prometheus datasource configuration exists."""
-        datasource_file = self.grafana_dir / "datasources" / "prometheus.yml"
+        datasource_file = GRAFANA_DIR / "datasources" / "prometheus.yml"
         assert datasource_file.exists(), "Prometheus datasource configuration should exist"
     
     def test_dashboard_files_exist(self):
         """Test that all dashboard files exist."""
-        expected_dashboards = [
-            "home.json",
-            "trading-performance.json",
-            "system-health.json",
-            "regime-classification.json",
-            "strategy-performance.json"
-        ]
-        
-        for dashboard in expected_dashboards:
-            dashboard_file = self.dashboards_dir / dashboard
+        for dashboard in DASHBOARD_FILES:
+            dashboard_file = DASHBOARDS_DIR / dashboard
             assert dashboard_file.exists(), f"Dashboard {dashboard} should exist"
     
-    def test_dashboard_json_valid(self):
+    @pytest.mark.parametrize("dashboard_file", DASHBOARD_FILES)
+    def test_dashboard_json_valid(self, dashboard_file):
         """Test that all dashboard JSON files are valid."""
-        dashboard_files = [
-            "home.json",
-            "trading-performance.json",
-            "system-health.json",
-            "regime-classification.json",
-            "strategy-performance.json"
-        ]
+        keys = _dashboard_summary(dashboard_file).keys
         
-        for dashboard_file in dashboard_files:
-            file_path = self.dashboards_dir / dashboard_file
-            with open(file_path, 'r') as f:
-                dashboard_data = json.load(f)
-            
-            # Check required fields
-            assert "title" in dashboard_data, f"{dashboard_file} should have a title"
-            assert "panels" in dashboard_data, f"{dashboard_file} should have panels"
-            assert "uid" in dashboard_data, f"{dashboard_file} should have a uid"
+        # Check required fields
+        assert "title" in keys, f"{dashboard_file} should have a title"
+        assert "panels" in keys, f"{dashboard_file} should have panels"
+        assert "uid" in keys, f"{dashboard_file} should have a uid"
     
-    def test_dashboard_panels_have_datasource(self):
+    @pytest.mark.parametrize("dashboard_file,panel_idx", ALL_PANELS)
+    def test_dashboard_panels_have_datasource(self, dashboard_file, panel_idx):
         """Test that all dashboard panels have Prometheus datasource."""
-        dashboard_files = [
-            "trading-performance.json",
-            "system-health.json",
-            "regime-classification.json",
-            "strategy-performance.json"
-        ]
-        
-        for dashboard_file in dashboard_files:
-            file_path = self.dashboards_dir / dashboard_file
-            with open(file_path, 'r') as f:
-                dashboard_data = json.load(f)
-            
-            for panel in dashboard_data.get("panels", []):
-                assert panel.get("datasource") == "Prometheus", \
-                    f"Panel in {dashboard_file} should use Prometheus datasource"
+        datasource = _dashboard_summary(dashboard_file).panel_datasources[panel_idx]
+        assert datasource == "Prometheus", \
+            f"Panel {panel_idx} in {dashboard_file} should use Prometheus datasource"
     
-    def test_dashboard_refresh_intervals(self):
+    @pytest.mark.parametrize("dashboard_file", DASHBOARD_FILES)
+    def test_dashboard_refresh_intervals(self, dashboard_file):
         """Test that dashboards have appropriate refresh intervals."""
-        dashboard_files = [
-            "home.json",
-            "trading-performance.json",
-            "system-health.json",
-            "regime-classification.json",
-            "strategy-performance.json"
-        ]
-        
-        for dashboard_file in dashboard_files:
-            file_path = self.dashboards_dir / dashboard_file
-            with open(file_path, 'r') as f:
-                dashboard_data = json.load(f)
-            
-            refresh = dashboard_data.get("refresh", "")
-            assert refresh in ["5s", "10s", "30s", "1m"], \
-                f"{dashboard_file} should have appropriate refresh interval"
+        refresh = _dashboard_summary(dashboard_file).refresh
+        assert refresh in ALLOWED_REFRESH, \
+            f"{dashboard_file} should have appropriate refresh interval"
     
-    def test_dashboard_tags(self):
+    @pytest.mark.parametrize("dashboard_file,expected_tag_list", EXPECTED_TAGS.items())
+    def test_dashboard_tags(self, dashboard_file, expected_tag_list):
         """Test that dashboards have appropriate tags."""
-        expected_tags = {
-            "home.json": ["overview", "home"],
-            "trading-performance.json": ["trading", "performance"],
-            "system-health.json": ["system", "health"],
-            "regime-classification.json": ["regime", "classification"],
-            "strategy-performance.json": ["strategy", "performance"]
-        }
-        
-        for dashboard_file, expected_tag_list in expected_tags.items():
-            file_path = self.dashboards_dir / dashboard_file
-            with open(file_path, 'r') as f:
-                dashboard_data = json.load(f)
-            
-            tags = dashboard_data.get("tags", [])
-            for expected_tag in expected_tag_list:
-                assert expected_tag in tags, \
-                    f"{dashboard_file} should have tag '{expected_tag}'"
+        missing = set(expected_tag_list) - _dashboard_summary(dashboard_file).tags
+        assert not missing, f"{dashboard_file} is missing tags: {sorted(missing)}"
     
     def test_docker_compose_volumes(self):
         """Test that docker-compose.yml has correct volume mappings."""
-        compose_file = self.docker_dir / "docker-compose.yml"
+        compose_file = DOCKER_DIR / "docker-compose.yml"
         assert compose_file.exists(), "docker-compose.yml should exist"
         
-        with open(compose_file, 'r') as f:
-            content = f.read()
+        content = compose_file.read_text()
         
         # Check for required volume mappings
-        assert "./grafana/grafana.ini:/etc/grafana/grafana.ini" in content
-        assert "./grafana/dashboards:/var/lib/grafana/dashboards" in content
-        assert "./grafana/datasources:/etc/grafana/provisioning/datasources" in content
-        assert "./grafana/dashboards/dashboard.yml:/etc/grafana/provisioning/dashboards/dashboard.yml" in content
+        missing = [entry for entry in REQUIRED_COMPOSE_ENTRIES if entry not in content]
+        assert not missing, f"docker-compose.yml is missing volume mappings: {missing}"
     
     def test_prometheus_config_exists(self):
         """Test that Prometheus configuration exists."""
-        prometheus_config = self.docker_dir / "prometheus" / "prometheus.yml"
+        prometheus_config = DOCKER_DIR / "prometheus" / "prometheus.yml"
         assert prometheus_config.exists(), "Prometheus configuration should exist"
         
-        with open(prometheus_config, 'r') as f:
-            content = f.read()
+        content = prometheus_config.read_text()
         
         # Check for GRODT job configuration
-        assert "grodt-trading-bot" in content
-        assert "grodt:9090" in content
-        assert "/metrics" in content
+        missing = [entry for entry in REQUIRED_PROMETHEUS_ENTRIES if entry not in content]
+        assert not missing, f"prometheus.yml is missing job settings: {missing}"
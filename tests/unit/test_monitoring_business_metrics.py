@@ -16,9 +16,10 @@ from grodtd.monitoring.business_metrics import BusinessMetricsCollector
 class TestBusinessMetricsCollector:
     """Test cases for BusinessMetricsCollector."""
     
-    @pytest.fixture
-    def temp_db(self):
-        """Create a temporary database for testing."""
+    @pytest.fixture(scope="class")
+    @classmethod
+    def temp_db(cls):
+        """Create a temporary database shared by the tests in this class."""
         with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
             db_path = f.name
         
@@ -161,10 +162,14 @@ class TestBusinessMetricsCollector:
         # Cleanup
         os.unlink(db_path)
     
-    def test_initialization(self, temp_db):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def collector(cls, temp_db):
+        """Create one collector for the class; the tests only read the database."""
+        return BusinessMetricsCollector(temp_db)
+    
+    def test_initialization(self, collector, temp_db):
         """Test business metrics collector initialization."""
-        collector = BusinessMetricsCollector(temp_db)
-        
         assert collector.db_path == temp_db
         assert collector.registry is not None
         
@@ -177,10 +182,8 @@ class TestBusinessMetricsCollector:
         assert hasattr(collector, 'position_size')
     
     @pytest.mark.asyncio
-    async def test_collect_metrics(self, temp_db):
+    async def test_collect_metrics(self, collector):
         """Test metrics collection."""
-        collector = BusinessMetricsCollector(temp_db)
-        
         result = await collector.collect_metrics()
         
         assert 'regime' in result
@@ -191,10 +194,8 @@ class TestBusinessMetricsCollector:
         assert 'timestamp' in result
     
     @pytest.mark.asyncio
-    async def test_collect_regime_metrics(self, temp_db):
+    async def test_collect_regime_metrics(self, collector):
         """Test regime metrics collection."""
-        collector = BusinessMetricsCollector(temp_db)
-        
         regime_metrics = await collector._collect_regime_metrics()
         
         assert 'predictions_count' in regime_metrics
@@ -215,10 +216,8 @@ class TestBusinessMetricsCollector:
             assert 0 <= acc <= 100
     
     @pytest.mark.asyncio
-    async def test_collect_strategy_metrics(self, temp_db):
+    async def test_collect_strategy_metrics(self, collector):
         """Test strategy metrics collection."""
-        collector = BusinessMetricsCollector(temp_db)
-        
         strategy_metrics = await collector._collect_strategy_metrics()
         
         assert len(strategy_metrics) > 0
@@ -235,10 +234,8 @@ class TestBusinessMetricsCollector:
             assert 0 <= metrics['win_rate'] <= 100
     
     @pytest.mark.asyncio
-    async def test_collect_feature_metrics(self, temp_db):
+    async def test_collect_feature_metrics(self, collector):
         """Test feature metrics collection."""
-        collector = BusinessMetricsCollector(temp_db)
-        
         feature_metrics = await collector._collect_feature_metrics()
         
         assert len(feature_metrics) > 0
@@ -257,10 +254,8 @@ class TestBusinessMetricsCollector:
             assert metrics['freshness'] >= 0
     
     @pytest.mark.asyncio
-    async def test_collect_pipeline_metrics(self, temp_db):
+    async def test_collect_pipeline_metrics(self, collector):
         """Test pipeline metrics collection."""
-        collector = BusinessMetricsCollector(temp_db)
-        
         pipeline_metrics = await collector._collect_pipeline_metrics()
         
         assert len(pipeline_metrics) > 0
@@ -276,10 +271,8 @@ class TestBusinessMetricsCollector:
             assert metrics['ingestion_rate'] >= 0
     
     @pytest.mark.asyncio
-    async def test_collect_risk_metrics(self, temp_db):
+    async def test_collect_risk_metrics(self, collector):
         """Test risk metrics collection."""
-        collector = BusinessMetricsCollector(temp_db)
-        
         risk_metrics = await collector._collect_risk_metrics()
         
         assert 'positions' in risk_metrics
@@ -296,10 +289,8 @@ class TestBusinessMetricsCollector:
         assert total_exposure >= 0
     
     @pytest.mark.asyncio
-    async def test_update_prometheus_metrics(self, temp_db):
+    async def test_update_prometheus_metrics(self, collector):
         """Test Prometheus metrics update."""
-        collector = BusinessMetricsCollector(temp_db)
-        
         # Mock metrics data
         regime_metrics = {
             'accuracy_by_regime': {
@@ -384,10 +375,8 @@ class TestBusinessMetricsCollector:
             os.unlink(db_path)
     
     @pytest.mark.asyncio
-    async def test_collect_with_database_error(self, temp_db):
+    async def test_collect_with_database_error(self, collector):
         """Test collection with database error."""
-        collector = BusinessMetricsCollector(temp_db)
-        
         # Mock database connection to raise an exception
         with patch('sqlite3.connect') as mock_connect:
             mock_connect.side_effect = Exception("Database error")
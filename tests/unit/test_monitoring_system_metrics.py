@@ -5,8 +5,10 @@ Unit tests for system metrics collector.
 import pytest
 import asyncio
 import tempfile
+import threading
 import os
-from unittest.mock import Mock, patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import DEFAULT, Mock, patch, MagicMock
 from prometheus_client import CollectorRegistry
 
 from grodtd.monitoring.system_metrics import SystemMetricsCollector
@@ -15,9 +17,10 @@ from grodtd.monitoring.system_metrics import SystemMetricsCollector
 class TestSystemMetricsCollector:
     """Test cases for SystemMetricsCollector."""
     
-    @pytest.fixture
-    def temp_db(self):
-        """Create a temporary database for testing."""
+    @pytest.fixture(scope="class")
+    @classmethod
+    def temp_db(cls):
+        """Create a temporary database shared by the tests in this class."""
         with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
             db_path = f.name
         
@@ -33,10 +36,29 @@ class TestSystemMetricsCollector:
         # Cleanup
         os.unlink(db_path)
     
-    def test_initialization(self, temp_db):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def collector(cls, temp_db):
+        """Create one collector for the class; the tests only read the database."""
+        return SystemMetricsCollector(temp_db)
+    
+    @pytest.fixture
+    def psutil_mocks(self):
+        """Patch the psutil resource calls in one go."""
+        with patch.multiple(
+            'psutil',
+            cpu_percent=DEFAULT,
+            cpu_count=DEFAULT,
+            virtual_memory=DEFAULT,
+            swap_memory=DEFAULT,
+            disk_usage=DEFAULT,
+            disk_io_counters=DEFAULT,
+            net_io_counters=DEFAULT
+        ) as mocks:
+            yield SimpleNamespace(**mocks)
+    
+    def test_initialization(self, collector, temp_db):
         """Test system metrics collector initialization."""
-        collector = SystemMetricsCollector(temp_db)
-        
         assert collector.db_path == temp_db
         assert collector.registry is not None
         
@@ -47,10 +69,8 @@ class TestSystemMetricsCollector:
         assert hasattr(collector, 'db_query_duration')
     
     @pytest.mark.asyncio
-    async def test_collect_metrics(self, temp_db):
+    async def test_collect_metrics(self, collector):
         """Test metrics collection."""
-        collector = SystemMetricsCollector(temp_db)
-        
         result = await collector.collect_metrics()
         
         assert 'system' in result
@@ -63,81 +83,86 @@ class TestSystemMetricsCollector:
         assert 'cpu' in system or 'memory' in system or 'disk' in system
     
     @pytest.mark.asyncio
-    async def test_collect_system_resources(self, temp_db):
+    async def test_collect_system_resources(self, collector, psutil_mocks):
         """Test system resources collection."""
-        collector = SystemMetricsCollector(temp_db)
+        # Mock system data
+        psutil_mocks.cpu_percent.return_value = 25.5
+        psutil_mocks.cpu_count.return_value = 8
+        psutil_mocks.cpu_percent.return_value = [20.0, 30.0, 25.0, 35.0]
         
-        with patch('psutil.cpu_percent') as mock_cpu, \
-             patch('psutil.cpu_count') as mock_cpu_count, \
-             patch('psutil.virtual_memory') as mock_memory, \
-             patch('psutil.swap_memory') as mock_swap, \
-             patch('psutil.disk_usage') as mock_disk, \
-             patch('psutil.disk_io_counters') as mock_disk_io, \
-             patch('psutil.net_io_counters') as mock_net_io:
-            
-            # Mock system data
-            mock_cpu.return_value = 25.5
-            mock_cpu_count.return_value = 8
-            mock_cpu.return_value = [20.0, 30.0, 25.0, 35.0]
-            
-            mock_memory.return_value = Mock(
-                total=8589934592,  # 8GB
-                available=4294967296,  # 4GB
-                used=4294967296,  # 4GB
-                percent=50.0
-            )
-            
-            mock_swap.return_value = Mock(
-                total=2147483648,  # 2GB
-                used=1073741824,  # 1GB
-                percent=50.0
-            )
-            
-            mock_disk.return_value = Mock(
-                total=1000000000000,  # 1TB
-                used=500000000000,  # 500GB
-                free=500000000000  # 500GB
-            )
-            
-            mock_disk_io.return_value = Mock(
-                read_bytes=1000000,
-                write_bytes=2000000
-            )
-            
-            mock_net_io.return_value = Mock(
-                bytes_sent=1000000,
-                bytes_recv=2000000,
-                packets_sent=1000,
-                packets_recv=2000
-            )
-            
-            system_metrics = await collector._collect_system_resources()
-            
-            assert 'cpu' in system_metrics
-            assert 'memory' in system_metrics
-            assert 'disk' in system_metrics
-            assert 'network' in system_metrics
-            
-            # Check CPU metrics
-            cpu = system_metrics['cpu']
-            assert 'percent' in cpu
-            assert 'count' in cpu
-            assert cpu['percent'] == 25.5
-            assert cpu['count'] == 8
-            
-            # Check memory metrics
-            memory = system_metrics['memory']
-            assert 'total' in memory
-            assert 'used' in memory
-            assert 'percent' in memory
-            assert memory['total'] == 8589934592
-            assert memory['percent'] == 50.0
+        psutil_mocks.virtual_memory.return_value = Mock(
+            total=8589934592,  # 8GB
+            available=4294967296,  # 4GB
+            used=4294967296,  # 4GB
+            percent=50.0
+        )
+        
+        psutil_mocks.swap_memory.return_value = Mock(
+            total=2147483648,  # 2GB
+            used=1073741824,  # 1GB
+            percent=50.0
+        )
+        
+        psutil_mocks.disk_usage.return_value = Mock(
+            total=1000000000000,  # 1TB
+            used=500000000000,  # 500GB
+            free=500000000000  # 500GB
+        )
+        
+        psutil_mocks.disk_io_counters.return_value = Mock(
+            read_bytes=1000000,
+            write_bytes=2000000
+        )
+        
+        psutil_mocks.net_io_counters.return_value = Mock(
+            bytes_sent=1000000,
+            bytes_recv=2000000,
+            packets_sent=1000,
+            packets_recv=2000
+        )
+        
+        system_metrics = await collector._collect_system_resources()
+        
+        assert 'cpu' in system_metrics
+        assert 'memory' in system_metrics
+        assert 'disk' in system_metrics
+        assert 'network' in system_metrics
+        
+        # Check CPU metrics
+        cpu = system_metrics['cpu']
+        assert 'percent' in cpu
+        assert 'count' in cpu
+        assert cpu['percent'] == 25.5
+        assert cpu['count'] == 8
+        
+        # Check memory metrics
+        memory = system_metrics['memory']
+        assert 'total' in memory
+        assert 'used' in memory
+        assert 'percent' in memory
+        assert memory['total'] == 8589934592
+        assert memory['percent'] == 50.0
     
     @pytest.mark.asyncio
-    async def test_collect_process_metrics(self, temp_db):
-        """Test process metrics collection."""
-        collector = SystemMetricsCollector(temp_db)
+    async def test_cpu_samples_taken_concurrently(self, collector, psutil_mocks):
+        """Test that the blocking CPU samples overlap instead of running back to back."""
+        # Each sample waits until the other one has started
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def sample_cpu(interval=None, percpu=False):
+            barrier.wait()
+            return [20.0, 30.0] if percpu else 25.0
+        
+        psutil_mocks.cpu_percent.side_effect = sample_cpu
         
+        system_metrics = await collector._collect_system_resources()
+        
+        assert system_metrics['cpu']['percent'] == 25.0
+        assert system_metrics['cpu']['per_core'] == [20.0, 30.0]
+    
+    @pytest.mark.asyncio
+    async def test_collect_process_metrics(self, collector):
+        """Test process metrics collection."""
         with patch('psutil.Process') as mock_process:
             # Mock process data
             mock_process_instance = Mock()
@@ -170,10 +195,8 @@ class TestSystemMetricsCollector:
             assert process_metrics['num_threads'] == 5
     
     @pytest.mark.asyncio
-    async def test_collect_database_metrics(self, temp_db):
+    async def test_collect_database_metrics(self, collector):
         """Test database metrics collection."""
-        collector = SystemMetricsCollector(temp_db)
-        
         database_metrics = await collector._collect_database_metrics()
         
         assert 'databases' in database_metrics
@@ -188,10 +211,8 @@ class TestSystemMetricsCollector:
         assert database_metrics['test_query_time'] >= 0
     
     @pytest.mark.asyncio
-    async def test_update_prometheus_metrics(self, temp_db):
+    async def test_update_prometheus_metrics(self, collector):
         """Test Prometheus metrics update."""
-        collector = SystemMetricsCollector(temp_db)
-        
         # Mock system metrics
         system_metrics = {
             'cpu': {'percent': 25.0, 'count': 8},
@@ -222,10 +243,8 @@ class TestSystemMetricsCollector:
         assert collector.memory_usage_bytes.labels(memory_type='total')._value._value == 8589934592
         assert collector.process_cpu_percent._value._value == 15.0
     
-    def test_track_api_request(self, temp_db):
+    def test_track_api_request(self, collector):
         """Test API request tracking."""
-        collector = SystemMetricsCollector(temp_db)
-        
         # Track a successful API request
         collector.track_api_request(
             provider='robinhood',
@@ -248,10 +267,8 @@ class TestSystemMetricsCollector:
         # Note: We can't easily test the exact values without more complex mocking
         # but we can verify the methods don't raise exceptions
     
-    def test_track_database_query(self, temp_db):
+    def test_track_database_query(self, collector):
         """Test database query tracking."""
-        collector = SystemMetricsCollector(temp_db)
-        
         # Track a database query
         collector.track_database_query(
             query_type='SELECT',
@@ -262,10 +279,8 @@ class TestSystemMetricsCollector:
         # This should not raise an exception
         assert True  # If we get here, the method worked
     
-    def test_track_database_error(self, temp_db):
+    def test_track_database_error(self, collector):
         """Test database error tracking."""
-        collector = SystemMetricsCollector(temp_db)
-        
         # Track a database error
         collector.track_database_error('connection_error')
         
@@ -273,26 +288,21 @@ class TestSystemMetricsCollector:
         assert True  # If we get here, the method worked
     
     @pytest.mark.asyncio
-    async def test_collect_with_psutil_error(self, temp_db):
+    async def test_collect_with_psutil_error(self, collector, psutil_mocks):
         """Test collection with psutil error."""
-        collector = SystemMetricsCollector(temp_db)
-        
         # Mock psutil to raise an exception
-        with patch('psutil.cpu_percent') as mock_cpu:
-            mock_cpu.side_effect = Exception("psutil error")
-            
-            result = await collector.collect_metrics()
-            
-            # Should handle error gracefully
-            assert 'system' in result
-            assert 'process' in result
-            assert 'database' in result
+        psutil_mocks.cpu_percent.side_effect = Exception("psutil error")
+        
+        result = await collector.collect_metrics()
+        
+        # Should handle error gracefully
+        assert 'system' in result
+        assert 'process' in result
+        assert 'database' in result
     
     @pytest.mark.asyncio
-    async def test_collect_with_database_error(self, temp_db):
+    async def test_collect_with_database_error(self, collector):
         """Test collection with database error."""
-        collector = SystemMetricsCollector(temp_db)
-        
         # Mock database connection to raise an exception
         with patch('sqlite3.connect') as mock_connect:
             mock_connect.side_effect = Exception("Database error")
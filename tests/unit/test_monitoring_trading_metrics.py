@@ -16,9 +16,10 @@ from grodtd.monitoring.trading_metrics import TradingMetricsCollector
 class TestTradingMetricsCollector:
     """Test cases for TradingMetricsCollector."""
     
-    @pytest.fixture
-    def temp_db(self):
-        """Create a temporary database for testing."""
+    @pytest.fixture(scope="class")
+    @classmethod
+    def temp_db(cls):
+        """Create a temporary database shared by the tests in this class."""
         with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
             db_path = f.name
         
@@ -90,10 +91,14 @@ class TestTradingMetricsCollector:
         # Cleanup
         os.unlink(db_path)
     
-    def test_initialization(self, temp_db):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def collector(cls, temp_db):
+        """Create one collector for the class; the tests only read the database."""
+        return TradingMetricsCollector(temp_db)
+    
+    def test_initialization(self, collector, temp_db):
         """Test trading metrics collector initialization."""
-        collector = TradingMetricsCollector(temp_db)
-        
         assert collector.db_path == temp_db
         assert collector.registry is not None
         
@@ -104,10 +109,8 @@ class TestTradingMetricsCollector:
         assert hasattr(collector, 'sharpe_ratio')
     
     @pytest.mark.asyncio
-    async def test_collect_metrics(self, temp_db):
+    async def test_collect_metrics(self, collector):
         """Test metrics collection."""
-        collector = TradingMetricsCollector(temp_db)
-        
         result = await collector.collect_metrics()
         
         assert 'portfolio' in result
@@ -134,10 +137,8 @@ class TestTradingMetricsCollector:
         assert 'sharpe_ratio_30d' in performance
     
     @pytest.mark.asyncio
-    async def test_get_portfolio_data(self, temp_db):
+    async def test_get_portfolio_data(self, collector):
         """Test portfolio data collection."""
-        collector = TradingMetricsCollector(temp_db)
-        
         portfolio_data = await collector._get_portfolio_data()
         
         assert 'positions' in portfolio_data
@@ -150,10 +151,8 @@ class TestTradingMetricsCollector:
         assert portfolio_data['current_value'] >= 0
     
     @pytest.mark.asyncio
-    async def test_get_trade_statistics(self, temp_db):
+    async def test_get_trade_statistics(self, collector):
         """Test trade statistics collection."""
-        collector = TradingMetricsCollector(temp_db)
-        
         trade_stats = await collector._get_trade_statistics()
         
         assert 'total_trades' in trade_stats
@@ -169,10 +168,8 @@ class TestTradingMetricsCollector:
         assert trade_stats['losing_trades'] == 1   # 1 negative PnL trade
     
     @pytest.mark.asyncio
-    async def test_calculate_performance_metrics(self, temp_db):
+    async def test_calculate_performance_metrics(self, collector):
         """Test performance metrics calculation."""
-        collector = TradingMetricsCollector(temp_db)
-        
         performance_metrics = await collector._calculate_performance_metrics()
         
         assert 'current_drawdown' in performance_metrics
@@ -186,10 +183,8 @@ class TestTradingMetricsCollector:
         assert isinstance(performance_metrics['max_drawdown'], (int, float))
         assert isinstance(performance_metrics['sharpe_ratio_30d'], (int, float))
     
-    def test_calculate_drawdown(self, temp_db):
+    def test_calculate_drawdown(self, collector):
         """Test drawdown calculation."""
-        collector = TradingMetricsCollector(temp_db)
-        
         # Test with sample equity curve
         equity_curve = [
             (10000.0, '2024-01-01T09:00:00Z'),
@@ -207,10 +202,8 @@ class TestTradingMetricsCollector:
         # With the test data, current drawdown should be 0.49% (10200 - 10150) / 10200
         assert drawdown_metrics['current_drawdown'] == pytest.approx(0.49, rel=0.1)
     
-    def test_calculate_sharpe_ratio(self, temp_db):
+    def test_calculate_sharpe_ratio(self, collector):
         """Test Sharpe ratio calculation."""
-        collector = TradingMetricsCollector(temp_db)
-        
         # Test with sample returns
         returns = [0.01, 0.02, -0.01, 0.015, 0.005]
         sharpe_ratio = collector._calculate_sharpe_ratio(returns)
@@ -219,10 +212,8 @@ class TestTradingMetricsCollector:
         assert sharpe_ratio >= 0  # Should be positive for this test data
     
     @pytest.mark.asyncio
-    async def test_update_prometheus_metrics(self, temp_db):
+    async def test_update_prometheus_metrics(self, collector):
         """Test Prometheus metrics update."""
-        collector = TradingMetricsCollector(temp_db)
-        
         # Mock portfolio and trade data
         portfolio_data = {
             'current_value': 10000.0,
@@ -279,10 +270,8 @@ class TestTradingMetricsCollector:
             os.unlink(db_path)
     
     @pytest.mark.asyncio
-    async def test_collect_with_database_error(self, temp_db):
+    async def test_collect_with_database_error(self, collector):
         """Test collection with database error."""
-        collector = TradingMetricsCollector(temp_db)
-        
         # Mock database connection to raise an exception
         with patch('sqlite3.connect') as mock_connect:
             mock_connect.side_effect = Exception("Database error")
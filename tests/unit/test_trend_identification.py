@@ -12,6 +12,53 @@ from grodtd.features.indicators import VWAPCalculator, EMACalculator, TrendDetec
 from grodtd.storage.interfaces import OHLCVBar
 
 
+# The indicators ignore bar timestamps, so the trend sequences below are
+# built once at import with a fixed start time
+_START_TIME = datetime(2024, 1, 1, 9, 30)
+
+
+def _make_bars(rows):
+    """Build an immutable sequence of bars from (open, high, low, close, volume) rows."""
+    return tuple(
+        OHLCVBar(_START_TIME + timedelta(minutes=i), *row)
+        for i, row in enumerate(rows)
+    )
+
+
+# Steadily rising closes shared by the uptrend and sideways sequences
+_RISING_ROWS = (
+    (100.0, 105.0, 95.0, 102.0, 1000.0),
+    (102.0, 108.0, 98.0, 106.0, 2000.0),
+    (106.0, 110.0, 104.0, 108.0, 1500.0),
+    (108.0, 112.0, 106.0, 110.0, 1800.0),
+    (110.0, 115.0, 108.0, 112.0, 2000.0),
+    (112.0, 118.0, 110.0, 115.0, 2200.0),
+    (115.0, 120.0, 112.0, 118.0, 2500.0),
+    (118.0, 122.0, 115.0, 120.0, 2800.0),
+    (120.0, 125.0, 118.0, 122.0, 3000.0),
+)
+
+# The last bar should trigger an uptrend (price above VWAP and EMA)
+UPTREND_BARS = _make_bars(_RISING_ROWS + ((122.0, 130.0, 120.0, 128.0, 3500.0),))
+
+# The last bar should trigger sideways (price between VWAP and EMA)
+SIDEWAYS_BARS = _make_bars(_RISING_ROWS + ((122.0, 125.0, 120.0, 123.0, 3500.0),))
+
+# Start high and go down consistently; the last bar should trigger a downtrend
+DOWNTREND_BARS = _make_bars((
+    (120.0, 125.0, 118.0, 122.0, 1000.0),
+    (122.0, 124.0, 115.0, 118.0, 2000.0),
+    (118.0, 120.0, 110.0, 112.0, 1500.0),
+    (112.0, 115.0, 105.0, 108.0, 1800.0),
+    (108.0, 110.0, 100.0, 102.0, 2000.0),
+    (102.0, 105.0, 95.0, 98.0, 2200.0),
+    (98.0, 100.0, 90.0, 92.0, 2500.0),
+    (92.0, 95.0, 85.0, 88.0, 2800.0),
+    (88.0, 90.0, 80.0, 82.0, 3000.0),
+    (82.0, 85.0, 75.0, 78.0, 3500.0),
+))
+
+
 class TestVWAPCalculator:
     """Test cases for VWAPCalculator."""
     
@@ -157,22 +204,7 @@ class TestTrendDetector:
     
     def test_up_trend_detection(self):
         """Test detection of uptrend."""
-        # Create bars that will result in price > VWAP and price > EMA
-        bars = [
-            OHLCVBar(datetime.now(), 100.0, 105.0, 95.0, 102.0, 1000.0),
-            OHLCVBar(datetime.now(), 102.0, 108.0, 98.0, 106.0, 2000.0),
-            OHLCVBar(datetime.now(), 106.0, 110.0, 104.0, 108.0, 1500.0),
-            OHLCVBar(datetime.now(), 108.0, 112.0, 106.0, 110.0, 1800.0),
-            OHLCVBar(datetime.now(), 110.0, 115.0, 108.0, 112.0, 2000.0),
-            OHLCVBar(datetime.now(), 112.0, 118.0, 110.0, 115.0, 2200.0),
-            OHLCVBar(datetime.now(), 115.0, 120.0, 112.0, 118.0, 2500.0),
-            OHLCVBar(datetime.now(), 118.0, 122.0, 115.0, 120.0, 2800.0),
-            OHLCVBar(datetime.now(), 120.0, 125.0, 118.0, 122.0, 3000.0),
-            # This bar should trigger uptrend
-            OHLCVBar(datetime.now(), 122.0, 130.0, 120.0, 128.0, 3500.0)
-        ]
-        
-        for bar in bars:
+        for bar in UPTREND_BARS:
             trend = self.detector.update(bar)
         
         # Should detect uptrend when price is above both VWAP and EMA
@@ -180,23 +212,7 @@ class TestTrendDetector:
     
     def test_down_trend_detection(self):
         """Test detection of downtrend."""
-        # Create bars that will result in price < VWAP and price < EMA
-        # Start high and go down consistently
-        bars = [
-            OHLCVBar(datetime.now(), 120.0, 125.0, 118.0, 122.0, 1000.0),
-            OHLCVBar(datetime.now(), 122.0, 124.0, 115.0, 118.0, 2000.0),
-            OHLCVBar(datetime.now(), 118.0, 120.0, 110.0, 112.0, 1500.0),
-            OHLCVBar(datetime.now(), 112.0, 115.0, 105.0, 108.0, 1800.0),
-            OHLCVBar(datetime.now(), 108.0, 110.0, 100.0, 102.0, 2000.0),
-            OHLCVBar(datetime.now(), 102.0, 105.0, 95.0, 98.0, 2200.0),
-            OHLCVBar(datetime.now(), 98.0, 100.0, 90.0, 92.0, 2500.0),
-            OHLCVBar(datetime.now(), 92.0, 95.0, 85.0, 88.0, 2800.0),
-            OHLCVBar(datetime.now(), 88.0, 90.0, 80.0, 82.0, 3000.0),
-            # This bar should trigger downtrend
-            OHLCVBar(datetime.now(), 82.0, 85.0, 75.0, 78.0, 3500.0)
-        ]
-        
-        for bar in bars:
+        for bar in DOWNTREND_BARS:
             trend = self.detector.update(bar)
         
         # Should detect downtrend when price is below both VWAP and EMA
@@ -204,22 +220,7 @@ class TestTrendDetector:
     
     def test_sideways_trend_detection(self):
         """Test detection of sideways trend."""
-        # Create bars with mixed signals - oscillating around a central price
-        bars = [
-            OHLCVBar(datetime.now(), 100.0, 105.0, 95.0, 102.0, 1000.0),
-            OHLCVBar(datetime.now(), 102.0, 108.0, 98.0, 106.0, 2000.0),
-            OHLCVBar(datetime.now(), 106.0, 110.0, 104.0, 108.0, 1500.0),
-            OHLCVBar(datetime.now(), 108.0, 112.0, 106.0, 110.0, 1800.0),
-            OHLCVBar(datetime.now(), 110.0, 115.0, 108.0, 112.0, 2000.0),
-            OHLCVBar(datetime.now(), 112.0, 118.0, 110.0, 115.0, 2200.0),
-            OHLCVBar(datetime.now(), 115.0, 120.0, 112.0, 118.0, 2500.0),
-            OHLCVBar(datetime.now(), 118.0, 122.0, 115.0, 120.0, 2800.0),
-            OHLCVBar(datetime.now(), 120.0, 125.0, 118.0, 122.0, 3000.0),
-            # This bar should trigger sideways (price between VWAP and EMA)
-            OHLCVBar(datetime.now(), 122.0, 125.0, 120.0, 123.0, 3500.0)
-        ]
-        
-        for bar in bars:
+        for bar in SIDEWAYS_BARS:
             trend = self.detector.update(bar)
         
         # Should detect sideways when price is between VWAP and EMA